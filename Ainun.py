@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from data_loader import load_indexed_survey, apply_mask, resolve_chart_filters, cross_filter_chart, chart_filter_notice
 
 # ==================================================
 # PAGE CONFIG
@@ -13,90 +14,60 @@ st.set_page_config(
 # ==================================================
 # LOAD DATA
 # ==================================================
-@st.cache_data
-def load_data():
-    url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQnrGG72xRS-qLoiM2zon4eP8t5XMiO5MhoLUEe2jJer0G5EzodiU4e0NOmx_ssmCwZf-AnbQXhBbTM/pub?gid=1791189796&single=true&output=csv"
-    return pd.read_csv(url)
-
-df = load_data()
-df.columns = df.columns.str.strip()
-
-# ==================================================
-# RENAME COLUMNS 
-# ==================================================
-df = df.rename(columns={
-    "Gender / Jantina:": "Gender",
-    "Race / Bangsa:": "Race",
-    "Year of Study / Tahun Belajar:": "Year_of_Study",
-    "Current living situation / Keadaan hidup sekarang:": "Current_Living_Situation",
-    "Employment Status / Status Pekerjaan:": "Employment_Status",
-    "I have difficulty sleeping due to university-related pressure. / Saya sukar tidur kerana tekanan berkaitan universiti.": "Difficulty_Sleeping_University_Pressure",
-    "Using social media is an important part of my daily routine. / Menggunakan media sosial adalah bahagian penting dalam rutin harian saya.": "Social_Media_Daily_Routine",
-    "Social media has a generally positive impact on my wellbeing. / Media sosial secara amnya mempunyai kesan positif terhadap kesejahteraan saya.": "Social_Media_Positive_Impact_on_Wellbeing"
-})
-
-# ==================================================
-# FIX ENCODING
-# ==================================================
-df = df.replace({"â\x80\x93": "-", "–": "-", "—": "-"}, regex=True)
+df, _, filter_index = load_indexed_survey()
 
 # ==================================================
 # LIKERT SCALE (1–5)
 # ==================================================
-likert_map = {
-    "Strongly disagree": 1,
-    "Disagree": 2,
-    "Neutral": 3,
-    "Agree": 4,
-    "Strongly agree": 5
-}
-
 df["Difficulty_Sleeping_University_Pressure_Num"] = (
-    df["Difficulty_Sleeping_University_Pressure"]
-    .map(likert_map)
+    df["Difficulty_Sleeping_University_Pressure_Numeric"]
     .fillna(3)
 )
 
 df["Social_Media_Daily_Routine_Num"] = (
-    df["Social_Media_Daily_Routine"]
-    .map(likert_map)
+    df["Social_Media_Daily_Routine_Numeric"]
     .fillna(3)
 )
 
 # ==================================================
 # FILTER DATA
 # ==================================================
-filtered_data = df[
-    [
-        "Gender",
-        "Year_of_Study",
-        "Race",
-        "Employment_Status",
-        "Current_Living_Situation",
-        "Difficulty_Sleeping_University_Pressure",
-        "Social_Media_Daily_Routine",
-        "Social_Media_Positive_Impact_on_Wellbeing"
-    ]
-].dropna()
+DEMOGRAPHIC_COLS = [
+    "Gender",
+    "Year_of_Study",
+    "Race",
+    "Employment_Status",
+    "Current_Living_Situation",
+    "Difficulty_Sleeping_University_Pressure",
+    "Social_Media_Daily_Routine",
+    "Social_Media_Positive_Impact_on_Wellbeing"
+]
+
+def demographics(row_mask):
+    return apply_mask(df, row_mask)[DEMOGRAPHIC_COLS].dropna()
+
+# Bars picked in a histogram narrow every other chart on this page
+row_mask, kpis = resolve_chart_filters(filter_index, {}, "demographics")
+filtered_data = demographics(row_mask)
 
 # --- DATA TRANSFORMATION FOR VISUALIZATIONS ---
 
 # Mapping Gender
 gender_map = {0: 'Female', 1: 'Male', 2: 'Other'}
-df['Gender_Num'] = df['Gender'].map({'Female': 0, 'Male': 1, 'Other': 2}).fillna(2)
+df['Gender_Num'] = df['Gender'].astype(str).map({'Female': 0, 'Male': 1, 'Other': 2}).fillna(2)
 
 # Mapping Year of Study
 year_map = {1: 'Year 1', 2: 'Year 2', 3: 'Year 3', 4: 'Year 4', 5: 'postgraduate', 0: 'Unknown'}
-df['Year_of_Study_Num'] = df['Year_of_Study'].map({'Year 1': 1, 'Year 2': 2, 'Year 3': 3, 'Year 4': 4, 'postgraduate': 5}).fillna(0)
+df['Year_of_Study_Num'] = df['Year_of_Study'].astype(str).map({'Year 1': 1, 'Year 2': 2, 'Year 3': 3, 'Year 4': 4, 'postgraduate': 5}).fillna(0)
 
 # Mapping Living Situation
 living_map = {0: 'With family', 1: 'On-campus', 2: 'Off-campus', 3: 'Other'}
-df['Current_Living_Situation_Num'] = df['Current_Living_Situation'].map({
+df['Current_Living_Situation_Num'] = df['Current_Living_Situation'].astype(str).map({
     'With family': 0, 'On-campus': 1, 'Off-campus (rental)': 2, 'Off-campus': 2, 'Other': 3
 }).fillna(3)
 
 # Mapping Employment (Clean string variations from CSV)
-df['Employment_Status_Num'] = df['Employment_Status'].map({
+df['Employment_Status_Num'] = df['Employment_Status'].astype(str).map({
     'Full-time student': 3,
     'In paid employment (including part-time, self-employed)': 2,
     'Internship': 1,
@@ -111,27 +82,7 @@ df['Social_Media_Positive_Impact_on_Wellbeing_Num'] = df['Social_Media_Positive_
 
 # Mapping Race
 race_map = {0: 'Malay', 1: 'Chinese', 2: 'Indian', 3: 'Other'}
-df['Race_Num'] = df['Race'].map({'Malay': 0, 'Chinese': 1, 'Indian': 2, 'Others': 3, 'Other': 4}).fillna(3)
-
-# --- NEW: Mapping Difficulty Sleeping Due to University Pressure to 5-point Likert ---
-sleep_map = {
-    'Strongly disagree': 1,
-    'Disagree': 2,
-    'Neutral': 3,
-    'Agree': 4,
-    'Strongly agree': 5
-}
-df['Difficulty_Sleeping_University_Pressure_Num'] = df['Difficulty_Sleeping_University_Pressure'].map(sleep_map).fillna(3)
-
-# --- NEW: Mapping Social Media Daily Routine to 5-point Likert ---
-routine_map = {
-    'Strongly disagree': 1,
-    'Disagree': 2,
-    'Neutral': 3,
-    'Agree': 4,
-    'Strongly agree': 5
-}
-df['Social_Media_Daily_Routine_Num'] = df['Social_Media_Daily_Routine'].map(routine_map).fillna(3)
+df['Race_Num'] = df['Race'].astype(str).map({'Malay': 0, 'Chinese': 1, 'Indian': 2, 'Others': 3, 'Other': 4}).fillna(3)
 
 
 # ==================================================
@@ -149,23 +100,24 @@ gender, race and year of study influence student's perceptions and experience ch
 # ==================================================
 # SUMMARY METRICS
 # ==================================================
-TOTAL_RESPONDENTS = len(df)
+TOTAL_RESPONDENTS = kpis["respondents"]
 
 col1, col2, col3 = st.columns(3)
 
 with col1:
     st.metric("Total Respondents", TOTAL_RESPONDENTS)
 
+# Chart selections that share no respondents leave no rows to take a mode of
 with col2:
     st.metric(
         "Majority Gender",
-        filtered_data["Gender"].mode()[0]
+        filtered_data["Gender"].mode().iloc[0] if not filtered_data.empty else "—"
     )
 
 with col3:
     st.metric(
         "Dominant Year of Study",
-        filtered_data["Year_of_Study"].mode()[0]
+        filtered_data["Year_of_Study"].mode().iloc[0] if not filtered_data.empty else "—"
     )
 
 st.success("""
@@ -184,22 +136,25 @@ st.success("""
 # ==================================================
 # VISUALIZATIONS
 # ==================================================
+chart_filter_notice("demographics")
 
 left, right = st.columns(2)
 
 with left:
     ("1️⃣ Gender Distribution Across Year of Study")
-    fig1 = px.histogram(
-    filtered_data,
-    x="Year_of_Study",
-    color="Gender",
-    barmode="group",
-    labels={
-        "Year_of_Study": "Year of Study",
-        "count": "Number of Respondents" 
-    }
+    cross_filter_chart(
+        filter_index, {}, "demographics", "year_gender", "Year_of_Study",
+        lambda row_mask: px.histogram(
+            demographics(row_mask),
+            x="Year_of_Study",
+            color="Gender",
+            barmode="group",
+            labels={
+                "Year_of_Study": "Year of Study",
+                "count": "Number of Respondents" 
+            }
+        )
     )
-    st.plotly_chart(fig1, use_container_width=True)
     
     st.success("""
         **Interpretation:** 
@@ -208,15 +163,17 @@ with left:
 
     ("2️⃣ Gender vs Social Media Impact")
 
-    fig2 = px.histogram(
-        filtered_data,
-        x="Gender",
-        color="Social_Media_Positive_Impact_on_Wellbeing",
-        barmode="stack",
-        labels={"Social_Media_Positive_Impact_on_Wellbeing":"Perceived Positive Impact",
-                "count":"Number of Respondents"}
+    cross_filter_chart(
+        filter_index, {}, "demographics", "gender_impact", "Gender",
+        lambda row_mask: px.histogram(
+            demographics(row_mask),
+            x="Gender",
+            color="Social_Media_Positive_Impact_on_Wellbeing",
+            barmode="stack",
+            labels={"Social_Media_Positive_Impact_on_Wellbeing":"Perceived Positive Impact",
+                    "count":"Number of Respondents"}
+        )
     )
-    st.plotly_chart(fig2, use_container_width=True)
      
     st.success("""
         **Interpretation:**  
@@ -227,15 +184,17 @@ with left:
 
     ("3️⃣ Gender vs Difficulty Sleeping")
 
-    fig3 = px.histogram(
-        filtered_data,
-        x="Difficulty_Sleeping_University_Pressure",
-        color="Gender",
-        barmode="group",
-        labels={"Difficulty_Sleeping_University_Pressure":"Difficulty Sleeping",
-                "count":"Number of Respondents"}
+    cross_filter_chart(
+        filter_index, {}, "demographics", "gender_sleep", "Difficulty_Sleeping_University_Pressure",
+        lambda row_mask: px.histogram(
+            demographics(row_mask),
+            x="Difficulty_Sleeping_University_Pressure",
+            color="Gender",
+            barmode="group",
+            labels={"Difficulty_Sleeping_University_Pressure":"Difficulty Sleeping",
+                    "count":"Number of Respondents"}
+        )
     )
-    st.plotly_chart(fig3, use_container_width=True)
     
     st.success("""
         **Interpretation:**  
@@ -257,7 +216,7 @@ with right:
         color_continuous_scale="YlGnBu",
         labels={"x":"Living Situation","y":"Year of Study","color":"count"}
     )
-    st.plotly_chart(fig4, use_container_width=True)
+    st.plotly_chart(fig4, width="stretch")
      
     st.success("""
         **Interpretation:**  
@@ -267,15 +226,17 @@ with right:
 
     ("5️⃣ Race vs Social Media Routine")
 
-    fig5 = px.histogram(
-        filtered_data,
-        x="Social_Media_Daily_Routine",
-        color="Race",
-        barmode="group",
-        labels={"Social_Media_Daily_Routine":"Social Media Routine",
-                "count":"Number of Respondents"}
+    cross_filter_chart(
+        filter_index, {}, "demographics", "race_routine", "Social_Media_Daily_Routine",
+        lambda row_mask: px.histogram(
+            demographics(row_mask),
+            x="Social_Media_Daily_Routine",
+            color="Race",
+            barmode="group",
+            labels={"Social_Media_Daily_Routine":"Social Media Routine",
+                    "count":"Number of Respondents"}
+        )
     )
-    st.plotly_chart(fig5, use_container_width=True)
     
     st.success("""
         **Interpretation:**  
@@ -290,7 +251,7 @@ with right:
         names="Employment_Status",
         labels={"Employment_Status":"Employment Status"}
     )
-    st.plotly_chart(fig6, use_container_width=True)
+    st.plotly_chart(fig6, width="stretch")
     
     st.success("""
         **Interpretation:** 
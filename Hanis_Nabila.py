@@ -4,98 +4,22 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
+from data_loader import load_indexed_survey, apply_mask, resolve_chart_filters, cross_filter_chart, chart_filter_notice
 
 st.subheader("Analyze Mental Health Information-Seeking Behavior")
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQnrGG72xRS-qLoiM2zon4eP8t5XMiO5MhoLUEe2jJer0G5EzodiU4e0NOmx_ssmCwZf-AnbQXhBbTM/pub?gid=1791189796&single=true&output=csv"
-    return pd.read_csv(url)
-
-df = load_data()
-
-# Clean Column Names
-df.columns = df.columns.str.strip()
-
-# Rename Columns
-df = df.rename(columns={
-    "Age / Umur:": "Age",
-    "Gender / Jantina:": "Gender",
-    "Race / Bangsa:": "Race",
-    "Year of Study / Tahun Belajar:": "Year_of_Study",
-    "Programme of Study / Program Pembelajaran (cth., SST):": "Programme_of_Study",
-    "Current living situation / Keadaan hidup sekarang:": "Current_Living_Situation",
-    "Employment Status / Status Pekerjaan:": "Employment_Status",
-    "Relationship Status / Status Perhubungan:": "Relationship_Status",
-    "How would you describe your general academic performance? / Bagaimanakah anda menerangkan prestasi akademik umum anda?": "General_Academic_Performance",
-    "How many hours do you study per week (outside class)? / Berapa jam anda belajar setiap minggu (di luar kelas)?": "Hours_Study_per_Week",
-    "How often do you use social media? / Berapa kerap anda menggunakan media sosial?": "Social_Media_Use_Frequency",
-    "Platforms you use most often (select all) / Platform yang paling kerap anda gunakan (pilih semua):": "Platforms_Most_Often_Used",
-    "I have been feeling stressed or overwhelmed with assignments. / Saya telah berasa tertekan atau terbeban dengan tugasan.": "Assignments_Stress",
-    "I often feel anxious about my academic workload. / Saya sering berasa bimbang tentang beban kerja akademik saya.": "Academic_Workload_Anxiety",
-    "I have difficulty sleeping due to university-related pressure. / Saya sukar tidur kerana tekanan berkaitan universiti.": "Difficulty_Sleeping_University_Pressure",
-    "I feel supported by friends or family when I am stressed. / Saya berasa disokong oleh rakan atau keluarga apabila saya tertekan.": "Friends_Family_Support",
-    "I can manage my emotions well during stressful periods. / Saya boleh menguruskan emosi saya dengan baik semasa tempoh tekanan.": "Manage_Emotion_Stressful_Periods",
-    "I use social media to relax or escape from academic stress. / Saya menggunakan media sosial untuk berehat atau melarikan diri daripada tekanan akademik.": "Social_Media_Relaxation",
-    "I feel emotionally connected to my social media accounts. / Saya berasa tersambung secara emosi dengan akaun media sosial saya.": "Emotional_Connection_Social_Media",
-    "Using social media is an important part of my daily routine. / Menggunakan media sosial adalah bahagian penting dalam rutin harian saya.": "Social_Media_Daily_Routine",
-    "I sometimes lose track of time when using social media. / Saya kadang-kadang terlepas masa apabila menggunakan media sosial.": "Social_Media_Waste_Time",
-    "Social media has affected my sleep (sleeping late or difficulty sleeping). / Media sosial telah menjejaskan tidur saya (tidur lewat atau sukar tidur).": "Sleep_Affected_By_Social_Media",
-    "Social media affects my ability to concentrate on studies. / Media sosial menjejaskan keupayaan saya untuk menumpukan perhatian kepada pelajaran.": "Studies_Affected_By_Social_Media",
-    "I use the Internet to look for mental health information (e.g., coping tips, stress-relief content). / Saya menggunakan Internet untuk mencari maklumat kesihatan mental (cth., petua mengatasi tekanan, kandungan melegakan tekanan).": "Mental_Health_Info_Through_Internet",
-    "I have come across upsetting or disturbing content online. / Saya telah menemui kandungan yang menjengkelkan atau mengganggu dalam talian.": "Across_Upsetting_Content_Online",
-    "When I feel stressed, I prefer to seek help online rather than talk to someone in person. / Apabila saya berasa tertekan, saya lebih suka mencari bantuan dalam talian daripada bercakap dengan seseorang secara peribadi.": "Seek_Help_Online_When_Stress",
-    "I know where to find reliable mental health information online. / Saya tahu di mana untuk mencari maklumat kesihatan mental yang boleh dipercayai dalam talian.": "Find_Mental_Health_Info_Online",
-    "I follow accounts that post motivational or mental health content. / Saya mengikuti akaun yang menyiarkan kandungan motivasi atau kesihatan mental.": "Follow_Motivational_Mental_Health_Content",
-    "I use online communities for academic or emotional support. / Saya menggunakan komuniti dalam talian untuk sokongan akademik atau emosi.": "Use_Online_Communities_for_Support",
-    "Social media has a generally positive impact on my wellbeing. / Media sosial secara amnya mempunyai kesan positif terhadap kesejahteraan saya.": "Social_Media_Positive_Impact_on_Wellbeing",
-    "Social media has a generally negative impact on my wellbeing. / Media sosial secara amnya mempunyai kesan negatif terhadap kesejahteraan saya.": "Social_Media_Negative_Impact_on_Wellbeing",
-    "Do you think universities should provide more online mental health resources? / Adakah anda fikir universiti harus menyediakan lebih banyak sumber kesihatan mental dalam talian?": "Do you think universities should provide more online mental health resources?",
-    "What type of online content affects you the most (positive or negative)? / Apakah jenis kandungan dalam talian yang paling mempengaruhi anda (positif atau negatif)?": "Type_of_Online_Content_Affects",
-    "What do you think universities can do to support student wellbeing? / Pada pendapat anda, apakah yang boleh dilakukan oleh universiti untuk menyokong kesejahteraan pelajar?": "Universities_Support_Actions"
-})
-
-# Fix encoding issues
-df = df.replace({"â\x80\x93": "-", "–": "-", "—": "-"}, regex=True)
-
-# Drop Irrelevant Columns
-cols_to_drop = [
-    "Timestamp",
-    "Type_of_Online_Content_Affects",
-    "Universities_Support_Actions"
-]
+survey_df, _, filter_index = load_indexed_survey()
 
-df = df.drop(columns=cols_to_drop, errors="ignore")
-df_numeric = df.copy()
-
-likert_numeric_map = {
-    '1': 1,
-    '2': 2,
-    '3': 3,
-    '4': 4,
-    '5': 5
-}
-
-yes_no_map = {
-    'Yes': 1,
-    'No': 0
-}
-
-freq_map = {
-    'Never': 1,
-    'Rarely': 2,
-    'Sometimes': 3,
-    'Often': 4
-}
-
-df['Find_Mental_Health_Info_Online_Numeric'] = (
-df['Find_Mental_Health_Info_Online'].astype(str).map(yes_no_map)
+survey_df['Online_Help_Level'] = survey_df['Seek_Help_Online_When_Stress'].astype(str).apply(
+    lambda x: 'High (Agree)' if x in ['4','5'] else 'Low (Neutral)'
 )
 
-df['Use_Online_Communities_for_Support_Numeric'] = (
-df['Use_Online_Communities_for_Support'].astype(str).map(freq_map)
-)
+# --- CHART SELECTIONS ---
+# Bars picked in a cross-filter chart narrow every other chart on this page
+chart_filter_notice("help_seeking")
+row_mask, _ = resolve_chart_filters(filter_index, {}, "help_seeking")
+df = apply_mask(survey_df, row_mask)
 
 columns_to_keep = [
     'Gender',
@@ -107,17 +31,6 @@ columns_to_keep = [
     'Mental_Health_Info_Through_Internet'
 ]
 
-# Likert-scale (1–5)
-likert_cols = [
-    'Seek_Help_Online_When_Stress',
-    'Assignments_Stress',
-    'Follow_Motivational_Mental_Health_Content',
-    'Mental_Health_Info_Through_Internet'
-]
-
-for col in likert_cols:
-    df[col + "_Numeric"] = df[col].astype(str).map(likert_numeric_map)
-
 # =====================================================
 # SUMMARY BOX
 # =====================================================
@@ -152,10 +65,6 @@ st.markdown("---")
 # =====================================================
 st.subheader("Preference for Online Help (High vs Low)")
 
-df['Online_Help_Level'] = df['Seek_Help_Online_When_Stress'].astype(str).apply(
-    lambda x: 'High (Agree)' if x in ['4','5'] else 'Low (Neutral)'
-)
-
 pie_data = df['Online_Help_Level'].value_counts().reset_index()
 pie_data.columns = ['Preference', 'Count']
 
@@ -169,7 +78,7 @@ fig = px.pie(
     color_discrete_sequence=['#0000FF', '#FF0000']
 )
 
-st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(fig, width="stretch")
 
 st.success("""
 **Interpretation:**  
@@ -184,37 +93,45 @@ people really find digital platforms to be their go-to for support.
 # =====================================================
 st.subheader("Online Community Support by Gender")
 
-# Create crosstab
-gender_table = pd.crosstab(
-    df['Use_Online_Communities_for_Support'],
-    df['Gender']
-)
-
-# Convert to long format for Plotly
-gender_table_long = gender_table.reset_index().melt(
-    id_vars='Use_Online_Communities_for_Support',
-    var_name='Gender',
-    value_name='Number of Students'
-)
-
-# Plot
-fig = px.bar(
-    gender_table_long,
-    x='Use_Online_Communities_for_Support',
-    y='Number of Students',
-    color='Gender',
-    barmode='group',
-    title='Use of Online Communities for Support by Gender'
-)
-
-fig.update_layout(
-    xaxis_title='Agreement Level',
-    yaxis_title='Number of Students',
-    legend_title='Gender'
+def community_gender_chart(row_mask):
+    chart_df = apply_mask(survey_df, row_mask)
+
+    # Create crosstab
+    gender_table = pd.crosstab(
+        chart_df['Use_Online_Communities_for_Support'],
+        chart_df['Gender']
+    )
+
+    # Convert to long format for Plotly
+    gender_table_long = gender_table.reset_index().melt(
+        id_vars='Use_Online_Communities_for_Support',
+        var_name='Gender',
+        value_name='Number of Students'
+    )
+
+    # Plot
+    fig = px.bar(
+        gender_table_long,
+        x='Use_Online_Communities_for_Support',
+        y='Number of Students',
+        color='Gender',
+        barmode='group',
+        title='Use of Online Communities for Support by Gender'
+    )
+
+    fig.update_layout(
+        xaxis_title='Agreement Level',
+        yaxis_title='Number of Students',
+        legend_title='Gender'
+    )
+    return fig
+
+# Click or box-select bars to narrow the rest of the page
+cross_filter_chart(
+    filter_index, {}, "help_seeking", "community_gender",
+    "Use_Online_Communities_for_Support", community_gender_chart
 )
 
-st.plotly_chart(fig, use_container_width=True)
-
 st.success("""
 **Interpretation:**  
 Female students consistently outnumber male students across almost all frequency categories, 
@@ -238,7 +155,7 @@ fig = px.box(
     }
 )
 
-st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(fig, width="stretch")
 
 st.success("""
 **Interpretation:**  
@@ -252,12 +169,14 @@ do not need care for online help (Level 1) usually have lower stress.
 # =====================================================
 st.subheader("Seeking Mental Health Information Online")
 
-fig = px.histogram(
-    df,
-    x="Mental_Health_Info_Through_Internet",
-    title="Frequency of Seeking Mental Health Information Online"
+cross_filter_chart(
+    filter_index, {}, "help_seeking", "info_online", "Mental_Health_Info_Through_Internet",
+    lambda row_mask: px.histogram(
+        apply_mask(survey_df, row_mask),
+        x="Mental_Health_Info_Through_Internet",
+        title="Frequency of Seeking Mental Health Information Online"
+    )
 )
-st.plotly_chart(fig, use_container_width=True)
 
 st.success("""
 **Interpretation:**  
@@ -273,12 +192,14 @@ they do so sporadically rather than as a constant habit.
 # =====================================================
 st.subheader("Preference for Online Help During Stress")
 
-fig = px.histogram(
-    df,
-    x="Seek_Help_Online_When_Stress",
-    title="Preference for Seeking Help Online When Stressed"
+cross_filter_chart(
+    filter_index, {}, "help_seeking", "help_when_stressed", "Seek_Help_Online_When_Stress",
+    lambda row_mask: px.histogram(
+        apply_mask(survey_df, row_mask),
+        x="Seek_Help_Online_When_Stress",
+        title="Preference for Seeking Help Online When Stressed"
+    )
 )
-st.plotly_chart(fig, use_container_width=True)
 
 st.success("""
 **Interpretation:**  
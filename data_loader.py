@@ -0,0 +1,1976 @@
+import collections
+import contextlib
+import gzip
+import hashlib
+import http.client
+import io
+import json
+import math
+import os
+import re
+import threading
+import time
+import tracemalloc
+import urllib.request
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import plotly.graph_objects as go
+
+from survey_schema import (
+    AGE_RANGE, ANSWER_CATEGORIES, FREQ_COLS, LIKERT_COLS, ORDINAL_ENCODINGS,
+    PLATFORM_VOCABULARY, REQUIRED_COLUMNS, answer_lookup, resolve_headers
+)
+
+# --- DATA SOURCE ---
+# SURVEY_SHEET_EXPORT_URL swaps the published sheet for another export
+# endpoint (with a {gid} placeholder), SURVEY_SHEET_URL for a single URL.
+# sheet_stub.py serves a local stand-in for offline benchmarks.
+SHEET_EXPORT_URL = os.environ.get(
+    "SURVEY_SHEET_EXPORT_URL",
+    "https://docs.google.com/spreadsheets/d/e/2PACX-1vQnrGG72xRS-qLoiM2zon4eP8t5XMiO5MhoLUEe2jJer0G5EzodiU4e0NOmx_ssmCwZf-AnbQXhBbTM/pub?gid={gid}&single=true&output=csv"
+)
+SHEET_URL = os.environ.get("SURVEY_SHEET_URL") or SHEET_EXPORT_URL.format(gid=1791189796)
+
+FETCH_TIMEOUT_SECONDS = 30
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLED_CSV = os.path.join(APP_DIR, "exploring_internet_use.csv")
+
+# --- DATASET CATALOG ---
+# One partition per questionnaire wave, tagged by wave, institution and date.
+# A partition reads from a sheet (sheet_url, or a gid of the published
+# sheet) and/or a local csv; with both, the csv only seeds the snapshot
+# store. Point SURVEY_CATALOG at a JSON list of the same entries to register
+# more waves. The latest date is the default wave.
+DEFAULT_CATALOG = [
+    {
+        "id": "main",
+        "wave": "Exploring Internet Use",
+        "institution": "",
+        "date": "",
+        "sheet_url": SHEET_URL,
+        "csv": BUNDLED_CSV,
+    },
+]
+
+# Boot from the local snapshot store instead of waiting on the sheet.
+# Set SURVEY_OFFLINE_FIRST=0 to block the first load on a live fetch.
+OFFLINE_FIRST = os.environ.get("SURVEY_OFFLINE_FIRST", "1") != "0"
+
+# --- SNAPSHOT STORE ---
+# Raw CSV exports keyed by content hash, plus a LATEST.<partition> pointer
+# per catalog partition. The store is seeded from each partition's csv and
+# from every successful fetch. HISTORY.<partition> lists the partition's
+# last SNAPSHOT_KEEP versions; any other export is pruned once it is older
+# than SNAPSHOT_PRUNE_GRACE_SECONDS (so a download another worker has not
+# pointed at yet survives).
+SNAPSHOT_DIR = os.environ.get("SURVEY_SNAPSHOT_DIR", os.path.join(APP_DIR, ".survey_cache", "raw"))
+SNAPSHOT_KEEP = max(2, int(os.environ.get("SURVEY_SNAPSHOT_KEEP", "3")))
+SNAPSHOT_PRUNE_GRACE_SECONDS = 600
+
+# Cleaned + encoded frames in Feather format, keyed by source hash and
+# TRANSFORM_VERSION. Bump TRANSFORM_VERSION whenever clean_data() or
+# encode_data() changes so stale caches are never reused. Frames of another
+# TRANSFORM_VERSION, or whose snapshot was pruned, are removed as well.
+FRAME_CACHE_DIR = os.environ.get("SURVEY_FRAME_CACHE_DIR", os.path.join(APP_DIR, ".survey_cache", "frames"))
+TRANSFORM_VERSION = 10
+
+# --- STREAMING INGEST ---
+# Exports larger than STREAM_THRESHOLD_BYTES are read in chunks of
+# STREAM_CHUNK_ROWS rows, and each encoded chunk is appended to the frame
+# cache, so ingest memory is bounded by the chunk size, not the export size.
+STREAM_THRESHOLD_BYTES = int(os.environ.get("SURVEY_STREAM_THRESHOLD_MB", "32")) * 1024 * 1024
+STREAM_CHUNK_ROWS = int(os.environ.get("SURVEY_STREAM_CHUNK_ROWS", "20000"))
+DOWNLOAD_BLOCK_BYTES = 1024 * 1024
+
+# Headline KPIs kept as running sums while a streamed export is ingested
+KPI_COLUMNS = {
+    "avg_social_media_hours": "Social_Media_Hours_Numeric",
+    "avg_stress_index": "Academic_Stress_Index",
+    "avg_positive_impact": "Social_Media_Positive_Impact_on_Wellbeing_Numeric",
+    "avg_negative_impact": "Social_Media_Negative_Impact_on_Wellbeing_Numeric",
+}
+
+# --- INGEST TELEMETRY ---
+# Every ingest records wall time, rows, bytes and peak traced memory per
+# stage (fetch, read, decode, parse, rename, clean, validate, encode, derive,
+# cache_read, cache_write). The last run per wave is shown on the home page
+# and every run is appended to TELEMETRY_LOG as one JSON line.
+# Peak memory comes from tracemalloc, which is process-wide and slows every
+# allocation in every session while it runs, so by default only a wave's
+# first load is traced (SURVEY_TRACE_MEMORY=first). =1 traces every ingest,
+# background refreshes included; =0 none.
+TELEMETRY_LOG = os.environ.get("SURVEY_TELEMETRY_LOG", os.path.join(APP_DIR, ".survey_cache", "ingest_log.jsonl"))
+TRACE_MEMORY = os.environ.get("SURVEY_TRACE_MEMORY", "first")
+
+# Seconds before the cached sheet is revalidated in the background.
+# Set SURVEY_REFRESH_TTL=0 to keep the first snapshot for the process lifetime.
+REFRESH_TTL_SECONDS = int(os.environ.get("SURVEY_REFRESH_TTL", "300"))
+
+# Fix encoding issues (mojibake en dash from the Sheets export, en/em dashes)
+MOJIBAKE_PATTERN = re.compile("â\x80\x93|–|—")
+
+# Drop Irrelevant Columns
+# (Timestamp is kept on the encoded frame as each response's submit time)
+COLS_TO_DROP = [
+    "Type_of_Online_Content_Affects",
+    "Universities_Support_Actions"
+]
+
+# Quarantined rows kept in the ingest stats (the count covers all of them)
+QUARANTINE_LIMIT = 1000
+
+# Response matrix: every Likert and frequency item as one int8 column of a
+# respondents x items array. Scores are 1–5, MISSING_SCORE marks a blank or
+# unmapped answer.
+RESPONSE_ITEMS = LIKERT_COLS + FREQ_COLS
+RESPONSE_INDEX = {item: j for j, item in enumerate(RESPONSE_ITEMS)}
+MISSING_SCORE = 0
+
+# Platforms_Most_Often_Used as one bit per PLATFORM_VOCABULARY entry, so
+# platform filters and breakdowns are bitwise ops instead of string splits.
+PLATFORM_COL = "Platforms_Most_Often_Used"
+PLATFORM_MASK_COL = "Platform_Mask"
+PLATFORM_BITS = np.array([1 << bit for bit in range(len(PLATFORM_VOCABULARY))])
+PLATFORM_MASK_DTYPE = np.min_scalar_type(int(PLATFORM_BITS.sum()))
+_PLATFORM_KEYS = {platform.lower(): 1 << bit for bit, platform in enumerate(PLATFORM_VOCABULARY)}
+
+STRESS_ITEMS = [
+    "Assignments_Stress",
+    "Academic_Workload_Anxiety",
+    "Difficulty_Sleeping_University_Pressure"
+]
+
+
+_tracing_lock = threading.Lock()
+_tracing_runs = 0
+
+
+def start_run(partition, trigger):
+    # tracemalloc is process-wide: it runs while any ingest is in flight, and
+    # peaks are approximate when two ingests overlap.
+    global _tracing_runs
+    traced = TRACE_MEMORY == "1" or (TRACE_MEMORY == "first" and trigger == "first_load")
+    if traced:
+        with _tracing_lock:
+            if _tracing_runs == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _tracing_runs += 1
+    return {
+        "partition": partition["id"],
+        "trigger": trigger,
+        "traced": traced,
+        "path": None,
+        "started_at": time.time(),
+        "clock": time.perf_counter(),
+        "stages": {},
+    }
+
+
+def finish_run(run, version, error=None):
+    global _tracing_runs
+    if run["traced"]:
+        with _tracing_lock:
+            _tracing_runs -= 1
+            if _tracing_runs == 0 and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    record = {
+        "at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(run["started_at"])),
+        "partition": run["partition"],
+        "trigger": run["trigger"],
+        "path": run["path"],
+        "version": version,
+        "seconds": round(time.perf_counter() - run["clock"], 4),
+        "error": None if error is None else repr(error),
+        "stages": list(run["stages"].values()),
+    }
+    try:
+        os.makedirs(os.path.dirname(TELEMETRY_LOG), exist_ok=True)
+        with open(TELEMETRY_LOG, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        pass
+    return record
+
+
+@contextlib.contextmanager
+def ingest_stage(run, name):
+    # Times one stage; the caller fills in record["rows"] / record["bytes"].
+    # Repeated stages (one per streamed chunk) add up into one entry.
+    record = {"rows": None, "bytes": None}
+    if run is None:
+        yield record
+        return
+
+    tracing = run["traced"] and tracemalloc.is_tracing()
+    if tracing:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        total = run["stages"].setdefault(name, {
+            "stage": name, "seconds": 0.0, "calls": 0, "rows": None, "bytes": None, "peak_mb": None,
+        })
+        total["seconds"] = round(total["seconds"] + time.perf_counter() - start, 4)
+        total["calls"] += 1
+        for key in ("rows", "bytes"):
+            if record[key] is not None:
+                total[key] = (total[key] or 0) + int(record[key])
+        if tracing:
+            peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 2**20
+            total["peak_mb"] = round(max(total["peak_mb"] or 0.0, peak_mb), 3)
+
+
+def _frame_bytes(df):
+    # Shallow size: object columns count their pointers, not the strings.
+    return int(df.memory_usage(index=False).sum())
+
+
+def load_catalog():
+    path = os.environ.get("SURVEY_CATALOG")
+    entries = DEFAULT_CATALOG
+    base_dir = APP_DIR
+    if path:
+        with open(path) as f:
+            entries = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(path))
+
+    catalog = {}
+    for entry in entries:
+        partition = {
+            "wave": "", "institution": "", "date": "", "sheet_url": None, "csv": None,
+            **entry
+        }
+        if not partition["sheet_url"] and partition.get("gid") is not None:
+            partition["sheet_url"] = SHEET_EXPORT_URL.format(gid=partition["gid"])
+        if partition["csv"]:
+            partition["csv"] = os.path.join(base_dir, partition["csv"])
+        if not partition["sheet_url"] and not partition["csv"]:
+            raise ValueError(f"Catalog entry {entry!r} has no sheet_url, gid or csv")
+        partition_id = partition.get("id") or re.sub(
+            r"[^0-9a-z]+", "-", f"{partition['wave']} {partition['institution']}".lower()
+        ).strip("-")
+        partition["id"] = partition_id
+        catalog[partition_id] = partition
+    return catalog
+
+
+CATALOG = load_catalog()
+# Latest date wins; among equal dates, the entry listed last.
+LATEST_PARTITION = max(
+    enumerate(CATALOG.values()), key=lambda item: (item[1]["date"], item[0])
+)[1]["id"]
+
+
+def partition_label(partition_id):
+    partition = CATALOG[partition_id]
+    tags = [tag for tag in (partition["institution"], partition["date"]) if tag]
+    return f"{partition['wave']} ({', '.join(tags)})" if tags else partition["wave"]
+
+
+def repair_encoding(df):
+    # Repair each distinct string once instead of running a regex over every
+    # cell: survey answers repeat heavily, and numeric columns are skipped.
+    cells_changed = 0
+    for col in df.select_dtypes(include="object").columns:
+        fixes = {
+            value: MOJIBAKE_PATTERN.sub("-", value)
+            for value in df[col].dropna().unique()
+            if isinstance(value, str) and MOJIBAKE_PATTERN.search(value)
+        }
+        if fixes:
+            changed = df[col].isin(list(fixes))
+            cells_changed += int(changed.sum())
+            df.loc[changed, col] = df.loc[changed, col].map(fixes)
+    return df, cells_changed
+
+
+def clean_data(raw, run=None):
+    with ingest_stage(run, "rename") as stage:
+        headers, unmatched = resolve_headers(tuple(raw.columns))
+        df = raw.rename(columns=headers)
+        df = df.drop(columns=COLS_TO_DROP, errors="ignore")
+        stage["rows"] = len(df)
+
+    with ingest_stage(run, "clean") as stage:
+        df, cells_changed = repair_encoding(df)
+        if "Age" in df.columns:
+            df["Age"] = pd.to_numeric(df["Age"], errors="coerce")
+        if "Timestamp" in df.columns:
+            df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+        stage["rows"] = len(df)
+        stage["bytes"] = _frame_bytes(df)
+    return df, {"encoding_repairs": cells_changed, "unmatched_headers": list(unmatched)}
+
+
+def validate_data(df, stats, row_offset=0, run=None):
+    # Whole-column checks on the cleaned answers. Failing rows leave the
+    # frame and go to stats["quarantine"] with the reasons they failed, so
+    # the check runs once per data version and travels with the frame cache.
+    with ingest_stage(run, "validate") as stage:
+        stage["rows"] = len(df)
+        return _validate(df, stats, row_offset)
+
+
+def _validate(df, stats, row_offset):
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Survey export is missing required columns: {', '.join(missing)}")
+
+    low, high = AGE_RANGE
+    checks = {f"{col} missing": df[col].isna() for col in REQUIRED_COLUMNS}
+    checks[f"Age outside {low}-{high}"] = df["Age"].notna() & ~df["Age"].between(low, high)
+    for col in LIKERT_COLS:
+        if col in df.columns:
+            checks[f"{col} outside 1-5"] = df[col].notna() & np.isnan(encode_answers(df[col], "likert"))
+    for col in FREQ_COLS:
+        if col in df.columns:
+            checks[f"{col} not a frequency option"] = (
+                df[col].notna() & np.isnan(encode_answers(df[col], "frequency"))
+            )
+
+    failures = pd.DataFrame(checks, index=df.index)
+    bad = failures.any(axis=1).to_numpy()
+    quarantine = []
+    if bad.any():
+        reasons = failures[bad].dot(failures.columns + "; ").str.rstrip("; ")
+        values = df[bad].astype("string").astype(object)
+        values = values.where(values.notna(), None)
+        rows = df.index[bad] + 1 + row_offset
+        quarantine = [
+            {"Row": int(row), "Reasons": reason, **answers}
+            for row, reason, answers in zip(rows, reasons, values.to_dict("records"))
+        ]
+
+    stats = {
+        **stats,
+        "quarantined": int(bad.sum()),
+        "quarantine": quarantine[:QUARANTINE_LIMIT],
+    }
+    return df[~bad], stats
+
+
+def merge_stats(old_stats, new_stats):
+    # Ingest stats for a frame built from two batches of rows.
+    return {
+        **old_stats,
+        "encoding_repairs": old_stats.get("encoding_repairs", 0) + new_stats["encoding_repairs"],
+        "quarantined": old_stats.get("quarantined", 0) + new_stats["quarantined"],
+        "quarantine": (old_stats.get("quarantine", []) + new_stats["quarantine"])[:QUARANTINE_LIMIT],
+    }
+
+
+def encode_answers(series, scale):
+    # Encode once per distinct answer, then take by answer code: O(n) in the
+    # rows with no string work per cell.
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, answers = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, answers = pd.factorize(series)
+    return answer_lookup(scale, tuple(answers))[codes]
+
+
+def encode_platforms(series):
+    # Split each distinct answer once, then take by answer code.
+    codes, answers = pd.factorize(series)
+    combo_masks = np.zeros(len(answers) + 1, dtype=PLATFORM_MASK_DTYPE)
+    for k, answer in enumerate(answers):
+        for platform in re.split(r"[;,]", str(answer)):
+            platform = platform.strip().lower()
+            if platform:
+                combo_masks[k] |= _PLATFORM_KEYS.get(platform, _PLATFORM_KEYS["other"])
+    return combo_masks[codes]
+
+
+def encode_data(df, run=None):
+    with ingest_stage(run, "encode") as stage:
+        df_numeric = df.copy()
+
+        # Ordinal answers -> numeric values (survey_schema.ORDINAL_ENCODINGS)
+        for encoded, (col, scale) in ORDINAL_ENCODINGS.items():
+            if col in df_numeric.columns:
+                df_numeric[encoded] = encode_answers(df_numeric[col], scale)
+
+        if PLATFORM_COL in df_numeric.columns:
+            df_numeric[PLATFORM_MASK_COL] = encode_platforms(df_numeric[PLATFORM_COL])
+        stage["rows"] = len(df_numeric)
+
+    with ingest_stage(run, "derive") as stage:
+        # Academic Stress Index
+        responses = response_matrix(df_numeric)
+        df_numeric["Academic_Stress_Index"] = item_row_means(responses, STRESS_ITEMS)
+
+        df_numeric = apply_answer_dtypes(df_numeric)
+        stage["rows"] = len(df_numeric)
+        stage["bytes"] = _frame_bytes(df_numeric)
+    return df_numeric
+
+
+def apply_answer_dtypes(df):
+    # Closed-ended answers become categoricals (ordered where the options form
+    # a scale), so filters, groupby and crosstab work on integer codes.
+    for col, (options, ordered) in ANSWER_CATEGORIES.items():
+        if col not in df.columns:
+            continue
+        observed = df[col].dropna().unique()
+        extras = sorted(str(value) for value in observed if value not in options)
+        categories = list(options) + extras
+        dtype = pd.CategoricalDtype(categories, ordered=ordered)
+        if df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+
+    # Likert answers are kept as 1–5 scores (pages take means and
+    # correlations of them), stored as int8.
+    for col in LIKERT_COLS:
+        if col in df.columns:
+            scores = pd.Series(encode_answers(df[col], "likert"), index=df.index)
+            df[col] = scores.astype("int8" if scores.notna().all() else "float32")
+    return df
+
+
+def response_matrix(df_numeric):
+    # Built from the *_Numeric columns so it works on freshly encoded frames
+    # and on frames read back from the Feather cache alike.
+    matrix = np.full((len(df_numeric), len(RESPONSE_ITEMS)), MISSING_SCORE, dtype=np.int8)
+    for j, item in enumerate(RESPONSE_ITEMS):
+        col = item + "_Numeric"
+        if col in df_numeric.columns:
+            scores = pd.to_numeric(df_numeric[col], errors="coerce").to_numpy(dtype=float)
+            valid = ~np.isnan(scores)
+            matrix[valid, j] = np.rint(scores[valid])
+    matrix.flags.writeable = False
+    return matrix
+
+
+def _item_scores(responses, items):
+    scores = responses[:, [RESPONSE_INDEX[item] for item in items]]
+    return scores, scores != MISSING_SCORE
+
+
+def item_means(responses, items):
+    # Column means over answered cells only (NaN when nobody answered).
+    scores, answered = _item_scores(responses, items)
+    counts = answered.sum(axis=0)
+    totals = scores.sum(axis=0, dtype=np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def item_row_means(responses, items):
+    # Per-respondent mean over the answered items (NaN when none answered).
+    scores, answered = _item_scores(responses, items)
+    counts = answered.sum(axis=1)
+    totals = scores.sum(axis=1, dtype=np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def item_share_at_least(responses, item, threshold):
+    # Share of answered cells scoring >= threshold (e.g. 4 = agree or above).
+    scores, answered = _item_scores(responses, [item])
+    counts = answered.sum()
+    if counts == 0:
+        return np.nan
+    return ((scores >= threshold) & answered).sum() / counts
+
+
+def item_corr(responses, items):
+    # Pairwise-complete Pearson correlation, same as DataFrame.corr().
+    scores, answered = _item_scores(responses, items)
+    x = np.where(answered, scores, 0).astype(float)
+    both = answered.astype(float)
+    n = both.T @ both
+    sx = x.T @ both
+    sxx = (x * x).T @ both
+    sxy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_x = sxx - sx * sx / n
+        var_y = var_x.T
+        corr = cov / np.sqrt(var_x * var_y)
+    return pd.DataFrame(corr, index=items, columns=items)
+
+
+def platform_mask(platforms):
+    # OR of the selected platforms' bits.
+    mask = 0
+    for platform in platforms:
+        mask |= _PLATFORM_KEYS[platform.lower()]
+    return mask
+
+
+def platform_matrix(masks):
+    # respondents x platforms boolean view of the bitmask
+    return (np.asarray(masks)[:, None] & PLATFORM_BITS) != 0
+
+
+def platform_counts(masks):
+    return pd.Series(platform_matrix(masks).sum(axis=0), index=PLATFORM_VOCABULARY)
+
+
+def platform_co_usage(masks):
+    # Respondents using both platforms (diagonal = users of each platform).
+    uses = platform_matrix(masks).astype(np.int32)
+    return pd.DataFrame(uses.T @ uses, index=PLATFORM_VOCABULARY, columns=PLATFORM_VOCABULARY)
+
+
+def platform_means(masks, values):
+    # Mean of values among each platform's users, ignoring missing values.
+    uses = platform_matrix(masks).astype(float)
+    values = np.asarray(values, dtype=float)
+    answered = ~np.isnan(values)
+    totals = uses.T @ np.where(answered, values, 0)
+    counts = uses.T @ answered
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.Series(np.where(counts > 0, totals / counts, np.nan), index=PLATFORM_VOCABULARY)
+
+
+def content_hash(raw):
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def _atomic_write(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _latest_pointer(partition):
+    return os.path.join(SNAPSHOT_DIR, f"LATEST.{partition['id']}")
+
+
+def _history_path(partition):
+    return os.path.join(SNAPSHOT_DIR, f"HISTORY.{partition['id']}")
+
+
+def _read_versions(path):
+    try:
+        with open(path) as f:
+            return f.read().split()
+    except OSError:
+        return []
+
+
+def _point_latest(partition, version):
+    # Points LATEST at version, records it in the partition's history and
+    # prunes the exports no partition keeps any more.
+    _atomic_write(_latest_pointer(partition), version.encode())
+    history = [kept for kept in _read_versions(_history_path(partition)) if kept != version] + [version]
+    _atomic_write(_history_path(partition), "\n".join(history[-SNAPSHOT_KEEP:]).encode())
+    with contextlib.suppress(OSError):
+        _prune_snapshots()
+    with contextlib.suppress(OSError):
+        _prune_frame_cache()
+
+
+def _prune_snapshots():
+    names = os.listdir(SNAPSHOT_DIR)
+    kept = set()
+    for name in names:
+        if name.startswith(("LATEST.", "HISTORY.")):
+            kept.update(_read_versions(os.path.join(SNAPSHOT_DIR, name)))
+
+    cutoff = time.time() - SNAPSHOT_PRUNE_GRACE_SECONDS
+    for name in names:
+        version, ext = os.path.splitext(name)
+        path = os.path.join(SNAPSHOT_DIR, name)
+        if ext == ".csv" and version not in kept:
+            with contextlib.suppress(OSError):
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+
+
+def save_snapshot(raw, partition):
+    digest = content_hash(raw)
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        path = snapshot_path(digest)
+        if not os.path.exists(path):
+            _atomic_write(path, raw)
+        _point_latest(partition, digest)
+    except OSError:
+        # A read-only deployment still works, it just cannot persist snapshots.
+        pass
+    return digest
+
+
+def snapshot_path(version):
+    return os.path.join(SNAPSHOT_DIR, f"{version}.csv")
+
+
+def read_snapshot(version):
+    with open(snapshot_path(version), "rb") as f:
+        return f.read()
+
+
+def is_large_snapshot(version):
+    try:
+        return os.path.getsize(snapshot_path(version)) > STREAM_THRESHOLD_BYTES
+    except OSError:
+        return False
+
+
+def latest_snapshot_version(partition, run=None):
+    try:
+        with open(_latest_pointer(partition)) as f:
+            version = f.read().strip()
+        if os.path.exists(snapshot_path(version)):
+            return version
+    except OSError:
+        pass
+
+    # Empty store: seed it from the partition's local CSV, or fetch it.
+    if partition["csv"]:
+        with ingest_stage(run, "read") as stage, open(partition["csv"], "rb") as f:
+            raw = f.read()
+            stage["bytes"] = len(raw)
+        return save_snapshot(raw, partition)
+    return fetch_snapshot(partition, run) or save_snapshot(fetch_raw(partition, run), partition)
+
+
+@contextlib.contextmanager
+def _open_source(partition):
+    if not partition["sheet_url"]:
+        with open(partition["csv"], "rb") as f:
+            yield f
+        return
+
+    # Ask for gzip and inflate it as it streams. A body cut short raises
+    # instead of yielding a partial export, so a truncated download never
+    # becomes a snapshot: EOFError mid-gzip, and IncompleteRead once the
+    # caller is done if fewer bytes than Content-Length arrived (block reads
+    # just return b"" when the connection drops early).
+    request = urllib.request.Request(partition["sheet_url"], headers={"Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT_SECONDS) as response:
+        if response.headers.get("Content-Encoding") == "gzip":
+            with gzip.GzipFile(fileobj=response) as body:
+                yield body
+        else:
+            yield response
+        if response.length:
+            raise http.client.IncompleteRead(b"", response.length)
+
+
+def fetch_raw(partition, run=None):
+    with ingest_stage(run, "fetch") as stage, _open_source(partition) as src:
+        raw = src.read()
+        stage["bytes"] = len(raw)
+    return raw
+
+
+def fetch_snapshot(partition, run=None):
+    # Streams the partition's export straight into the snapshot store,
+    # hashing as it goes, so a large export never sits in memory whole.
+    # Returns None when the store is not writable; callers then fall back
+    # to fetch_raw().
+    tmp_path = os.path.join(SNAPSHOT_DIR, f"download.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        f = open(tmp_path, "wb")
+    except OSError:
+        return None
+
+    digest = hashlib.sha256()
+    try:
+        with ingest_stage(run, "fetch") as stage, f, _open_source(partition) as src:
+            stage["bytes"] = 0
+            for block in iter(lambda: src.read(DOWNLOAD_BLOCK_BYTES), b""):
+                digest.update(block)
+                f.write(block)
+                stage["bytes"] += len(block)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+    version = digest.hexdigest()[:16]
+    os.replace(tmp_path, snapshot_path(version))
+    _point_latest(partition, version)
+    return version
+
+
+def parse_raw(raw, row_offset=0, run=None):
+    # Returns the cleaned, validated frame plus ingest stats (e.g. how many
+    # cells the encoding repair changed and which rows were quarantined, so a
+    # regressing export shows up).
+    with ingest_stage(run, "decode") as stage:
+        text = raw.decode("utf-8-sig")
+        stage["bytes"] = len(raw)
+
+    with ingest_stage(run, "parse") as stage:
+        df = pd.read_csv(io.StringIO(text))
+        del text
+        stage["rows"] = len(df)
+        stage["bytes"] = _frame_bytes(df)
+
+    df, stats = clean_data(df, run)
+    return validate_data(df, stats, row_offset, run)
+
+
+# --- FRAME CACHE ---
+def _frame_cache_path(version):
+    return os.path.join(FRAME_CACHE_DIR, f"{version}-t{TRANSFORM_VERSION}.feather")
+
+
+def _prune_frame_cache():
+    # Without a snapshot store (read-only deployments) only stale transforms go.
+    has_snapshots = os.path.isdir(SNAPSHOT_DIR)
+    cutoff = time.time() - SNAPSHOT_PRUNE_GRACE_SECONDS
+    for name in os.listdir(FRAME_CACHE_DIR):
+        version, _, transform = name.removesuffix(".feather").rpartition("-t")
+        path = os.path.join(FRAME_CACHE_DIR, name)
+        if not name.endswith(".feather") or (
+            transform == str(TRANSFORM_VERSION)
+            and (not has_snapshots or os.path.exists(snapshot_path(version)))
+        ):
+            continue
+        with contextlib.suppress(OSError):
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+
+
+def _read_frame_cache(version, run=None):
+    path = _frame_cache_path(version)
+    if not os.path.exists(path):
+        return None
+    with ingest_stage(run, "cache_read") as stage:
+        stage["bytes"] = os.path.getsize(path)
+        frame = _load_frame_cache(path)
+        if frame is not None:
+            stage["rows"] = len(frame[0])
+    return frame
+
+
+def _load_frame_cache(path):
+    try:
+        # Uncompressed Feather is memory-mapped, so numeric columns are read
+        # straight from the OS page cache that all workers share.
+        table = feather.read_table(path, memory_map=True)
+        stats = json.loads(table.schema.metadata.get(b"survey_stats", b"{}"))
+        df_numeric = table.to_pandas(split_blocks=True)
+        if stats.get("streamed"):
+            # Streamed caches hold answers as plain strings and integers as
+            # floats (see _chunk_table).
+            for col, dtype in stats.get("integer_columns", {}).items():
+                df_numeric[col] = df_numeric[col].astype(dtype)
+            for col in df_numeric.columns:
+                if isinstance(df_numeric[col].dtype, pd.StringDtype):
+                    # The text dtype read_csv gives the in-memory build.
+                    values = df_numeric[col].to_numpy(dtype=object, na_value=np.nan)
+                    df_numeric[col] = pd.Series(values, index=df_numeric.index)
+            df_numeric = apply_answer_dtypes(df_numeric)
+        return df_numeric, stats
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+
+
+def _write_frame_cache(version, df_numeric, stats, run=None):
+    with ingest_stage(run, "cache_write") as stage:
+        stage["rows"] = len(df_numeric)
+        _store_frame_cache(_frame_cache_path(version), df_numeric, stats)
+
+
+def _store_frame_cache(path, df_numeric, stats):
+    try:
+        table = pa.Table.from_pandas(df_numeric, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **table.schema.metadata,
+            b"survey_stats": json.dumps(stats).encode(),
+        })
+        os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        _prune_frame_cache()
+    except (OSError, pa.ArrowException):
+        # Mixed-type columns or a read-only disk: just skip the cache.
+        pass
+
+
+def _set_path(run, path):
+    if run is not None:
+        run["path"] = path
+
+
+def build_frame(version, read_raw, run=None):
+    # read_raw is only called on a cache miss, so a warm restart never
+    # touches the CSV at all.
+    cached = _read_frame_cache(version, run)
+    if cached is not None:
+        _set_path(run, "cache")
+        return cached
+
+    _set_path(run, "full")
+    with ingest_stage(run, "read") as stage:
+        raw = read_raw()
+        stage["bytes"] = len(raw)
+    df, stats = parse_raw(raw, run=run)
+    df_numeric = encode_data(df, run)
+    _write_frame_cache(version, df_numeric, stats, run)
+    return df_numeric, stats
+
+
+def build_snapshot_frame(version, on_chunk=None, run=None):
+    # Frame for a version in the snapshot store: cache, then a streamed
+    # build for large exports, then a plain in-memory build.
+    cached = _read_frame_cache(version, run)
+    if cached is not None:
+        _set_path(run, "cache")
+        return cached
+    if is_large_snapshot(version):
+        frame = stream_frame(version, on_chunk, run)
+        if frame is not None:
+            return frame
+    return build_frame(version, lambda: read_snapshot(version), run)
+
+
+# --- STREAMING INGEST ---
+# Columns clean_data() and encode_data() always make numeric. Any other
+# column that is blank throughout a chunk is stored as text, since read_csv
+# only types it as float for lack of answers.
+_NUMERIC_COLUMNS = {"Age", "Academic_Stress_Index", PLATFORM_MASK_COL, *ORDINAL_ENCODINGS, *LIKERT_COLS}
+
+
+def _chunk_table(df_numeric):
+    # Every chunk is typed on its own: a later chunk may add a category, a
+    # blank score, or the first answers to a question added mid-collection.
+    # Store categoricals and blank answer columns as strings and integers as
+    # floats so all chunks share one schema; _read_frame_cache() restores
+    # the dtypes.
+    df = df_numeric.copy(deep=False)
+    for col in df.columns:
+        if (
+            isinstance(df[col].dtype, pd.CategoricalDtype)
+            or df[col].dtype == object
+            or (col not in _NUMERIC_COLUMNS and df[col].dtype == "float64" and df[col].isna().all())
+        ):
+            df[col] = df[col].astype("string")
+        elif pd.api.types.is_integer_dtype(df[col]) and col != PLATFORM_MASK_COL:
+            df[col] = df[col].astype("float64")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _integer_dtypes(df_numeric):
+    return {
+        col: str(df_numeric[col].dtype)
+        for col in df_numeric.columns
+        if pd.api.types.is_integer_dtype(df_numeric[col]) and col != PLATFORM_MASK_COL
+    }
+
+
+def _accumulate_kpis(running, df_numeric):
+    running["respondents"] += len(df_numeric)
+    for name, col in KPI_COLUMNS.items():
+        if col in df_numeric.columns:
+            running[name][0] += float(df_numeric[col].sum())
+            running[name][1] += int(df_numeric[col].count())
+
+
+def _kpi_snapshot(running):
+    kpis = {"respondents": running["respondents"]}
+    for name in KPI_COLUMNS:
+        total, count = running[name]
+        kpis[name] = total / count if count else None
+    return kpis
+
+
+def stream_frame(version, on_chunk=None, run=None):
+    # Clean, encode and append one chunk at a time to an Arrow IPC file, then
+    # attach the ingest stats and publish it as the frame cache. on_chunk
+    # gets the running headline KPIs after every chunk. Returns None when
+    # the cache directory is not writable.
+    path = _frame_cache_path(version)
+    chunks_path = f"{path}.{os.getpid()}.chunks"
+    try:
+        os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+        sink = pa.OSFile(chunks_path, "wb")
+    except (OSError, pa.ArrowException):
+        return None
+
+    running = {"respondents": 0, **{name: [0.0, 0] for name in KPI_COLUMNS}}
+    stats = {"encoding_repairs": 0, "quarantined": 0, "quarantine": [], "chunks": 0, "streamed": True}
+    writer = schema = integer_dtypes = None
+    _set_path(run, "stream")
+    try:
+        with sink, pd.read_csv(
+            snapshot_path(version), encoding="utf-8-sig", chunksize=STREAM_CHUNK_ROWS
+        ) as reader:
+            while True:
+                # Decoding happens inside the chunked reader, so it is timed
+                # as part of "parse" here.
+                with ingest_stage(run, "parse") as stage:
+                    chunk = next(reader, None)
+                    if chunk is not None:
+                        stage["rows"] = len(chunk)
+                        stage["bytes"] = _frame_bytes(chunk)
+                if chunk is None:
+                    break
+                # read_csv keeps a running index across chunks, so quarantined
+                # row numbers stay global without an offset.
+                df, chunk_stats = clean_data(chunk, run)
+                df, chunk_stats = validate_data(df, chunk_stats, run=run)
+                df_numeric = encode_data(df, run)
+                with ingest_stage(run, "cache_write") as stage:
+                    table = _chunk_table(df_numeric)
+                    if writer is None:
+                        schema = table.schema
+                        writer = pa.ipc.new_file(sink, schema)
+                    writer.write_table(table.select(schema.names).cast(schema))
+                    stage["rows"] = len(table)
+
+                # A column the in-memory build reads as integers is integral
+                # in every chunk; record it so the cache restores that dtype.
+                chunk_dtypes = _integer_dtypes(df_numeric)
+                if integer_dtypes is None:
+                    integer_dtypes = chunk_dtypes
+                integer_dtypes = {
+                    col: dtype for col, dtype in integer_dtypes.items() if chunk_dtypes.get(col) == dtype
+                }
+                stats = {**merge_stats(stats, chunk_stats), "chunks": stats["chunks"] + 1}
+                _accumulate_kpis(running, df_numeric)
+                if on_chunk is not None:
+                    on_chunk(_kpi_snapshot(running))
+                del chunk, df, df_numeric, table
+            if writer is None:
+                return None
+            writer.close()
+
+        stats["kpis"] = _kpi_snapshot(running)
+        stats["integer_columns"] = integer_dtypes
+        # Re-write through a memory map to attach the stats: the rows stream
+        # from the page cache and are never loaded onto the heap together.
+        with ingest_stage(run, "cache_write"), pa.memory_map(chunks_path) as source:
+            table = pa.ipc.open_file(source).read_all()
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b"survey_stats": json.dumps(stats).encode(),
+            })
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        with contextlib.suppress(OSError):
+            _prune_frame_cache()
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(chunks_path)
+
+    return _read_frame_cache(version, run)
+
+
+# --- INCREMENTAL APPEND ---
+def build_incremental(old_raw, old_numeric, old_stats, raw, run=None):
+    # Form responses are only ever appended to the sheet. When the new export
+    # starts with the previous one byte-for-byte, the tail holds exactly the
+    # new responses (same-second or blank timestamps included): parse and
+    # encode just those rows, keep everything else.
+    if (
+        old_raw is None
+        or not old_raw.endswith(b"\n")
+        or not raw.startswith(old_raw)
+    ):
+        return None
+
+    tail = raw[len(old_raw):]
+    if not tail.strip():
+        return old_numeric, old_stats
+
+    header = old_raw[:old_raw.index(b"\n") + 1]
+    # Row numbers in the tail continue after every row of the old export.
+    new_df, new_stats = parse_raw(header + tail, len(old_numeric) + old_stats.get("quarantined", 0), run)
+    new_numeric = encode_data(new_df, run)
+    if list(new_numeric.columns) != list(old_numeric.columns):
+        return None
+
+    stats = merge_stats(old_stats, new_stats)
+    # New answer options widen the categories, which concat turns back into
+    # plain objects; re-apply the schema dtypes to the combined frame.
+    combined = pd.concat([old_numeric, new_numeric], ignore_index=True)
+    return apply_answer_dtypes(combined), stats
+
+
+# --- FILTER INDEX ---
+# One packed bitmap per (dimension, value) for the sidebar filters, built
+# once per data version. Any filter combination resolves to a single row
+# mask: OR the bitmaps of the selected values within a dimension, AND
+# across dimensions. Age is bucketed by whole year, so the age slider ORs
+# the buckets in its range.
+FILTER_DIMENSIONS = ["Gender", "Year_of_Study", "Programme_of_Study", "Social_Media_Use_Frequency", "Age"]
+PLATFORM_DIMENSION = "Platforms"
+
+# Resolved filters (row mask + KPI bundle) are kept per data version in an
+# LRU shared by every session, up to this many bytes of masks.
+FILTER_CACHE_BYTES = int(os.environ.get("SURVEY_FILTER_CACHE_MB", "64")) * 1024 * 1024
+# Rough size of a KPI bundle plus its cache entry
+FILTER_CACHE_ENTRY_OVERHEAD = 1024
+
+# --- KPI CUBE ---
+# Counts, sums and sums of squares of the KPI measures for every cell of
+# the filter dimensions (plus an "unanswered" slot per dimension), so the
+# KPI bundle of any selection is a sum over cube cells, independent of the
+# number of responses. Selections on platforms (a multi-answer question)
+# fall back to the row mask. Dimensions with too many combinations skip
+# the cube the same way.
+KPI_MEASURES = {**KPI_COLUMNS, "avg_age": "Age"}
+HIGH_USAGE_BANDS = ["5 to 6 hours per day", "More than 6 hours per day"]
+CUBE_MAX_CELLS = 1_000_000
+
+
+def _dimension_codes(df_numeric, dim):
+    values = df_numeric[dim]
+    if dim == "Age":
+        values = np.floor(values).astype("Int64")
+    return pd.factorize(values, sort=True)
+
+
+def build_cube(df_numeric, dim_codes):
+    shape = tuple(len(uniques) + 1 for _, uniques in dim_codes.values())
+    n_cells = math.prod(shape)
+    if not dim_codes or n_cells > CUBE_MAX_CELLS:
+        return None
+
+    cells = np.ravel_multi_index(
+        tuple(np.where(codes < 0, len(uniques), codes) for codes, uniques in dim_codes.values()),
+        shape
+    )
+
+    def cell_totals(selected=None, weights=None):
+        at = cells if selected is None else cells[selected]
+        return np.bincount(at, weights=weights, minlength=n_cells).reshape(shape)
+
+    high_usage = df_numeric["Social_Media_Use_Frequency"].isin(HIGH_USAGE_BANDS).to_numpy()
+    cube = {
+        "dims": list(dim_codes),
+        "rows": cell_totals(),
+        "high_usage": cell_totals(high_usage),
+    }
+    for name, col in KPI_MEASURES.items():
+        if col not in df_numeric.columns:
+            continue
+        values = df_numeric[col].to_numpy(dtype=float, na_value=np.nan)
+        answered = ~np.isnan(values)
+        values = values[answered]
+        cube[name] = (
+            cell_totals(answered),
+            cell_totals(answered, values),
+            cell_totals(answered, values * values),
+        )
+    return cube
+
+
+def build_filter_index(df_numeric):
+    bitmaps = {}
+    dim_codes = {}
+    for dim in FILTER_DIMENSIONS:
+        if dim not in df_numeric.columns:
+            continue
+        codes, uniques = dim_codes[dim] = _dimension_codes(df_numeric, dim)
+        bitmaps[dim] = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+
+    if PLATFORM_MASK_COL in df_numeric.columns:
+        masks = df_numeric[PLATFORM_MASK_COL].to_numpy()
+        bitmaps[PLATFORM_DIMENSION] = {
+            platform: np.packbits((masks & platform_mask([platform])) != 0)
+            for platform in PLATFORM_VOCABULARY
+        }
+    return {
+        "rows": len(df_numeric),
+        "bitmaps": bitmaps,
+        "cube": build_cube(df_numeric, dim_codes),
+        # The frame KPI bundles fall back to when the cube cannot answer
+        "frame": df_numeric,
+        "cache": collections.OrderedDict(),
+        "cache_bytes": 0,
+        # Panel figures get an LRU of their own (see panel_figure())
+        "panel_cache": collections.OrderedDict(),
+        "panel_cache_bytes": 0,
+        "lock": threading.Lock(),
+    }
+
+
+def _bitmaps(index, dim):
+    # Bitmaps of a filter dimension; any other column (chart selections can
+    # filter on answers the sidebar does not offer) gets its bitmaps built
+    # on first use and kept in the LRU.
+    if dim in index["bitmaps"]:
+        return index["bitmaps"][dim]
+
+    def compute():
+        codes, uniques = _dimension_codes(index["frame"], dim)
+        bitmaps = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+        return bitmaps, sum(bitmap.nbytes for bitmap in bitmaps.values()) + FILTER_CACHE_ENTRY_OVERHEAD
+
+    return _memoized(index, "bitmaps:" + dim, compute)
+
+
+def _packed_mask(index, selections):
+    # Packed row mask for the selections, or None when nothing is filtered.
+    rows = index["rows"]
+    packed = None
+    for dim, selected in selections.items():
+        if not selected:
+            continue
+        bitmaps = _bitmaps(index, dim)
+        hits = np.zeros((rows + 7) // 8, dtype=np.uint8)
+        for value in selected:
+            bitmap = bitmaps.get(value)
+            if bitmap is not None:
+                np.bitwise_or(hits, bitmap, out=hits)
+        packed = hits if packed is None else np.bitwise_and(packed, hits, out=packed)
+    return packed
+
+
+def filter_mask(index, selections):
+    # selections maps a dimension to its selected values; an empty
+    # selection leaves that dimension unfiltered. Returns a boolean mask
+    # over the frame rows.
+    packed = _packed_mask(index, selections)
+    if packed is None:
+        return np.ones(index["rows"], dtype=bool)
+    return np.unpackbits(packed, count=index["rows"]).view(bool)
+
+
+def filter_state_key(selections):
+    # Canonical filter state: unfiltered dimensions dropped, values sorted,
+    # a range reduced to its bounds, so widget order never changes the key.
+    state = {}
+    for dim, selected in selections.items():
+        if isinstance(selected, range):
+            values = [selected.start, selected.stop - 1] if selected else []
+        else:
+            values = sorted(str(value) for value in selected)
+        if values:
+            state[dim] = values
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def _memoized(index, key, compute, cache="cache", limit=FILTER_CACHE_BYTES):
+    # LRU shared by every session on this data version. compute() returns
+    # (value, size in bytes); entries are evicted oldest-first past limit
+    # bytes. cache names the index's LRU: "cache" for masks and KPI
+    # bundles, "panel_cache" for figures.
+    entries = index[cache]
+    with index["lock"]:
+        hit = entries.get(key)
+        if hit is not None:
+            entries.move_to_end(key)
+            return hit[1]
+
+    value, size = compute()
+    with index["lock"]:
+        if key not in entries:
+            entries[key] = size, value
+            index[cache + "_bytes"] += size
+            while index[cache + "_bytes"] > limit and len(entries) > 1:
+                _, (old_size, _) = entries.popitem(last=False)
+                index[cache + "_bytes"] -= old_size
+    return value
+
+
+def _sd_name(name):
+    return name.replace("avg_", "sd_", 1)
+
+
+def mask_kpis(df_numeric, row_mask):
+    # Headline KPIs for the rows under a mask (NaN when nobody answered).
+    respondents = int(row_mask.sum())
+    high_usage = df_numeric["Social_Media_Use_Frequency"][row_mask].isin(HIGH_USAGE_BANDS).sum()
+    kpis = {
+        "respondents": respondents,
+        "high_usage_share": high_usage / respondents if respondents else np.nan,
+    }
+    for name, col in KPI_MEASURES.items():
+        values = df_numeric[col][row_mask] if col in df_numeric.columns else pd.Series(dtype=float)
+        kpis[name] = float(values.mean())
+        kpis[_sd_name(name)] = float(values.std())
+    return kpis
+
+
+def _cube_block(index, selections):
+    # Per-axis cube slots covered by the selections, or None when the
+    # selection filters on something the cube does not cover.
+    cube = index["cube"]
+    if cube is None or any(selected and dim not in cube["dims"] for dim, selected in selections.items()):
+        return None
+
+    block = []
+    for dim, size in zip(cube["dims"], cube["rows"].shape):
+        selected = selections.get(dim)
+        if not selected:
+            # The unanswered slot only counts when the dimension is unfiltered
+            block.append(np.arange(size))
+            continue
+        codes = {value: code for code, value in enumerate(index["bitmaps"][dim])}
+        block.append(np.array([codes[value] for value in selected if value in codes], dtype=np.intp))
+    return block
+
+
+def cube_kpis(index, selections):
+    # The same bundle as mask_kpis(), summed from cube cells. None when the
+    # cube cannot answer the selection.
+    block = _cube_block(index, selections)
+    if block is None:
+        return None
+    cube = index["cube"]
+    cells = np.ix_(*block)
+
+    respondents = int(cube["rows"][cells].sum())
+    kpis = {
+        "respondents": respondents,
+        "high_usage_share": cube["high_usage"][cells].sum() / respondents if respondents else np.nan,
+    }
+    for name in KPI_MEASURES:
+        if name not in cube:
+            kpis[name] = kpis[_sd_name(name)] = np.nan
+            continue
+        count, total, squares = (float(part[cells].sum()) for part in cube[name])
+        kpis[name] = total / count if count else np.nan
+        # Sample standard deviation, as pandas' std()
+        kpis[_sd_name(name)] = math.sqrt(max(squares - total * total / count, 0.0) / (count - 1)) if count > 1 else np.nan
+    return kpis
+
+
+def resolve_filters(index, selections):
+    # Row mask and KPI bundle for a filter state, memoized in the index's
+    # LRU. Cached masks are shared between sessions, so they are read-only.
+    def compute():
+        row_mask = filter_mask(index, selections)
+        row_mask.flags.writeable = False
+        kpis = cube_kpis(index, selections)
+        if kpis is None:
+            kpis = mask_kpis(index["frame"], row_mask)
+        return (row_mask, kpis), row_mask.nbytes + FILTER_CACHE_ENTRY_OVERHEAD
+
+    return _memoized(index, filter_state_key(selections), compute)
+
+
+# Set bits per byte value, for counting rows in a packed bitmap
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def _dimension_counts(index, selections, dim):
+    # Respondents per value of dim, given every other dimension's filter.
+    others = {other: selected for other, selected in selections.items() if other != dim}
+    block = _cube_block(index, others) if dim in FILTER_DIMENSIONS else None
+    if block is not None:
+        cube = index["cube"]
+        axis = cube["dims"].index(dim)
+        block[axis] = np.arange(cube["rows"].shape[axis])
+        other_axes = tuple(i for i in range(len(block)) if i != axis)
+        totals = cube["rows"][np.ix_(*block)].sum(axis=other_axes)
+        return {value: int(total) for value, total in zip(index["bitmaps"][dim], totals)}
+
+    packed = _packed_mask(index, others)
+    return {
+        value: int(_POPCOUNT[bitmap if packed is None else bitmap & packed].sum())
+        for value, bitmap in index["bitmaps"][dim].items()
+    }
+
+
+def option_counts(index, selections):
+    # For every filter dimension: how many respondents each value would
+    # leave if it were picked, with the other dimensions' filters applied.
+    # Summed from the cube where it covers the selection, else counted from
+    # the bitmaps; memoized with the resolved filters.
+    def compute():
+        counts = {dim: _dimension_counts(index, selections, dim) for dim in index["bitmaps"]}
+        return counts, FILTER_CACHE_ENTRY_OVERHEAD * len(counts)
+
+    return _memoized(index, "options:" + filter_state_key(selections), compute)
+
+
+def live_options(counts, selected):
+    # Options worth offering: values with respondents left, plus whatever is
+    # already selected (a multiselect must keep its current values).
+    return [value for value, count in counts.items() if count or value in selected]
+
+
+# --- LOAD DATA ---
+# One store per catalog partition per process, shared by every page and
+# session. cache_resource hands back the same store object to every caller
+# (cache_data would unpickle a fresh copy each time). Stores are created on
+# first use, so only the waves someone opens are ever parsed, and switching
+# back to a loaded wave is a cache lookup.
+@st.cache_resource
+def _partition_store(partition_id):
+    return {
+        "partition": CATALOG[partition_id],
+        "df_numeric": None,
+        "responses": None,
+        "filter_index": None,
+        "raw": None,
+        "stats": {},
+        "version": None,
+        "source": None,
+        "checked_at": 0.0,
+        "refreshing": False,
+        "progress": None,
+        "error": None,
+        "telemetry": None,
+        "filter_requests": _load_filter_requests(partition_id),
+        "filter_requests_flushed_at": 0.0,
+        "lock": threading.Lock(),
+        "first_load_lock": threading.Lock(),
+    }
+
+
+def answer_columns(df_numeric):
+    # The survey answers in the frame, for previews and CSV downloads.
+    # encode_data() only adds *_Numeric columns, the platform mask and the
+    # derived indexes; Timestamp is when a response came in, not an answer.
+    return [
+        col for col in df_numeric.columns
+        if not col.endswith("_Numeric")
+        and col not in ("Academic_Stress_Index", "Timestamp", PLATFORM_MASK_COL)
+    ]
+
+
+def _swap(store, frame, version, source, raw=None):
+    df_numeric, stats = frame
+    responses = response_matrix(df_numeric)
+    filter_index = build_filter_index(df_numeric)
+    with store["lock"]:
+        store["df_numeric"] = df_numeric
+        store["responses"] = responses
+        store["filter_index"] = filter_index
+        store["stats"] = stats
+        store["raw"] = raw
+        store["version"] = version
+        store["source"] = source
+        store["error"] = None
+        store["checked_at"] = time.time()
+        store["refreshing"] = False
+        store["progress"] = None
+    threading.Thread(target=_warm_popular_filters, args=(store, filter_index), daemon=True).start()
+
+
+def _publish_progress(store, kpis):
+    with store["lock"]:
+        store["progress"] = kpis
+
+
+def _record_run(store, run, version, error=None):
+    record = finish_run(run, version, error)
+    with store["lock"]:
+        store["telemetry"] = record
+
+
+def _revalidate(store):
+    # Runs on a background thread: build the new frame fully, then swap the
+    # reference in one step so readers see either the old or the new frame.
+    partition = store["partition"]
+    run = start_run(partition, "refresh")
+    version = None
+    try:
+        raw = None
+        version = fetch_snapshot(partition, run)
+        if version is None:
+            raw = fetch_raw(partition, run)
+            version = content_hash(raw)
+
+        if version == store["version"]:
+            # Unchanged export: keep the frame and the filter index (with
+            # its warm LRU); only the check itself is recorded.
+            _set_path(run, "unchanged")
+            _record_run(store, run, version)
+            with store["lock"]:
+                store["error"] = None
+                store["checked_at"] = time.time()
+                store["refreshing"] = False
+                store["progress"] = None
+            return
+
+        frame = _read_frame_cache(version, run)
+        _set_path(run, "cache")
+        if frame is None and raw is None and is_large_snapshot(version):
+            frame = stream_frame(version, lambda kpis: _publish_progress(store, kpis), run)
+        if frame is None:
+            if raw is None:
+                with ingest_stage(run, "read") as stage:
+                    raw = read_snapshot(version)
+                    stage["bytes"] = len(raw)
+            else:
+                save_snapshot(raw, partition)
+            old_raw = store["raw"]
+            if old_raw is None and store["version"] is not None and not is_large_snapshot(store["version"]):
+                # The served snapshot may have been pruned or deleted since;
+                # without it the new version is built in full below.
+                with contextlib.suppress(OSError):
+                    old_raw = read_snapshot(store["version"])
+            _set_path(run, "incremental")
+            frame = build_incremental(old_raw, store["df_numeric"], store["stats"], raw, run)
+            if frame is None:
+                _set_path(run, "full")
+                df, stats = parse_raw(raw, run=run)
+                frame = encode_data(df, run), stats
+            _write_frame_cache(version, *frame, run=run)
+    except Exception as exc:
+        # Keep serving the last good snapshot and try again after the TTL.
+        _record_run(store, run, version, exc)
+        with store["lock"]:
+            store["error"] = exc
+            store["checked_at"] = time.time()
+            store["refreshing"] = False
+            store["progress"] = None
+        return
+
+    _record_run(store, run, version)
+    _swap(store, frame, version, _source_label(partition), raw)
+
+
+def _source_label(partition):
+    return "sheet" if partition["sheet_url"] else "csv"
+
+
+def _progress_text(kpis):
+    text = f"Ingesting survey export: {kpis['respondents']:,} responses so far"
+    if kpis["avg_stress_index"] is not None:
+        text += f", average stress index {kpis['avg_stress_index']:.2f}"
+    return text
+
+
+def _first_load(store):
+    with store["first_load_lock"]:
+        if store["df_numeric"] is not None:
+            return
+
+        # Streamed builds report running KPIs while the first page waits.
+        progress = st.empty()
+
+        def on_chunk(kpis):
+            _publish_progress(store, kpis)
+            progress.caption(_progress_text(kpis))
+
+        partition = store["partition"]
+        run = start_run(partition, "first_load")
+        if OFFLINE_FIRST:
+            try:
+                version = latest_snapshot_version(partition, run)
+                frame = build_snapshot_frame(version, on_chunk, run)
+            except Exception as exc:
+                _record_run(store, run, None, exc)
+                raise
+            _record_run(store, run, version)
+            _swap(store, frame, version, "snapshot")
+            progress.empty()
+            # Revalidate against the sheet on the next check.
+            with store["lock"]:
+                store["checked_at"] = 0.0
+            return
+
+        version = None
+        try:
+            with st.spinner("Loading survey responses..."):
+                version = fetch_snapshot(partition, run)
+                if version is None:
+                    raw = fetch_raw(partition, run)
+                    version = save_snapshot(raw, partition)
+                    frame = build_frame(version, lambda: raw, run)
+                else:
+                    raw = None
+                    frame = build_snapshot_frame(version, on_chunk, run)
+        except Exception as exc:
+            _record_run(store, run, version, exc)
+            raise
+        _record_run(store, run, version)
+        progress.empty()
+        _swap(store, frame, version, _source_label(partition), raw)
+
+
+def _current(store):
+    if store["df_numeric"] is None:
+        _first_load(store)
+
+    with store["lock"]:
+        df_numeric, responses, filter_index = store["df_numeric"], store["responses"], store["filter_index"]
+        stale = (
+            REFRESH_TTL_SECONDS > 0
+            and time.time() - store["checked_at"] >= REFRESH_TTL_SECONDS
+        )
+        if stale and not store["refreshing"]:
+            store["refreshing"] = True
+            threading.Thread(target=_revalidate, args=(store,), daemon=True).start()
+
+    # One frame holds the answers and their encodings. Pages add their own
+    # helper columns, so each one gets a shallow copy: new columns stay local
+    # to the page while the data is shared. The response matrix and filter
+    # index are read-only and shared as is.
+    return df_numeric.copy(deep=False), responses, filter_index
+
+
+def selected_partition():
+    # The wave picked in wave_selector(), else the latest one.
+    partition_id = st.session_state.get("survey_wave")
+    return partition_id if partition_id in CATALOG else LATEST_PARTITION
+
+
+def _change_wave():
+    # Filters and chart selections name the old wave's options and age range,
+    # so they go back to the page defaults along with their widgets.
+    st.query_params["wave"] = st.session_state["survey_wave"]
+    widgets = {key for _, key in FILTER_WIDGETS.values()} | {"applied_filters", "filter_age"}
+    for key in list(st.session_state.keys()):
+        # "chart_" covers chart_filters and every chart's selection widget.
+        if key in widgets or str(key).startswith("chart_"):
+            del st.session_state[key]
+    for name in _filter_params_in_url():
+        del st.query_params[name]
+
+
+def wave_selector():
+    # Rendered once from the navigation script, so every page shares it.
+    # A shared link's ?wave= picks the wave on the first run.
+    if "survey_wave" not in st.session_state and st.query_params.get("wave") in CATALOG:
+        st.session_state["survey_wave"] = st.query_params["wave"]
+    waves = sorted(CATALOG, key=lambda partition_id: CATALOG[partition_id]["date"], reverse=True)
+    waves.remove(LATEST_PARTITION)
+    st.sidebar.selectbox(
+        "Survey Wave",
+        options=[LATEST_PARTITION] + waves,
+        format_func=partition_label,
+        key="survey_wave",
+        on_change=_change_wave
+    )
+
+
+def _selected_store(partition_id=None):
+    return _partition_store(partition_id or selected_partition())
+
+
+def load_data(partition_id=None):
+    return _current(_selected_store(partition_id))[0]
+
+
+def load_survey(partition_id=None):
+    # Frame plus the response matrix; matrix row i is frame row i.
+    return _current(_selected_store(partition_id))[:2]
+
+
+def load_indexed_survey(partition_id=None):
+    # load_survey() plus the filter index for the same data version.
+    return _current(_selected_store(partition_id))
+
+
+def apply_mask(data, row_mask):
+    # Rows of a frame or of the response matrix under a filter mask. With
+    # no filter active the data is returned as is, without a copy.
+    return data if row_mask.all() else data[row_mask]
+
+
+def load_quarantine(partition_id=None):
+    # Rows the validation stage kept out of the frame, with their reasons.
+    store = _selected_store(partition_id)
+    if store["df_numeric"] is None:
+        _first_load(store)
+    with store["lock"]:
+        return pd.DataFrame(store["stats"].get("quarantine", []))
+
+
+def data_status(partition_id=None):
+    # Snapshot metadata for diagnostics (wave, version, source, ingest stats).
+    store = _selected_store(partition_id)
+    with store["lock"]:
+        return {
+            "wave": partition_label(store["partition"]["id"]),
+            "version": store["version"],
+            "source": store["source"],
+            "checked_at": store["checked_at"],
+            "error": store["error"],
+            "progress": store["progress"],
+            "telemetry": store["telemetry"],
+            **store["stats"],
+        }
+
+
+# --- FILTER SIDEBAR ---
+# The sidebar filters of the filtered pages. Edits are batched in a form
+# inside a fragment: submitting reruns only the form, and the page reruns
+# once, and only when the submitted filters differ from the applied ones.
+# With "Batch filter edits" off, every widget change applies at once.
+# Applied filters live in st.session_state["applied_filters"] and in the
+# URL's query parameters, so a copied link restores the same view. Picking
+# another wave resets them, and the chart selections, to the page defaults.
+FILTER_WIDGETS = {
+    "Gender": ("Gender", "filter_gender"),
+    "Year_of_Study": ("Year of Study", "filter_year"),
+    "Programme_of_Study": ("Programme of Study", "filter_programme"),
+    "Social_Media_Use_Frequency": ("Social Media Usage (Hours / Day)", "filter_sm"),
+    PLATFORM_DIMENSION: ("Platforms Used", "filter_platforms"),
+}
+FILTER_PARAMS = {
+    "Gender": "gender",
+    "Year_of_Study": "year",
+    "Programme_of_Study": "programme",
+    "Social_Media_Use_Frequency": "usage",
+    PLATFORM_DIMENSION: "platform",
+}
+AGE_PARAM = "age"
+
+# Applied filter states are counted per wave, and the most requested ones
+# are resolved in the background whenever a data version is swapped in, so
+# popular views start warm. The counts are written to FILTER_REQUESTS_DIR at
+# most every FILTER_REQUESTS_FLUSH_SECONDS, and only the
+# FILTER_REQUESTS_KEEP most requested states survive a trim.
+FILTER_REQUESTS_DIR = os.environ.get("SURVEY_FILTER_REQUESTS_DIR", os.path.join(APP_DIR, ".survey_cache"))
+FILTER_REQUESTS_KEEP = 500
+FILTER_REQUESTS_FLUSH_SECONDS = 30
+WARM_FILTER_STATES = 20
+
+
+def encode_filters(filters):
+    # Filter state as query parameters: one list of values per parameter.
+    params = {
+        name: sorted(str(value) for value in filters[dim])
+        for dim, name in FILTER_PARAMS.items() if filters.get(dim)
+    }
+    if filters.get("Age"):
+        params[AGE_PARAM] = [f"{filters['Age'].start}-{filters['Age'].stop - 1}"]
+    return params
+
+
+def decode_filters(params, filter_index):
+    # Inverse of encode_filters(); a missing or malformed age range means
+    # every age.
+    filters = {dim: list(params.get(name, [])) for dim, name in FILTER_PARAMS.items()}
+    low, high = min_age, max_age = _age_bounds(filter_index)
+    try:
+        min_age, max_age = (int(bound) for bound in params[AGE_PARAM][0].split("-"))
+    except (KeyError, IndexError, ValueError):
+        pass
+    # Clamped to the wave's ages, so the slider always gets min <= max.
+    min_age, max_age = max(low, min_age), min(high, max_age)
+    if min_age > max_age:
+        min_age, max_age = low, high
+    filters["Age"] = range(min_age, max_age + 1)
+    return filters
+
+
+def _filter_params_in_url():
+    names = [*FILTER_PARAMS.values(), AGE_PARAM]
+    return {name: st.query_params.get_all(name) for name in names if name in st.query_params}
+
+
+def _share_filters(filters):
+    for name in _filter_params_in_url():
+        del st.query_params[name]
+    st.query_params.update(encode_filters(filters))
+
+
+def _filter_requests_path(partition_id):
+    return os.path.join(FILTER_REQUESTS_DIR, f"filter_requests.{partition_id}.json")
+
+
+def _load_filter_requests(partition_id):
+    try:
+        with open(_filter_requests_path(partition_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _record_filter_request(filters):
+    store = _selected_store()
+    with store["lock"]:
+        requests = store["filter_requests"]
+        entry = requests.setdefault(filter_state_key(filters), {"count": 0, "params": encode_filters(filters)})
+        entry["count"] += 1
+        if len(requests) > 2 * FILTER_REQUESTS_KEEP:
+            # Trim back to the most requested states (one-off age ranges go first).
+            top = sorted(requests.items(), key=lambda item: item[1]["count"], reverse=True)[:FILTER_REQUESTS_KEEP]
+            requests.clear()
+            requests.update(top)
+        # One writer per flush interval, and the file is written outside the
+        # store lock that every page load takes.
+        if time.time() - store["filter_requests_flushed_at"] < FILTER_REQUESTS_FLUSH_SECONDS:
+            return
+        store["filter_requests_flushed_at"] = time.time()
+        data = json.dumps(requests).encode()
+
+    with contextlib.suppress(OSError):
+        os.makedirs(FILTER_REQUESTS_DIR, exist_ok=True)
+        _atomic_write(_filter_requests_path(store["partition"]["id"]), data)
+
+
+def _warm_popular_filters(store, filter_index):
+    # Resolves the most requested states (mask, KPI bundle, option counts)
+    # and builds their filter panels into the new index's LRUs before anyone
+    # asks for them. Figures are warmed untemplated; a theme only restyles.
+    with store["lock"]:
+        entries = sorted(store["filter_requests"].values(), key=lambda entry: entry["count"], reverse=True)
+    panels = list(_FILTER_PANELS.items())
+    for entry in entries[:WARM_FILTER_STATES]:
+        filters = decode_filters(entry["params"], filter_index)
+        row_mask, _ = resolve_filters(filter_index, filters)
+        option_counts(filter_index, filters)
+        for key, build in panels:
+            try:
+                _filter_panel(filter_index, key, build, row_mask, filter_state_key(filters))
+            except Exception:
+                # A panel that cannot draw this state fails the same way on
+                # its page; warming just moves on.
+                continue
+
+
+def _age_bounds(filter_index):
+    ages = [int(age) for age in filter_index["bitmaps"]["Age"]]
+    return min(ages), max(ages)
+
+
+@st.fragment
+def _filter_form(filter_index, labels):
+    applied = st.session_state["applied_filters"]
+    # Counts follow the applied filters, not unsubmitted edits.
+    counts = option_counts(filter_index, applied)
+    batch = st.toggle(
+        "Batch filter edits",
+        value=True,
+        key="filter_batch",
+        help="Apply filter changes together with one click instead of after every edit."
+    )
+
+    with st.form("filter_form", border=False) if batch else contextlib.nullcontext():
+        for dim, (label, key) in FILTER_WIDGETS.items():
+            selected = list(st.session_state.get(key, [])) + list(applied[dim])
+            st.multiselect(
+                label,
+                options=live_options(counts[dim], selected),
+                default=applied[dim],
+                format_func=lambda value, dim=dim: f"{labels.get(dim, {}).get(value, value)} ({counts[dim].get(value, 0):,})",
+                key=key
+            )
+
+        low, high = _age_bounds(filter_index)
+        st.slider(
+            "Age Range",
+            low,
+            high,
+            (max(low, applied["Age"].start), min(high, applied["Age"].stop - 1)),
+            key="filter_age"
+        )
+        submitted = st.form_submit_button("Apply Filters", width="stretch") if batch else True
+
+    if submitted:
+        state = {dim: list(st.session_state[key]) for dim, (_, key) in FILTER_WIDGETS.items()}
+        min_age, max_age = st.session_state["filter_age"]
+        state["Age"] = range(min_age, max_age + 1)
+        if filter_state_key(state) != filter_state_key(applied):
+            st.session_state["applied_filters"] = state
+            _share_filters(state)
+            _record_filter_request(state)
+            st.rerun()
+
+
+def filter_sidebar(filter_index, labels=None, select_all=False):
+    # Renders the filter controls and returns the applied selections, ready
+    # for resolve_filters(). labels maps a dimension to display labels for
+    # its values; select_all starts with every option picked (except
+    # platforms) instead of none. A shared link's filters win over both.
+    if "applied_filters" not in st.session_state and _filter_params_in_url():
+        st.session_state["applied_filters"] = decode_filters(_filter_params_in_url(), filter_index)
+        _record_filter_request(st.session_state["applied_filters"])
+    elif "applied_filters" not in st.session_state:
+        counts = option_counts(filter_index, {})
+        low, high = _age_bounds(filter_index)
+        st.session_state["applied_filters"] = {
+            **{
+                dim: live_options(counts[dim], []) if select_all and dim != PLATFORM_DIMENSION else []
+                for dim in FILTER_WIDGETS
+            },
+            "Age": range(low, high + 1),
+        }
+    _filter_form(filter_index, labels or {})
+    st.caption("The page link keeps these filters; share it to share this view.")
+    return st.session_state["applied_filters"]
+
+
+def reset_filters():
+    # Back to the page defaults: drops applied filters and widget state (but
+    # not the survey wave) and clears the filters from the URL.
+    for key in list(st.session_state.keys()):
+        if key != "survey_wave":
+            del st.session_state[key]
+    for name in _filter_params_in_url():
+        del st.query_params[name]
+
+
+# --- CHART CROSS-FILTERING ---
+# Clicking or box-selecting on a cross-filter chart narrows every other
+# chart on the same page to the picked values, on top of the sidebar
+# filters. Selections live in st.session_state["chart_filters"] as page ->
+# chart -> (dimension, values), so they never leak into another page. Each
+# chart's figure is memoized in the LRU under the filter state it reads,
+# which leaves out its own selection: picking on a chart rebuilds the
+# charts that depend on it, not the chart itself.
+def chart_filters(page):
+    return st.session_state.setdefault("chart_filters", {}).setdefault(page, {})
+
+
+def _chart_state(page, exclude=None):
+    # Canonical chart selections, keyed per chart so two charts on the same
+    # dimension narrow each other instead of merging.
+    return {
+        f"{page}/{chart}:{dim}": values
+        for chart, (dim, values) in chart_filters(page).items() if chart != exclude
+    }
+
+
+def chart_filter_key(filters, page, exclude=None):
+    # Canonical state behind resolve_chart_filters(), for keying what is
+    # computed from its row mask.
+    return filter_state_key({**filters, **_chart_state(page, exclude)})
+
+
+def resolve_chart_filters(index, filters, page, exclude=None):
+    # resolve_filters() narrowed by the page's chart selections, except the
+    # one made on chart `exclude`. Starts from the cached sidebar mask, so
+    # only the chart selections are masked in.
+    selections = [selection for chart, selection in chart_filters(page).items() if chart != exclude]
+    if not selections:
+        return resolve_filters(index, filters)
+
+    def compute():
+        row_mask = resolve_filters(index, filters)[0].copy()
+        for dim, values in selections:
+            row_mask &= filter_mask(index, {dim: values})
+        row_mask.flags.writeable = False
+        return (row_mask, mask_kpis(index["frame"], row_mask)), row_mask.nbytes + FILTER_CACHE_ENTRY_OVERHEAD
+
+    return _memoized(index, "chart:" + chart_filter_key(filters, page, exclude), compute)
+
+
+def _chart_key(page, chart):
+    return f"chart_{page}_{chart}"
+
+
+def _select_on_chart(page, chart, dim, labels):
+    # on_select callback: runs before the rerun, so every chart already
+    # sees the new selection.
+    values = {label: value for value, label in labels.items()}
+    points = st.session_state[_chart_key(page, chart)]["selection"]["points"]
+    selected = sorted({values.get(point["x"], point["x"]) for point in points if "x" in point}, key=str)
+    if selected:
+        chart_filters(page)[chart] = (dim, selected)
+    else:
+        chart_filters(page).pop(chart, None)
+
+
+def cross_filter_chart(index, filters, page, chart, dim, build, labels=None, theme=None):
+    # Renders build(row_mask) as a chart whose x axis selects values of dim.
+    # labels maps values of dim to the axis labels the figure shows. The
+    # figure is a panel on the chart's own filter state, so it keeps the
+    # same spec while only its own selection changes, and Streamlit keeps
+    # the chart (and its selection) mounted.
+    fig = panel_figure(
+        index,
+        f"{page}/{chart}",
+        lambda: build(resolve_chart_filters(index, filters, page, exclude=chart)[0]),
+        [chart_filter_key(filters, page, chart)],
+        theme
+    )
+    st.plotly_chart(
+        fig,
+        width="stretch",
+        on_select=lambda: _select_on_chart(page, chart, dim, labels or {}),
+        selection_mode=("points", "box"),
+        key=_chart_key(page, chart)
+    )
+
+
+def clear_chart_filters(page):
+    # Drops the page's selections along with the charts' widget state.
+    for chart in chart_filters(page):
+        st.session_state.pop(_chart_key(page, chart), None)
+    chart_filters(page).clear()
+
+
+def chart_filter_notice(page):
+    # What the chart selections currently narrow the page to.
+    if not chart_filters(page):
+        return
+    picked = "; ".join(f"{dim}: {', '.join(map(str, values))}" for dim, values in chart_filters(page).values())
+    col1, col2 = st.columns([4, 1])
+    col1.info(f"Chart selection: {picked}")
+    col2.button("Clear chart selection", on_click=clear_chart_filters, args=(page,), width="stretch")
+
+
+# --- PANELS ---
+# A panel is one chart of a page, declared with the inputs it reads: the
+# data version (panels live in that version's LRU, so a new version starts
+# them cold), the filter state behind its row mask (chart_filter_key(); no
+# mask input for a chart of the whole wave) and the theme. A rerun rebuilds
+# only the panels whose inputs changed and reuses every other figure; a
+# theme change re-styles the cached figures without touching the data.
+# Figures are kept in their own LRU, up to PANEL_CACHE_BYTES, so large
+# whole-wave figures never evict the filter masks.
+THEME_TEMPLATES = {"light": "plotly_white", "dark": "plotly_dark"}
+PANEL_CACHE_BYTES = int(os.environ.get("SURVEY_PANEL_CACHE_MB", "32")) * 1024 * 1024
+
+
+def _payload_bytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_payload_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_bytes(item) for item in value)
+    if isinstance(value, str):
+        return len(value)
+    return 8
+
+
+def _figure_size(fig):
+    # Trace data dominates a figure's size; estimated from the arrays held
+    # by each trace instead of serializing the whole figure.
+    return sum(_payload_bytes(trace.to_plotly_json()) for trace in fig.data) + FILTER_CACHE_ENTRY_OVERHEAD
+
+
+def panel_figure(index, key, build, inputs=(), theme=None):
+    # The figure build() returns for these inputs, in the theme's template.
+    # key names the panel and must be unique across pages; build may only
+    # read what inputs and the data version pin down, since the figure is
+    # shared by every session.
+    data_key = "panel:" + key + ":" + hashlib.sha1(json.dumps(list(inputs)).encode()).hexdigest()
+
+    def compute():
+        fig = build()
+        return fig, _figure_size(fig)
+
+    fig = _memoized(index, data_key, compute, "panel_cache", PANEL_CACHE_BYTES)
+    if theme is None:
+        return fig
+
+    def restyle():
+        styled = go.Figure(fig).update_layout(template=THEME_TEMPLATES[theme])
+        return styled, _figure_size(styled)
+
+    return _memoized(index, f"{data_key}:{theme}", restyle, "panel_cache", PANEL_CACHE_BYTES)
+
+
+# A filter panel is drawn from the filtered rows alone: build(data) gets the
+# wave's rows under the filters and reads nothing else that varies, so it
+# can be replayed for any filter state of any data version. Builders are
+# registered by key when first rendered, and _warm_popular_filters() builds
+# them for the most requested states of each new version.
+_FILTER_PANELS = {}
+
+
+def filter_panel(index, filters, key, build, theme=None, page=None):
+    # panel_figure() of build(filtered rows). With page, the page's chart
+    # selections narrow the rows as well.
+    _FILTER_PANELS[key] = build
+    if page is None:
+        row_mask, state = resolve_filters(index, filters)[0], filter_state_key(filters)
+    else:
+        row_mask, state = resolve_chart_filters(index, filters, page)[0], chart_filter_key(filters, page)
+    return _filter_panel(index, key, build, row_mask, state, theme)
+
+
+def _filter_panel(index, key, build, row_mask, state, theme=None):
+    return panel_figure(index, key, lambda: build(apply_mask(index["frame"], row_mask)), [state], theme)
@@ -1,10 +1,17 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
+from data_loader import (
+    load_indexed_survey, load_quarantine, data_status, answer_columns, apply_mask, LIKERT_COLS,
+    item_means, item_share_at_least, item_corr,
+    resolve_chart_filters, filter_sidebar, reset_filters, platform_means, platform_co_usage,
+    cross_filter_chart, chart_filter_notice, panel_figure, filter_panel
+)
 warnings.filterwarnings("ignore")
 
 def safe_corr(df, col_x, col_y):
@@ -110,7 +117,7 @@ def boxplot_summary(df, x_col, y_col):
     )
 
 # Histogram/Likert 
-def likert_summary(series, agree_levels=("Agree", "Strongly Agree")):
+def likert_summary(series, agree_levels=(4, 5)):
     if series.empty:
         return "No responses available under the current filter selection."
 
@@ -198,10 +205,10 @@ def parallel_chart_summary(df, cols):
         f"indicating which attributes dominate overall patterns."
     )
 
-def heatmap_summary(df, cols):
-    if df.empty:
+def heatmap_summary(corr):
+    if corr.isna().all().all():
         return "No data available."
-    corr = df[cols].corr()
+    cols = list(corr.columns)
     max_pair = corr.unstack().sort_values(ascending=False).drop_duplicates().iloc[1] # skip 1=diagonal 1.0
     max_cols = corr.unstack().sort_values(ascending=False).drop_duplicates().index[1]
     return (
@@ -254,53 +261,7 @@ st.image(
 )
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQnrGG72xRS-qLoiM2zon4eP8t5XMiO5MhoLUEe2jJer0G5EzodiU4e0NOmx_ssmCwZf-AnbQXhBbTM/pub?gid=1791189796&single=true&output=csv"
-    return pd.read_csv(url)
-
-df = load_data()
-
-# Clean Column Names
-df.columns = df.columns.str.strip()
-
-# Rename Columns
-df = df.rename(columns={
-    "Age / Umur:": "Age",
-    "Gender / Jantina:": "Gender",
-    "Race / Bangsa:": "Race",
-    "Year of Study / Tahun Belajar:": "Year_of_Study",
-    "Programme of Study / Program Pembelajaran (cth., SST):": "Programme_of_Study",
-    "Current living situation / Keadaan hidup sekarang:": "Current_Living_Situation",
-    "Employment Status / Status Pekerjaan:": "Employment_Status",
-    "Relationship Status / Status Perhubungan:": "Relationship_Status",
-    "How would you describe your general academic performance? / Bagaimanakah anda menerangkan prestasi akademik umum anda?": "General_Academic_Performance",
-    "How many hours do you study per week (outside class)? / Berapa jam anda belajar setiap minggu (di luar kelas)?": "Hours_Study_per_Week",
-    "How often do you use social media? / Berapa kerap anda menggunakan media sosial?": "Social_Media_Use_Frequency",
-    "Platforms you use most often (select all) / Platform yang paling kerap anda gunakan (pilih semua):": "Platforms_Most_Often_Used",
-    "I have been feeling stressed or overwhelmed with assignments. / Saya telah berasa tertekan atau terbeban dengan tugasan.": "Assignments_Stress",
-    "I often feel anxious about my academic workload. / Saya sering berasa bimbang tentang beban kerja akademik saya.": "Academic_Workload_Anxiety",
-    "I have difficulty sleeping due to university-related pressure. / Saya sukar tidur kerana tekanan berkaitan universiti.": "Difficulty_Sleeping_University_Pressure",
-    "I feel supported by friends or family when I am stressed. / Saya berasa disokong oleh rakan atau keluarga apabila saya tertekan.": "Friends_Family_Support",
-    "I can manage my emotions well during stressful periods. / Saya boleh menguruskan emosi saya dengan baik semasa tempoh tekanan.": "Manage_Emotion_Stressful_Periods",
-    "I use social media to relax or escape from academic stress. / Saya menggunakan media sosial untuk berehat atau melarikan diri daripada tekanan akademik.": "Social_Media_Relaxation",
-    "I feel emotionally connected to my social media accounts. / Saya berasa tersambung secara emosi dengan akaun media sosial saya.": "Emotional_Connection_Social_Media",
-    "Using social media is an important part of my daily routine. / Menggunakan media sosial adalah bahagian penting dalam rutin harian saya.": "Social_Media_Daily_Routine",
-    "I sometimes lose track of time when using social media. / Saya kadang-kadang terlepas masa apabila menggunakan media sosial.": "Social_Media_Waste_Time",
-    "Social media has affected my sleep (sleeping late or difficulty sleeping). / Media sosial telah menjejaskan tidur saya (tidur lewat atau sukar tidur).": "Sleep_Affected_By_Social_Media",
-    "Social media affects my ability to concentrate on studies. / Media sosial menjejaskan keupayaan saya untuk menumpukan perhatian kepada pelajaran.": "Studies_Affected_By_Social_Media",
-    "I use the Internet to look for mental health information (e.g., coping tips, stress-relief content). / Saya menggunakan Internet untuk mencari maklumat kesihatan mental (cth., petua mengatasi tekanan, kandungan melegakan tekanan).": "Mental_Health_Info_Through_Internet",
-    "I have come across upsetting or disturbing content online. / Saya telah menemui kandungan yang menjengkelkan atau mengganggu dalam talian.": "Across_Upsetting_Content_Online",
-    "When I feel stressed, I prefer to seek help online rather than talk to someone in person. / Apabila saya berasa tertekan, saya lebih suka mencari bantuan dalam talian daripada bercakap dengan seseorang secara peribadi.": "Seek_Help_Online_When_Stress",
-    "I know where to find reliable mental health information online. / Saya tahu di mana untuk mencari maklumat kesihatan mental yang boleh dipercayai dalam talian.": "Find_Mental_Health_Info_Online",
-    "I follow accounts that post motivational or mental health content. / Saya mengikuti akaun yang menyiarkan kandungan motivasi atau kesihatan mental.": "Follow_Motivational_Mental_Health_Content",
-    "I use online communities for academic or emotional support. / Saya menggunakan komuniti dalam talian untuk sokongan akademik atau emosi.": "Use_Online_Communities_for_Support",
-    "Social media has a generally positive impact on my wellbeing. / Media sosial secara amnya mempunyai kesan positif terhadap kesejahteraan saya.": "Social_Media_Positive_Impact_on_Wellbeing",
-    "Social media has a generally negative impact on my wellbeing. / Media sosial secara amnya mempunyai kesan negatif terhadap kesejahteraan saya.": "Social_Media_Negative_Impact_on_Wellbeing",
-    "Do you think universities should provide more online mental health resources? / Adakah anda fikir universiti harus menyediakan lebih banyak sumber kesihatan mental dalam talian?": "Do you think universities should provide more online mental health resources?",
-    "What type of online content affects you the most (positive or negative)? / Apakah jenis kandungan dalam talian yang paling mempengaruhi anda (positif atau negatif)?": "Type_of_Online_Content_Affects",
-    "What do you think universities can do to support student wellbeing? / Pada pendapat anda, apakah yang boleh dilakukan oleh universiti untuk menyokong kesejahteraan pelajar?": "Universities_Support_Actions"
-})
+df, responses, filter_index = load_indexed_survey()
 
 # ================= OVERALL (UNFILTERED) DISTRIBUTION =================
 st.header("Overall Social Media Usage (All Respondents)")
@@ -339,26 +300,70 @@ else:
     col4.metric("Most Common Social Media Usage (/Day)", "N/A", help="No data available")
 # --- Dataset Preview ---
 with st.expander("View Dataset Preview"):
-    st.dataframe(df.head(20), use_container_width=True)
+    st.dataframe(df[answer_columns(df)].head(20), width="stretch")
+    status = data_status()
+    st.caption(
+        f"{status['wave']} · data version {status['version']} (from {status['source']}) · "
+        f"{status.get('encoding_repairs', 0):,} cells repaired for encoding issues"
+        + (f" · streamed in {status['chunks']:,} chunks" if status.get("streamed") else "")
+    )
+    if status.get("unmatched_headers"):
+        st.caption(
+            "Kept under their own names (another question already matches their column): "
+            + "; ".join(status["unmatched_headers"])
+        )
+    if status["progress"] is not None:
+        st.caption(f"Refresh in progress: {status['progress']['respondents']:,} responses ingested so far")
+
+# --- Quarantined Responses ---
+if status.get("quarantined", 0):
+    with st.expander(f"Quarantined Responses ({status['quarantined']:,})"):
+        st.caption("Rows that failed validation at ingest and are excluded from every chart.")
+        st.dataframe(load_quarantine(), width="stretch")
+
+# --- Ingestion Diagnostics ---
+telemetry = status.get("telemetry")
+if telemetry:
+    with st.expander("Ingestion Diagnostics"):
+        st.caption(
+            f"Last {telemetry['trigger'].replace('_', ' ')} at {telemetry['at']} "
+            f"via the {telemetry['path'] or 'unknown'} path: {telemetry['seconds']:.2f}s total"
+            + (f" — failed: {telemetry['error']}" if telemetry["error"] else "")
+        )
+        stages_df = pd.DataFrame(telemetry["stages"])
+        if not stages_df.empty:
+            stages_df = stages_df.rename(columns={
+                "stage": "Stage",
+                "seconds": "Wall Time (s)",
+                "calls": "Calls",
+                "rows": "Rows",
+                "bytes": "Bytes",
+                "peak_mb": "Peak Memory (MB)"
+            })
+            st.dataframe(stages_df, width="stretch", hide_index=True)
 
 st.markdown("---")
 
 overall_counts = df["Social_Media_Use_Frequency"].value_counts(sort=False)
 
-fig_overall = px.bar(
-    x=overall_counts.index,
-    y=overall_counts.values,
-    labels={
-        "x": "Hours per Day",
-        "y": "Number of Students"
-    },
-    title="Overall Distribution of Daily Social Media Usage",
-    color=overall_counts.index,
-    color_discrete_sequence=px.colors.qualitative.Set2
-)
+def overall_usage_chart():
+    fig_overall = px.bar(
+        x=overall_counts.index,
+        y=overall_counts.values,
+        labels={
+            "x": "Hours per Day",
+            "y": "Number of Students"
+        },
+        title="Overall Distribution of Daily Social Media Usage",
+        color=overall_counts.index,
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+
+    fig_overall.update_layout(xaxis_tickangle=-30)
+    return fig_overall
 
-fig_overall.update_layout(xaxis_tickangle=-30)
-st.plotly_chart(fig_overall, use_container_width=True)
+# Whole wave; drawn once the theme toggle below is read
+overall_usage_slot = st.empty()
 
 st.info(
     "This chart represents the **entire respondent population** without any filters applied. "
@@ -367,131 +372,7 @@ st.info(
 
 st.markdown("---")
 
-# Fix encoding issues
-df = df.replace({"â\x80\x93": "-", "–": "-", "—": "-"}, regex=True)
-
-# Drop Irrelevant Columns
-cols_to_drop = [
-    "Timestamp",
-    "Type_of_Online_Content_Affects",
-    "Universities_Support_Actions"
-]
-
-df = df.drop(columns=cols_to_drop, errors="ignore")
-df_numeric = df.copy()
-
 # ============ INDIVIDUAL PART FILTERING AND MAPPING ============
-# ----------- AISHAH SAKINAH -----------
-
-# Likert-scale columns (1–5)
-LIKERT_COLS = [
-    'Assignments_Stress',
-    'Academic_Workload_Anxiety',
-    'Difficulty_Sleeping_University_Pressure',
-    'Friends_Family_Support',
-    'Manage_Emotion_Stressful_Periods',
-    'Social_Media_Relaxation',
-    'Emotional_Connection_Social_Media',
-    'Social_Media_Daily_Routine',
-    'Social_Media_Waste_Time',
-    'Sleep_Affected_By_Social_Media',
-    'Studies_Affected_By_Social_Media',
-    'Seek_Help_Online_When_Stress',
-    'Social_Media_Positive_Impact_on_Wellbeing',
-    'Social_Media_Negative_Impact_on_Wellbeing'
-]
-
-
-# Numeric Likert Columns
-for col in LIKERT_COLS:
-    if col in df_numeric.columns:
-        df_numeric[col + "_Numeric"] = pd.to_numeric(
-            df_numeric[col],
-            errors="coerce"
-        )
-
-# Frequency-scale columns (1–4)
-FREQ_COLS = [
-    'Mental_Health_Info_Through_Internet',
-    'Use_Online_Communities_for_Support',
-    'Across_Upsetting_Content_Online'
-]
-
-# Frequency mapping
-freq_map = {
-    "Never": 1,
-    "Rarely": 2,
-    "Sometimes": 3,
-    "Often": 4
-}
-
-# Frequency (1–4)
-for col in FREQ_COLS:
-    if col in df_numeric.columns:
-        df_numeric[col + "_Numeric"] = (
-            df_numeric[col].astype(str).str.strip().map(freq_map)
-        )
-    
-# Study hours
-df_numeric["Study_Hours_Numeric"] = df_numeric["Hours_Study_per_Week"].map({
-    "Less than 5 hours": 2.5,
-    "5 to 10 hours": 7.5,
-    "11 to 15 hours": 13,
-    "16 to 20 hours": 18,
-    "More than 20 hours": 22.5
-})
-
-# Social media hours
-df_numeric["Social_Media_Hours_Numeric"] = df_numeric["Social_Media_Use_Frequency"].map({
-    "Less than 1 hour per day": 0.5,
-    "1 to 2 hours per day": 1.5,
-    "3 to 4 hours per day": 3.5,
-    "5 to 6 hours per day": 5.5,
-    "More than 6 hours per day": 7
-})
-
-# Academic performance mapping
-academic_map = {
-    "Below Average": 1,
-    "Average": 2,
-    "Good": 3,
-    "Excellent": 4
-}
-
-# Academic performance numeric
-df_numeric["General_Academic_Performance_Numeric"] = (
-    df_numeric["General_Academic_Performance"]
-    .astype(str)
-    .str.strip()
-    .replace({
-        "Excellent ": "Excellent",
-        "Good ": "Good"
-    })
-    .map(academic_map)
-)
-
-# Academic Stress Index
-df_numeric["Academic_Stress_Index"] = df_numeric[
-    [
-        "Assignments_Stress_Numeric",
-        "Academic_Workload_Anxiety_Numeric",
-        "Difficulty_Sleeping_University_Pressure_Numeric"
-    ]
-].mean(axis=1)
-
-# ----- CATEGORICAL ORDER -----
-df["Social_Media_Use_Frequency"] = pd.Categorical(
-    df["Social_Media_Use_Frequency"],
-    categories=[
-        "Less than 1 hour per day",
-        "1 to 2 hours per day",
-        "3 to 4 hours per day",
-        "5 to 6 hours per day",
-        "More than 6 hours per day"
-    ],
-    ordered=True
-)
-
 # ----------- ILYA -----------
 # Re-apply short label mapping to 'Social_Media_Use_Frequency'
 short_label_map_for_df = {
@@ -503,18 +384,16 @@ short_label_map_for_df = {
 }
 df["Social_Media_Use_Frequency"] = df["Social_Media_Use_Frequency"].map(short_label_map_for_df)
 
+
+def short_usage_labels(data):
+    # Filter panels get the wave's rows as loaded; label them as df is here.
+    return data.assign(Social_Media_Use_Frequency=data["Social_Media_Use_Frequency"].map(short_label_map_for_df))
+
 # Create df_for_analysis by dropping the 'Platforms_Most_Often_Used' column
-df_for_analysis = df.drop(columns=['Platforms_Most_Often_Used']).copy()
-
-# Define numerical mapping for Social Media Use Frequency
-social_media_hours_map = {
-    "< 1 hr": 0.5,
-    "1–2 hrs": 1.5,
-    "3–4 hrs": 3.5,
-    "5–6 hrs": 5.5,
-    "> 6 hrs": 7
-}
-df_for_analysis["Daily_Internet_Usage_Hours"] = df_for_analysis["Social_Media_Use_Frequency"].map(social_media_hours_map)
+df_for_analysis = df.drop(columns=['Platforms_Most_Often_Used'])
+
+# Numeric Social Media Use Frequency (shared encoding, see survey_schema)
+df_for_analysis["Daily_Internet_Usage_Hours"] = df["Social_Media_Hours_Numeric"]
 
 # Define mental health related columns and convert them to numeric
 mental_health_cols = [
@@ -525,7 +404,7 @@ mental_health_cols = [
 ]
 
 for col in mental_health_cols:
-    df_for_analysis[col] = pd.to_numeric(df_for_analysis[col])
+    df_for_analysis[col] = df[col + "_Numeric"]
 
 # Map mental health factor names for better legend readability
 mental_health_factor_map = {
@@ -549,39 +428,8 @@ df_melted = df_for_analysis.melt(
 
 df_melted['Mental_Health_Factor'] = df_melted['Mental_Health_Factor'].map(mental_health_factor_map)
 
-# Group by internet usage and mental health factor, then calculate the mean score
-df_grouped = df_melted.groupby(['Daily_Internet_Usage_Hours', 'Mental_Health_Factor'])['Score'].mean().reset_index()
-
 # ----------- HANIS NABILA -----------
 
-likert_numeric_map = {
-    '1': 1,
-    '2': 2,
-    '3': 3,
-    '4': 4,
-    '5': 5
-}
-
-yes_no_map = {
-    'Yes': 1,
-    'No': 0
-}
-
-freq_map = {
-    'Never': 1,
-    'Rarely': 2,
-    'Sometimes': 3,
-    'Often': 4
-}
-
-df['Find_Mental_Health_Info_Online_Numeric'] = (
-df['Find_Mental_Health_Info_Online'].astype(str).map(yes_no_map)
-)
-
-df['Use_Online_Communities_for_Support_Numeric'] = (
-df['Use_Online_Communities_for_Support'].astype(str).map(freq_map)
-)
-
 columns_to_keep = [
     'Gender',
     'Find_Mental_Health_Info_Online',
@@ -591,17 +439,6 @@ columns_to_keep = [
     'Follow_Motivational_Mental_Health_Content',
     'Mental_Health_Info_Through_Internet'
 ]
-
-# Likert-scale (1–5)
-likert_cols = [
-    'Seek_Help_Online_When_Stress',
-    'Assignments_Stress',
-    'Follow_Motivational_Mental_Health_Content',
-    'Mental_Health_Info_Through_Internet'
-]
-
-for col in likert_cols:
-    df[col + "_Numeric"] = df[col].astype(str).map(likert_numeric_map)
     
 # ----------- AINUN -----------
 
@@ -609,20 +446,20 @@ for col in likert_cols:
 
 # Mapping Gender
 gender_map = {0: 'Female', 1: 'Male', 2: 'Other'}
-df['Gender_Num'] = df['Gender'].map({'Female': 0, 'Male': 1, 'Other': 2}).fillna(2)
+df['Gender_Num'] = df['Gender'].astype(str).map({'Female': 0, 'Male': 1, 'Other': 2}).fillna(2)
 
 # Mapping Year of Study
 year_map = {1: 'Year 1', 2: 'Year 2', 3: 'Year 3', 4: 'Year 4', 5: 'Year 5', 0: 'Unknown'}
-df['Year_of_Study_Num'] = df['Year_of_Study'].map({'Year 1': 1, 'Year 2': 2, 'Year 3': 3, 'Year 4': 4, 'Year 5': 5}).fillna(0)
+df['Year_of_Study_Num'] = df['Year_of_Study'].astype(str).map({'Year 1': 1, 'Year 2': 2, 'Year 3': 3, 'Year 4': 4, 'Year 5': 5}).fillna(0)
 
 # Mapping Living Situation
 living_map = {0: 'With family', 1: 'On-campus', 2: 'Off-campus', 3: 'Other'}
-df['Current_Living_Situation_Num'] = df['Current_Living_Situation'].map({
+df['Current_Living_Situation_Num'] = df['Current_Living_Situation'].astype(str).map({
     'With family': 0, 'On-campus': 1, 'Off-campus (rental)': 2, 'Off-campus': 2, 'Other': 3
 }).fillna(3)
 
 # Mapping Employment (Clean string variations from CSV)
-df['Employment_Status_Num'] = df['Employment_Status'].map({
+df['Employment_Status_Num'] = df['Employment_Status'].astype(str).map({
     'Full-time student': 3,
     'In paid employment (including part-time, self-employed)': 2,
     'Internship': 1,
@@ -637,27 +474,13 @@ df['Social_Media_Positive_Impact_on_Wellbeing_Num'] = df['Social_Media_Positive_
 
 # Mapping Race
 race_map = {0: 'Malay', 1: 'Chinese', 2: 'Indian', 3: 'Other'}
-df['Race_Num'] = df['Race'].map({'Malay': 0, 'Chinese': 1, 'Indian': 2, 'Others': 3, 'Other': 3}).fillna(3)
-
-# --- NEW: Mapping Difficulty Sleeping Due to University Pressure to 5-point Likert ---
-sleep_map = {
-    'Strongly disagree': 1,
-    'Disagree': 2,
-    'Neutral': 3,
-    'Agree': 4,
-    'Strongly agree': 5
-}
-df['Difficulty_Sleeping_University_Pressure_Num'] = df['Difficulty_Sleeping_University_Pressure'].map(sleep_map).fillna(3)
-
-# --- NEW: Mapping Social Media Daily Routine to 5-point Likert ---
-routine_map = {
-    'Strongly disagree': 1,
-    'Disagree': 2,
-    'Neutral': 3,
-    'Agree': 4,
-    'Strongly agree': 5
-}
-df['Social_Media_Daily_Routine_Num'] = df['Social_Media_Daily_Routine'].map(routine_map).fillna(3)
+df['Race_Num'] = df['Race'].astype(str).map({'Malay': 0, 'Chinese': 1, 'Indian': 2, 'Others': 3, 'Other': 3}).fillna(3)
+
+# --- NEW: Difficulty Sleeping Due to University Pressure on the 5-point Likert scale ---
+df['Difficulty_Sleeping_University_Pressure_Num'] = df['Difficulty_Sleeping_University_Pressure_Numeric'].fillna(3)
+
+# --- NEW: Social Media Daily Routine on the 5-point Likert scale ---
+df['Social_Media_Daily_Routine_Num'] = df['Social_Media_Daily_Routine_Numeric'].fillna(3)
 
 # --- DATA FILTERING FOR VISUALIZATIONS ---
 
@@ -674,95 +497,41 @@ with st.sidebar:
     
     # --- Data Summary ---
     st.markdown("### 🧾 Data Summary")
-    st.info(f"*Total Records:* {len(df):,}\n\n*Columns:* {len(df.columns)}")
+    st.info(f"*Total Records:* {len(df):,}\n\n*Columns:* {len(answer_columns(df))}")
 
     # --- Filters Section ---
     with st.expander("Filter Options", expanded=True):
         st.markdown("Select filters to refine your dashboard view:")
 
-        # --- Gender ---
-        gender_filter = st.multiselect(
-            "Gender",
-            options=sorted(df["Gender"].dropna().unique()),
-            default=[]
-        )
-
-        # --- Year of Study ---
-        year_filter = st.multiselect(
-            "Year of Study",
-            options=sorted(df["Year_of_Study"].dropna().unique()),
-            default=[]
-        )
-
-        # --- Programme ---
-        programme_filter = st.multiselect(
-            "Programme of Study",
-            options=sorted(df["Programme_of_Study"].dropna().unique()),
-            default=[]
-        )
-
-        # --- Social Media Usage ---
-        sm_filter = st.multiselect(
-            "Social Media Usage (Hours / Day)",
-            options=list(df["Social_Media_Use_Frequency"].cat.categories),
-            default=[]
-        )
-
-        # --- Age Filter (KEEP THIS) ---
-        min_age, max_age = st.slider(
-            "Age Range",
-            int(df["Age"].min()),
-            int(df["Age"].max()),
-            (int(df["Age"].min()), int(df["Age"].max()))
-        )
+        filters = filter_sidebar(filter_index, labels={"Social_Media_Use_Frequency": short_label_map_for_df})
 
         # ===== APPLY FILTERS =====
-        filtered_df = df.copy()
-        filtered_numeric = df_numeric.copy()
-
-        if gender_filter:
-            filtered_df = filtered_df[filtered_df["Gender"].isin(gender_filter)]
-            filtered_numeric = filtered_numeric.loc[filtered_df.index]
-
-        if year_filter:
-            filtered_df = filtered_df[filtered_df["Year_of_Study"].isin(year_filter)]
-            filtered_numeric = filtered_numeric.loc[filtered_df.index]
-
-        if programme_filter:
-            filtered_df = filtered_df[filtered_df["Programme_of_Study"].isin(programme_filter)]
-            filtered_numeric = filtered_numeric.loc[filtered_df.index]
-
-        if sm_filter:
-            filtered_df = filtered_df[filtered_df["Social_Media_Use_Frequency"].isin(sm_filter)]
-            filtered_numeric = filtered_numeric.loc[filtered_df.index]
-
-        filtered_df = filtered_df[
-            (filtered_df["Age"] >= min_age) &
-            (filtered_df["Age"] <= max_age)
-        ]
-        filtered_numeric = filtered_numeric.loc[filtered_df.index]
+        # One mask from the bitmap index (memoized across sessions), narrowed by
+        # any chart selection, applied once
+        row_mask, kpis = resolve_chart_filters(filter_index, filters, "home")
+        filtered_df = apply_mask(df, row_mask)
+        filtered_responses = apply_mask(responses, row_mask)
         
         # ===== REAL-TIME SUMMARY CALCULATIONS =====
-        sample_size = len(filtered_df)
+        sample_size = kpis["respondents"]
 
-        avg_usage = filtered_numeric["Social_Media_Hours_Numeric"].mean()
-        avg_stress = filtered_numeric["Academic_Stress_Index"].mean()
-        avg_positive = filtered_numeric["Social_Media_Positive_Impact_on_Wellbeing_Numeric"].mean()
-        avg_negative = filtered_numeric["Social_Media_Negative_Impact_on_Wellbeing_Numeric"].mean()
+        avg_usage = kpis["avg_social_media_hours"]
+        avg_stress = kpis["avg_stress_index"]
+        avg_positive = kpis["avg_positive_impact"]
+        avg_negative = kpis["avg_negative_impact"]
 
 
     # --- Reset and Download Buttons ---
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Reset Filters"):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            reset_filters()
             st.rerun()
 
     with col2:
         st.download_button(
             label="Download CSV",
-            data=filtered_df.to_csv(index=False).encode("utf-8"),
+            data=filtered_df[answer_columns(filtered_df)].to_csv(index=False).encode("utf-8"),
             file_name="students_data.csv",
             mime="text/csv"
         )
@@ -770,6 +539,11 @@ with st.sidebar:
 
 # ===== THEME TOGGLE =====
 theme_mode = st.sidebar.radio("Select Theme Mode", ["Light 🌞", "Dark 🌙"], horizontal=True)
+plot_theme = "dark" if theme_mode == "Dark 🌙" else "light"
+overall_usage_slot.plotly_chart(
+    panel_figure(filter_index, "home/overall_usage", overall_usage_chart, theme=plot_theme),
+    width="stretch"
+)
 
 if theme_mode == "Dark 🌙":
     st.markdown("""
@@ -793,6 +567,7 @@ CONTINUOUS_SCALE = "RdYlBu_r"
 
 
 # --- TAB LAYOUT ---
+chart_filter_notice("home")
 tab1, tab2, tab3, tab4 = st.tabs(["📊 Internet Use vs. Mental Health", "Ilya", "Help-Seeking Behavior", "Ainun"])
 
 # ============ INDIVIDUAL PART VISUALIZATION ============
@@ -805,7 +580,7 @@ with tab1:
 
     # Summary box
     col1, col2, col3, col4 = st.columns(4)
-    valid_stress = filtered_numeric["Academic_Stress_Index"].dropna()
+    valid_stress = filtered_df["Academic_Stress_Index"].dropna()
 
     # Create age ranges
     age_bins = [0, 18, 20, 22, 24, 100]
@@ -813,13 +588,13 @@ with tab1:
     df["Age_Range"] = pd.cut(df["Age"], bins=age_bins, labels=age_labels, right=True)
     most_common_age_range = df["Age_Range"].mode()[0]
 
-    col1.metric("Total Students", f"{len(filtered_df):,}", help="PLO 1: Total Students Records", border=True)
+    col1.metric("Total Students", f"{kpis['respondents']:,}", help="PLO 1: Total Students Records", border=True)
     col2.metric("Most Common Age Range", most_common_age_range, help="PLO 2: Most Common Students Age Group", border=True)
     if not valid_stress.empty:
         col3.metric("Avg. Stress Index", f"{valid_stress.mean():.2f}", border=True)
     else:
         col3.metric("Avg Stress Index", "N/A", help="No valid stress index data after filtering", border=True)
-    col4.metric("High Usage (%)", f"{(filtered_df['Social_Media_Use_Frequency'].isin(['5 to 6 hours per day', 'More than 6 hours per day']).mean() * 100):.1f}%", border=True)
+    col4.metric("High Usage (%)", f"{kpis['high_usage_share'] * 100:.1f}%", border=True)
 
     # Scientific Summary
     # ===== REAL-TIME SCIENTIFIC SUMMARY =====
@@ -847,10 +622,10 @@ with tab1:
 
         # Summary box
         freq_order = df["Social_Media_Use_Frequency"].cat.categories
-        median_usage = filtered_numeric["Social_Media_Hours_Numeric"].median()
-        high_usage_pct = (filtered_df["Social_Media_Use_Frequency"].isin(["5 to 6 hours per day", "More than 6 hours per day"]).mean() * 100)
-        avg_study_hours = filtered_numeric["Study_Hours_Numeric"].mean()
-        time_waste_pct = (filtered_df["Social_Media_Waste_Time"].isin(["Agree", "Strongly Agree"]).mean() * 100)
+        median_usage = filtered_df["Social_Media_Hours_Numeric"].median()
+        high_usage_pct = kpis["high_usage_share"] * 100
+        avg_study_hours = filtered_df["Study_Hours_Numeric"].mean()
+        time_waste_pct = item_share_at_least(filtered_responses, "Social_Media_Waste_Time", 4) * 100
         usage_counts = (filtered_df["Social_Media_Use_Frequency"].value_counts().reindex(freq_order, fill_value=0))
         total_students = usage_counts.sum()
 
@@ -866,30 +641,35 @@ with tab1:
         st.info(
             usage_summary(
                 len(filtered_df),
-                filtered_numeric["Social_Media_Hours_Numeric"].median(),
-                (filtered_df["Social_Media_Use_Frequency"]
-                 .isin(["5 to 6 hours per day", "More than 6 hours per day"])
-                 .mean() * 100),
-                filtered_numeric["Study_Hours_Numeric"].mean()
+                filtered_df["Social_Media_Hours_Numeric"].median(),
+                kpis["high_usage_share"] * 100,
+                filtered_df["Study_Hours_Numeric"].mean()
             )
         )
 
         st.markdown("---")
         
-        # Bar Chart
-        fig = px.bar(
-            x=usage_counts.index,
-            y=usage_counts.values,
-            title="Distribution of Daily Social Media Usage",
-            labels={
-                "x": "Hours per Day",
-                "y": "Number of Students"
-            },
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
+        # Bar Chart (click or box-select bars to narrow the rest of the page)
+        def usage_chart(row_mask):
+            counts = apply_mask(df, row_mask)["Social_Media_Use_Frequency"].value_counts().reindex(freq_order, fill_value=0)
+            fig = px.bar(
+                x=counts.index,
+                y=counts.values,
+                title="Distribution of Daily Social Media Usage",
+                labels={
+                    "x": "Hours per Day",
+                    "y": "Number of Students"
+                },
+                color_discrete_sequence=px.colors.qualitative.Set2
+            )
 
-        fig.update_layout(xaxis_tickangle=-30)
-        st.plotly_chart(fig, width="stretch")
+            fig.update_layout(xaxis_tickangle=-30)
+            return fig
+
+        cross_filter_chart(
+            filter_index, filters, "home", "usage", "Social_Media_Use_Frequency", usage_chart,
+            labels=short_label_map_for_df, theme=plot_theme
+        )
 
         st.info(
             bar_distribution_summary(
@@ -906,15 +686,18 @@ with tab1:
             "11 to 15 hours", "16 to 20 hours", "More than 20 hours"
         ]
 
-        fig = px.bar(
-            filtered_df["Hours_Study_per_Week"].value_counts().reindex(study_order),
-            title="Frequency of Study Hours per Week",
-            labels={"value": "Number of Students", "index": "Study Hours"},
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
+        def study_hours_chart(data):
+            fig = px.bar(
+                data["Hours_Study_per_Week"].value_counts().reindex(study_order),
+                title="Frequency of Study Hours per Week",
+                labels={"value": "Number of Students", "index": "Study Hours"},
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+
+            fig.update_layout(xaxis_tickangle=-25)
+            return fig
 
-        fig.update_layout(xaxis_tickangle=-25)
-        st.plotly_chart(fig, width="stretch")
+        st.plotly_chart(filter_panel(filter_index, filters, "home/study_hours", study_hours_chart, plot_theme, page="home"), width="stretch")
         usage_counts = filtered_df["Social_Media_Use_Frequency"].value_counts()
         dominant_group = usage_counts.idxmax()
 
@@ -928,19 +711,24 @@ with tab1:
         )
 
         # Box Plot
-        fig = px.box(
-            filtered_df,
-            x="Gender",
-            y="Social_Media_Use_Frequency",
-            title="Social Media Usage by Gender",
-            color="Gender",
-            color_discrete_sequence=px.colors.qualitative.Safe
+        st.plotly_chart(
+            filter_panel(
+                filter_index, filters, "home/usage_by_gender",
+                lambda data: px.box(
+                    short_usage_labels(data),
+                    x="Gender",
+                    y="Social_Media_Use_Frequency",
+                    title="Social Media Usage by Gender",
+                    color="Gender",
+                    color_discrete_sequence=px.colors.qualitative.Safe
+                ),
+                plot_theme, page="home"
+            ),
+            width="stretch"
         )
-
-        st.plotly_chart(fig, width="stretch")
         st.info(
             boxplot_summary(
-                filtered_numeric,
+                filtered_df,
                 "Gender",
                 "Social_Media_Hours_Numeric"
             )
@@ -948,23 +736,24 @@ with tab1:
 
 
         # Histogram
-        fig = px.histogram(
-            filtered_df,
-            title="Perception of Wasting Time on Social Media",
-            x="Social_Media_Waste_Time",
-            color_discrete_sequence=COLOR_SEQ,
-            category_orders={"Social_Media_Waste_Time": [
-            "Strongly Disagree","Disagree","Neutral","Agree","Strongly Agree"
-            ]}
-        )
+        def waste_time_chart(data):
+            fig = px.histogram(
+                data,
+                title="Perception of Wasting Time on Social Media",
+                x="Social_Media_Waste_Time",
+                color_discrete_sequence=COLOR_SEQ,
+                category_orders={"Social_Media_Waste_Time": [
+                "Strongly Disagree","Disagree","Neutral","Agree","Strongly Agree"
+                ]}
+            )
 
-        fig.update_layout(
-            xaxis_title="Response Level",
-            yaxis_title="Number of Students",
-            template="plotly_white"
-        )
+            fig.update_layout(
+                xaxis_title="Response Level",
+                yaxis_title="Number of Students"
+            )
+            return fig
 
-        st.plotly_chart(fig, width="stretch")
+        st.plotly_chart(filter_panel(filter_index, filters, "home/waste_time", waste_time_chart, plot_theme, page="home"), width="stretch")
         st.info(
             likert_summary(
                 filtered_df["Social_Media_Waste_Time"]
@@ -972,22 +761,25 @@ with tab1:
         )
 
         # Pie Donut
-        resource_counts = filtered_df[
-            'Do you think universities should provide more online mental health resources?'
-        ].value_counts().reset_index()
-
-        resource_counts.columns = ["Response", "Count"]
+        def resources_chart(data):
+            resource_counts = data[
+                'Do you think universities should provide more online mental health resources?'
+            ].value_counts().reset_index()
+
+            resource_counts.columns = ["Response", "Count"]
+
+            fig = px.pie(
+                resource_counts,
+                names="Response",
+                values="Count",
+                hole=0.45,
+                color_discrete_sequence=COLOR_SEQ,
+                title="Need for Online Mental Health Resources"
+            )
+            fig.update_traces(textposition="inside", textinfo="percent+label")
+            return fig
 
-        fig = px.pie(
-            resource_counts,
-            names="Response",
-            values="Count",
-            hole=0.45,
-            color_discrete_sequence=COLOR_SEQ,
-            title="Need for Online Mental Health Resources"
-        )
-        fig.update_traces(textposition="inside", textinfo="percent+label")
-        st.plotly_chart(fig, width="stretch")
+        st.plotly_chart(filter_panel(filter_index, filters, "home/resources", resources_chart, plot_theme, page="home"), width="stretch")
 
         resource_counts = filtered_df[
             "Do you think universities should provide more online mental health resources?"
@@ -1014,14 +806,14 @@ with tab1:
 
         # Summary box
         col1, col2, col3, col4 = st.columns(4)
-        study_impact = filtered_numeric["Studies_Affected_By_Social_Media_Numeric"].dropna()
-        academic_perf = filtered_numeric["General_Academic_Performance_Numeric"].dropna()
-        study_hours = filtered_numeric["Study_Hours_Numeric"].dropna()
-        high_users_pct = (filtered_df["Social_Media_Use_Frequency"].isin(["5 to 6 hours per day", "More than 6 hours per day"]).mean() * 100)
-        sleep_pct = (filtered_numeric["Sleep_Affected_By_Social_Media_Numeric"] >= 4).mean() * 100
-        corr_val = safe_corr(filtered_numeric, "Social_Media_Hours_Numeric", "Assignments_Stress_Numeric")
+        study_impact = item_means(filtered_responses, ["Studies_Affected_By_Social_Media"])[0]
+        academic_perf = filtered_df["General_Academic_Performance_Numeric"].dropna()
+        study_hours = filtered_df["Study_Hours_Numeric"].dropna()
+        high_users_pct = kpis["high_usage_share"] * 100
+        sleep_pct = item_share_at_least(filtered_responses, "Sleep_Affected_By_Social_Media", 4) * 100
+        corr_val = safe_corr(filtered_df, "Social_Media_Hours_Numeric", "Assignments_Stress_Numeric")
     
-        col1.metric("Study Impact (%)", f"{(study_impact.mean()/5*100):.1f}%" if not study_impact.empty else "N/A", help="Average perceived impact of social media on studies", border=True)
+        col1.metric("Study Impact (%)", f"{(study_impact/5*100):.1f}%" if not np.isnan(study_impact) else "N/A", help="Average perceived impact of social media on studies", border=True)
         col2.metric("Avg. Academic Performance", f"{academic_perf.mean():.2f}" if not academic_perf.empty else "N/A", help="Numeric scale: 1=Below Avg → 4=Excellent", border=True)
         col3.metric("High Usage Students (%)", f"{high_users_pct:.1f}%", help="Students using ≥5 hours/day", border=True)
         col4.metric("Avg. Weekly Study Hours", f"{study_hours.mean():.1f}" if not study_hours.empty else "N/A", help="Self-reported weekly study time", border=True)
@@ -1031,7 +823,7 @@ with tab1:
 
         st.info(
             academic_summary(
-                (study_impact.mean()/5*100),
+                (study_impact/5*100),
                 academic_perf.mean(),
                 high_users_pct,
                 study_hours.mean()
@@ -1042,84 +834,91 @@ with tab1:
         st.markdown("---")
 
         # Bar Chart
-        academic_numeric = filtered_numeric.dropna(
-            subset=["Academic_Stress_Index"]
-        )
-
-
-        usage_group_mean = (
-            filtered_numeric
-            .groupby("Social_Media_Use_Frequency", observed=True)
-            ["Academic_Stress_Index"]
-            .mean()
-            .reset_index()
-        )
+        def stress_by_usage_chart(data):
+            usage_group_mean = (
+                short_usage_labels(data)
+                .groupby("Social_Media_Use_Frequency", observed=True)
+                ["Academic_Stress_Index"]
+                .mean()
+                .reset_index()
+            )
 
-        fig = px.bar(
-            usage_group_mean,
-            x="Social_Media_Use_Frequency",
-            y="Academic_Stress_Index",
-            title="Academic Stress vs Social Media Usage",
-            color="Academic_Stress_Index",
-            color_continuous_scale=CONTINUOUS_SCALE
-        )
+            fig = px.bar(
+                usage_group_mean,
+                x="Social_Media_Use_Frequency",
+                y="Academic_Stress_Index",
+                title="Academic Stress vs Social Media Usage",
+                color="Academic_Stress_Index",
+                color_continuous_scale=CONTINUOUS_SCALE
+            )
 
-        fig.update_layout(
-            xaxis_title="Social Media Usage",
-            yaxis_title="Academic Stress Index",
-            template="plotly_white"
-        )
+            fig.update_layout(
+                xaxis_title="Social Media Usage",
+                yaxis_title="Academic Stress Index"
+            )
+            return fig
 
-        st.plotly_chart(fig, width="stretch")
-        mean_stress = usage_group_mean["Academic_Stress_Index"].mean()
+        st.plotly_chart(filter_panel(filter_index, filters, "home/stress_by_usage", stress_by_usage_chart, plot_theme, page="home"), width="stretch")
 
         st.info(bar_chart_summary(filtered_df, "Social_Media_Use_Frequency"))
 
         
-        # Box Plot
-        fig = px.box(
-            df,
-            x="Social_Media_Use_Frequency",
-            y="General_Academic_Performance",
-            title="Social Media Frequency vs Academic Performance",
-            color="Social_Media_Use_Frequency",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        st.plotly_chart(fig, width="stretch")
-        st.info(box_plot_summary(filtered_numeric, "General_Academic_Performance_Numeric"))
-
-        # Box Plot
-        fig = px.box(
-            df_numeric,
-            x="Social_Media_Use_Frequency",
-            y="Sleep_Affected_By_Social_Media",
-            color="Social_Media_Use_Frequency",
-            color_discrete_sequence=COLOR_SEQ
-        )
-
-        fig.update_layout(
-            title="Sleep Disturbance by Social Media Usage",
-            xaxis_title="Usage Frequency",
-            yaxis_title="Sleep Affected Score",
-            template="plotly_white"
+        # Box Plot (whole wave: no mask input)
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "home/performance_by_usage",
+                lambda: px.box(
+                    df,
+                    x="Social_Media_Use_Frequency",
+                    y="General_Academic_Performance",
+                    title="Social Media Frequency vs Academic Performance",
+                    color="Social_Media_Use_Frequency",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
+        st.info(box_plot_summary(filtered_df, "General_Academic_Performance_Numeric"))
+
+        # Box Plot (whole wave)
+        def sleep_by_usage_chart():
+            fig = px.box(
+                df,
+                x="Social_Media_Use_Frequency",
+                y="Sleep_Affected_By_Social_Media",
+                color="Social_Media_Use_Frequency",
+                color_discrete_sequence=COLOR_SEQ
+            )
 
-        st.plotly_chart(fig, width="stretch")
-        st.info(box_plot_summary(filtered_numeric, "Sleep_Affected_By_Social_Media_Numeric"))
-
-        # Scatter Plot
-        fig = px.scatter(
-            df,
-            x="Age",
-            y="Studies_Affected_By_Social_Media",
-            title="Age vs Impact of Social Media on Studies",
-            color="Gender",
-            opacity=0.7,
-            color_discrete_sequence=px.colors.qualitative.Dark2
+            fig.update_layout(
+                title="Sleep Disturbance by Social Media Usage",
+                xaxis_title="Usage Frequency",
+                yaxis_title="Sleep Affected Score"
+            )
+            return fig
+
+        st.plotly_chart(panel_figure(filter_index, "home/sleep_by_usage", sleep_by_usage_chart, theme=plot_theme), width="stretch")
+        st.info(box_plot_summary(filtered_df, "Sleep_Affected_By_Social_Media_Numeric"))
+
+        # Scatter Plot (whole wave)
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "home/age_vs_studies",
+                lambda: px.scatter(
+                    df,
+                    x="Age",
+                    y="Studies_Affected_By_Social_Media",
+                    title="Age vs Impact of Social Media on Studies",
+                    color="Gender",
+                    opacity=0.7,
+                    color_discrete_sequence=px.colors.qualitative.Dark2
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-
-        st.plotly_chart(fig, width="stretch")
-        st.info(scatter_plot_summary(filtered_numeric, "Age", "Studies_Affected_By_Social_Media_Numeric"))
+        st.info(scatter_plot_summary(filtered_df, "Age", "Studies_Affected_By_Social_Media_Numeric"))
 
         st.markdown("#### 💬 Key Insights")
         st.info(
@@ -1136,26 +935,31 @@ with tab1:
 
         # Summary box
         col1, col2, col3, col4 = st.columns(4)
-        stress = filtered_numeric["Assignments_Stress_Numeric"].dropna()
-        sleep = filtered_numeric["Sleep_Affected_By_Social_Media_Numeric"].dropna()
-        emotion = filtered_numeric["Emotional_Connection_Social_Media_Numeric"].dropna()
-        help_seek = filtered_numeric["Seek_Help_Online_When_Stress_Numeric"].dropna()
-        sleep_pct = (filtered_numeric["Sleep_Affected_By_Social_Media_Numeric"] >= 4).mean() * 100
+        stress, sleep, emotion, help_seek = item_means(
+            filtered_responses,
+            [
+                "Assignments_Stress",
+                "Sleep_Affected_By_Social_Media",
+                "Emotional_Connection_Social_Media",
+                "Seek_Help_Online_When_Stress"
+            ]
+        )
+        sleep_pct = item_share_at_least(filtered_responses, "Sleep_Affected_By_Social_Media", 4) * 100
     
-        col1.metric("Avg. Stress Level", f"{stress.mean():.2f}" if not stress.empty else "N/A", border=True)
-        col2.metric("Sleep Affected (%)", f"{(sleep.mean()/5*100):.1f}%" if not sleep.empty else "N/A", border=True)
-        col3.metric("Emotional Attachment", f"{emotion.mean():.2f}" if not emotion.empty else "N/A", border=True)
-        col4.metric("Online Help Seeking (%)", f"{(help_seek.mean()/5*100):.1f}%" if not help_seek.empty else "N/A", border=True)
+        col1.metric("Avg. Stress Level", f"{stress:.2f}" if not np.isnan(stress) else "N/A", border=True)
+        col2.metric("Sleep Affected (%)", f"{(sleep/5*100):.1f}%" if not np.isnan(sleep) else "N/A", border=True)
+        col3.metric("Emotional Attachment", f"{emotion:.2f}" if not np.isnan(emotion) else "N/A", border=True)
+        col4.metric("Online Help Seeking (%)", f"{(help_seek/5*100):.1f}%" if not np.isnan(help_seek) else "N/A", border=True)
 
         # Scientific Summary
         st.markdown("### Real-Time Wellbeing Summary")
 
         st.info(
             wellbeing_summary(
-                stress.mean(),
-                (sleep.mean()/5*100),
-                emotion.mean(),
-                (help_seek.mean()/5*100)
+                stress,
+                (sleep/5*100),
+                emotion,
+                (help_seek/5*100)
             )
         )
 
@@ -1173,24 +977,26 @@ with tab1:
             'Studies_Affected_By_Social_Media'
         ]
 
-        values = df_numeric[categories].mean().tolist()
- 
-        fig = go.Figure(
-            go.Scatterpolar(
-                r=values + [values[0]],
-                theta=categories + [categories[0]],
-                fill='toself',
-                line_color="#636EFA"
+        # Whole wave: no mask input
+        def impact_profile_chart():
+            values = item_means(responses, categories).tolist()
+
+            fig = go.Figure(
+                go.Scatterpolar(
+                    r=values + [values[0]],
+                    theta=categories + [categories[0]],
+                    fill='toself',
+                    line_color="#636EFA"
+                )
             )
-        )
 
-        fig.update_layout(
-            polar=dict(radialaxis=dict(visible=True, range=[1,5])),
-            template="plotly_white"
-        )
+            fig.update_layout(
+                polar=dict(radialaxis=dict(visible=True, range=[1,5]))
+            )
+            return fig
 
-        st.plotly_chart(fig, width="stretch")
-        values = filtered_numeric[categories].mean().tolist()
+        st.plotly_chart(panel_figure(filter_index, "home/impact_profile", impact_profile_chart, theme=plot_theme), width="stretch")
+        values = item_means(filtered_responses, categories).tolist()
 
         st.info(
             radar_summary(
@@ -1208,17 +1014,20 @@ with tab1:
             'Studies_Affected_By_Social_Media_Numeric'
         ]
 
-        parallel_df = filtered_numeric[cols_parallel].dropna()
-
-        fig = px.parallel_coordinates(
-            parallel_df,
-            dimensions=cols_parallel,
-            color='Assignments_Stress_Numeric',
-            color_continuous_scale=CONTINUOUS_SCALE
+        st.plotly_chart(
+            filter_panel(
+                filter_index, filters, "home/wellbeing_parallel",
+                lambda data: px.parallel_coordinates(
+                    data[cols_parallel].dropna(),
+                    dimensions=cols_parallel,
+                    color='Assignments_Stress_Numeric',
+                    color_continuous_scale=CONTINUOUS_SCALE
+                ),
+                plot_theme, page="home"
+            ),
+            width="stretch"
         )
-        fig.update_layout(template="plotly_white")
-        st.plotly_chart(fig, width="stretch")
-        st.info(parallel_chart_summary(filtered_numeric, cols_parallel))
+        st.info(parallel_chart_summary(filtered_df, cols_parallel))
 
        
         st.markdown("#### 💬 Key Insights")
@@ -1236,14 +1045,14 @@ with tab1:
 
         # Summary box
         col1, col2, col3, col4 = st.columns(4)
-        corr_sm_stress = safe_corr(filtered_numeric, "Social_Media_Hours_Numeric", "Assignments_Stress_Numeric")
-        corr_study_stress = safe_corr(filtered_numeric, "Study_Hours_Numeric", "Assignments_Stress_Numeric")
-        impact_gap = (
-            filtered_numeric['Social_Media_Positive_Impact_on_Wellbeing_Numeric'].mean(skipna=True)
-            -
-            filtered_numeric['Social_Media_Negative_Impact_on_Wellbeing_Numeric'].mean(skipna=True)
+        corr_sm_stress = safe_corr(filtered_df, "Social_Media_Hours_Numeric", "Assignments_Stress_Numeric")
+        corr_study_stress = safe_corr(filtered_df, "Study_Hours_Numeric", "Assignments_Stress_Numeric")
+        positive_impact, negative_impact = item_means(
+            filtered_responses,
+            ["Social_Media_Positive_Impact_on_Wellbeing", "Social_Media_Negative_Impact_on_Wellbeing"]
         )
-        support_score = filtered_numeric["Use_Online_Communities_for_Support_Numeric"].dropna()
+        impact_gap = positive_impact - negative_impact
+        support_score = filtered_df["Use_Online_Communities_for_Support_Numeric"].dropna()
 
         col1.metric("Social Media Hours ↔ Stress", f"{corr_sm_stress:.2f}" if corr_sm_stress is not None else "N/A", border=True)
         col2.metric("Study Hours ↔ Stress", f"{corr_study_stress:.2f}" if corr_sm_stress is not None else "N/A", border=True)
@@ -1265,66 +1074,125 @@ with tab1:
 
         st.markdown("---")
 
-        # Heatmap
-        corr = df_numeric[
-            [
-                'Assignments_Stress',
-                'Academic_Workload_Anxiety',
-                'Sleep_Affected_By_Social_Media',
-                'Studies_Affected_By_Social_Media',
-                'Social_Media_Hours_Numeric'
-            ]
-        ].corr()
+        # Heatmap (whole wave)
+        def correlation_chart():
+            corr = df[
+                [
+                    'Assignments_Stress',
+                    'Academic_Workload_Anxiety',
+                    'Sleep_Affected_By_Social_Media',
+                    'Studies_Affected_By_Social_Media',
+                    'Social_Media_Hours_Numeric'
+                ]
+            ].corr()
+
+            fig = px.imshow(
+                corr,
+                text_auto=".2f",
+                color_continuous_scale=CONTINUOUS_SCALE
+            )
 
-        fig = px.imshow(
-            corr,
-            text_auto=".2f",
-            color_continuous_scale=CONTINUOUS_SCALE
-        )
+            fig.update_layout(
+                title="Correlation Between Internet Use & Mental Health"
+            )
+            return fig
+
+        st.plotly_chart(panel_figure(filter_index, "home/correlation", correlation_chart, theme=plot_theme), width="stretch")
+        st.info(heatmap_summary(item_corr(filtered_responses, [col.removesuffix("_Numeric") for col in cols_parallel])))
+
+        # Waterfall Chart (whole wave)
+        def cumulative_impact_chart():
+            mean_vals = item_means(
+                responses,
+                [
+                    'Assignments_Stress',
+                    'Academic_Workload_Anxiety',
+                    'Sleep_Affected_By_Social_Media',
+                    'Studies_Affected_By_Social_Media'
+                ]
+            )
 
-        fig.update_layout(
-            title="Correlation Between Internet Use & Mental Health",
-            template="plotly_white"
+            fig = go.Figure(go.Waterfall(
+                x=[
+                    "Assignments Stress",
+                    "Academic Anxiety",
+                    "Sleep Affected",
+                    "Studies Affected",
+                    "Overall Impact"
+                ],
+                y=[
+                    mean_vals[0],
+                    mean_vals[1],
+                    mean_vals[2],
+                    mean_vals[3],
+                    mean_vals.sum()
+                ],
+                measure=["relative","relative","relative","relative","total"]
+            ))
+
+            fig.update_layout(
+                title="Cumulative Mental Health Impact"
+            )
+            return fig
+
+        st.plotly_chart(panel_figure(filter_index, "home/cumulative_impact", cumulative_impact_chart, theme=plot_theme), width="stretch")
+        st.info(waterfall_summary(filtered_df, col='Gender', value_col='Academic_Stress_Index'))
+
+        # Platform breakdown
+        st.subheader("Platform Breakdown")
+
+        def platform_scores(data):
+            platform_masks = data["Platform_Mask"].to_numpy()
+            return pd.DataFrame({
+                "Avg. Stress Index": platform_means(platform_masks, data["Academic_Stress_Index"]),
+                "Positive Impact": platform_means(platform_masks, data["Social_Media_Positive_Impact_on_Wellbeing_Numeric"]),
+                "Negative Impact": platform_means(platform_masks, data["Social_Media_Negative_Impact_on_Wellbeing_Numeric"])
+            }).dropna(how="all")
+
+        platform_stats = platform_scores(filtered_df)
+
+        st.plotly_chart(
+            filter_panel(
+                filter_index, filters, "home/platform_scores",
+                lambda data: px.bar(
+                    platform_scores(data).reset_index(names="Platform").melt(
+                        id_vars="Platform", var_name="Measure", value_name="Mean Score"
+                    ),
+                    x="Platform",
+                    y="Mean Score",
+                    color="Measure",
+                    barmode="group",
+                    color_discrete_sequence=COLOR_SEQ
+                ),
+                plot_theme, page="home"
+            ),
+            width="stretch"
         )
 
-        st.plotly_chart(fig, width="stretch")
-        st.info(heatmap_summary(filtered_numeric, cols_parallel))
+        def platform_co_usage_chart(data):
+            co_usage = platform_co_usage(data["Platform_Mask"].to_numpy())
+            used = co_usage.index[co_usage.to_numpy().diagonal() > 0]
+            co_usage = co_usage.loc[used, used]
 
-        # Waterfall Chart
-        mean_vals = df_numeric[
-            [
-                'Assignments_Stress',
-                'Academic_Workload_Anxiety',
-                'Sleep_Affected_By_Social_Media',
-                'Studies_Affected_By_Social_Media'
-            ]
-        ].mean()
-
-        fig = go.Figure(go.Waterfall(
-            x=[
-                "Assignments Stress",
-                "Academic Anxiety",
-                "Sleep Affected",
-                "Studies Affected",
-                "Overall Impact"
-            ],
-            y=[
-                mean_vals[0],
-                mean_vals[1],
-                mean_vals[2],
-                mean_vals[3],
-                mean_vals.sum()
-            ],
-            measure=["relative","relative","relative","relative","total"]
-        ))
+            return px.imshow(
+                co_usage,
+                text_auto=True,
+                color_continuous_scale=CONTINUOUS_SCALE,
+                title="Platform Co-Usage (Respondents Using Both)"
+            )
 
-        fig.update_layout(
-            title="Cumulative Mental Health Impact",
-            template="plotly_white"
-        )
+        st.plotly_chart(filter_panel(filter_index, filters, "home/platform_co_usage", platform_co_usage_chart, plot_theme, page="home"), width="stretch")
 
-        st.plotly_chart(fig, width="stretch")
-        st.info(waterfall_summary(filtered_numeric, col='Gender', value_col='Academic_Stress_Index'))
+        stress_by_platform = platform_stats["Avg. Stress Index"].dropna()
+        if not stress_by_platform.empty:
+            most_stressed = stress_by_platform.idxmax()
+            st.info(
+                f"Users of '{most_stressed}' report the highest average stress index "
+                f"({stress_by_platform[most_stressed]:.2f}) among "
+                f"{len(stress_by_platform)} platforms in the current selection."
+            )
+        else:
+            st.info("No platform data available under the current filter selection.")
    
        
         st.markdown("#### 💬 Key Insights")
@@ -1350,95 +1218,104 @@ with tab2:
 
     # Display Plotly grouped bar chart
     st.subheader("Mental Health Scores by Internet Usage")
-    fig = px.bar(
-        df_grouped,
-        x='Daily_Internet_Usage_Hours',
-        y='Score',
-        color='Mental_Health_Factor',
-        barmode='group',
-        labels={'Daily_Internet_Usage_Hours': 'Internet Usage (hours)', 'Score': 'Mental Health Score'},
-        title="Mental Health Scores by Internet Usage"
-    )
+    def scores_by_usage_chart():
+        # Group by internet usage and mental health factor, then calculate the mean score
+        df_grouped = df_melted.groupby(['Daily_Internet_Usage_Hours', 'Mental_Health_Factor'])['Score'].mean().reset_index()
+
+        return px.bar(
+            df_grouped,
+            x='Daily_Internet_Usage_Hours',
+            y='Score',
+            color='Mental_Health_Factor',
+            barmode='group',
+            labels={'Daily_Internet_Usage_Hours': 'Internet Usage (hours)', 'Score': 'Mental Health Score'},
+            title="Mental Health Scores by Internet Usage"
+        )
 
-    st.plotly_chart(fig)
+    # Tabs 2-4 chart the whole wave: their panels have no mask input
+    st.plotly_chart(panel_figure(filter_index, "home/scores_by_usage", scores_by_usage_chart, theme=plot_theme), width="stretch")
 
     # --- Box Plot ---
     # Create the box plot for "Difficulty Sleeping Due to University Pressure by Social Media Affecting Sleep"
-    df_new = df.copy() # Re-load original dataset
-    df_new['Sleep_Affected_By_Social_Media_Numeric_Str'] = df_new['Sleep_Affected_By_Social_Media'].astype(str)
-
-    def map_sleep_impact_to_binary(response_str):
-        try:
-            response_int = int(response_str)
-            if response_int >= 4: # Assuming 4 (Agree) and 5 (Strongly Agree) mean 'Yes'
-                return 'Yes'
-            elif response_int <= 3: # Assuming 1 (Strongly Disagree), 2 (Disagree), 3 (Neutral) mean 'No'
-                return 'No'
-        except ValueError: # Handle cases where conversion to int fails (e.g., non-numeric data)
-            return None
-
-    df_new['Internet_Use_Affects_Sleep'] = df_new['Sleep_Affected_By_Social_Media_Numeric_Str'].apply(map_sleep_impact_to_binary)
-
-    df_new['Difficulty_Sleeping_University_Pressure_Score'] = pd.to_numeric(
-        df_new['Difficulty_Sleeping_University_Pressure'],
-        errors='coerce'
-    )
+    def sleep_pressure_chart():
+        df_new = df.copy(deep=False) # Helper columns stay off the page frame
+        df_new['Sleep_Affected_By_Social_Media_Numeric_Str'] = df_new['Sleep_Affected_By_Social_Media'].astype(str)
+
+        def map_sleep_impact_to_binary(response_str):
+            try:
+                response_int = int(response_str)
+                if response_int >= 4: # Assuming 4 (Agree) and 5 (Strongly Agree) mean 'Yes'
+                    return 'Yes'
+                elif response_int <= 3: # Assuming 1 (Strongly Disagree), 2 (Disagree), 3 (Neutral) mean 'No'
+                    return 'No'
+            except ValueError: # Handle cases where conversion to int fails (e.g., non-numeric data)
+                return None
+
+        df_new['Internet_Use_Affects_Sleep'] = df_new['Sleep_Affected_By_Social_Media_Numeric_Str'].apply(map_sleep_impact_to_binary)
+
+        df_new['Difficulty_Sleeping_University_Pressure_Score'] = pd.to_numeric(
+            df_new['Difficulty_Sleeping_University_Pressure'],
+            errors='coerce'
+        )
 
-    df_plot = df_new.dropna(subset=[
-        'Internet_Use_Affects_Sleep',
-        'Difficulty_Sleeping_University_Pressure_Score'
-    ]).copy()
-
-    fig_box = px.box(
-        df_plot,
-        x='Internet_Use_Affects_Sleep',
-        y='Difficulty_Sleeping_University_Pressure_Score',
-        points="all",
-        labels={'Difficulty_Sleeping_University_Pressure_Score': 'Difficulty Sleeping Score'},
-        title='Difficulty Sleeping Due to University Pressure by Social Media Affecting Sleep'
-    )
+        df_plot = df_new.dropna(subset=[
+            'Internet_Use_Affects_Sleep',
+            'Difficulty_Sleeping_University_Pressure_Score'
+        ]).copy()
+
+        fig_box = px.box(
+            df_plot,
+            x='Internet_Use_Affects_Sleep',
+            y='Difficulty_Sleeping_University_Pressure_Score',
+            points="all",
+            labels={'Difficulty_Sleeping_University_Pressure_Score': 'Difficulty Sleeping Score'},
+            title='Difficulty Sleeping Due to University Pressure by Social Media Affecting Sleep'
+        )
+        return fig_box
 
-    st.plotly_chart(fig_box)
+    st.plotly_chart(panel_figure(filter_index, "home/sleep_pressure", sleep_pressure_chart, theme=plot_theme), width="stretch")
 
     # --- Heatmap ---
     # Create correlation heatmap
-    df_heatmap = df_numeric.copy()
-
-    numerical_cols = ['Age', 'Social_Media_Hours_Numeric', 'Study_Hours_Numeric'] + \
-                     [col for col in LIKERT_COLS if col in df_heatmap.columns and df_heatmap[col].dtype != 'object']
-
-    correlation_matrix = df_heatmap[numerical_cols].dropna().corr()
-
-    # Short names for better display
-    short_names = {
-        "Age": "Age",
-        "Social_Media_Hours_Numeric": "SM Hours",
-        "Study_Hours_Numeric": "Study Hours",
-        "Assignments_Stress_Numeric": "Assignment Stress",
-        "Academic_Workload_Anxiety_Numeric": "Workload Anxiety",
-        "Difficulty_Sleeping_University_Pressure_Numeric": "Sleep Difficulty",
-        "Sleep_Affected_By_Social_Media_Numeric": "Sleep Affected",
-        "Studies_Affected_By_Social_Media_Numeric": "Study Affected",
-        "Social_Media_Positive_Impact_on_Wellbeing_Numeric": "Positive Impact",
-        "Social_Media_Negative_Impact_on_Wellbeing_Numeric": "Negative Impact",
-        "Emotional_Connection_Social_Media_Numeric": "Emotional Attachment"
-    }
-
-    correlation_matrix_renamed = correlation_matrix.rename(
-        index=short_names, columns=short_names
-    )
+    def correlation_heatmap_chart():
+        df_heatmap = df
+
+        numerical_cols = ['Age', 'Social_Media_Hours_Numeric', 'Study_Hours_Numeric'] + \
+                         [col for col in LIKERT_COLS if col in df_heatmap.columns and df_heatmap[col].dtype != 'object']
+
+        correlation_matrix = df_heatmap[numerical_cols].dropna().corr()
+
+        # Short names for better display
+        short_names = {
+            "Age": "Age",
+            "Social_Media_Hours_Numeric": "SM Hours",
+            "Study_Hours_Numeric": "Study Hours",
+            "Assignments_Stress_Numeric": "Assignment Stress",
+            "Academic_Workload_Anxiety_Numeric": "Workload Anxiety",
+            "Difficulty_Sleeping_University_Pressure_Numeric": "Sleep Difficulty",
+            "Sleep_Affected_By_Social_Media_Numeric": "Sleep Affected",
+            "Studies_Affected_By_Social_Media_Numeric": "Study Affected",
+            "Social_Media_Positive_Impact_on_Wellbeing_Numeric": "Positive Impact",
+            "Social_Media_Negative_Impact_on_Wellbeing_Numeric": "Negative Impact",
+            "Emotional_Connection_Social_Media_Numeric": "Emotional Attachment"
+        }
 
-    fig_heatmap = px.imshow(
-        correlation_matrix_renamed,
-        labels=dict(x="Variables", y="Variables", color="Correlation"),
-        title="Correlation Heatmap",
-        width=900,
-        height=800
-    )
+        correlation_matrix_renamed = correlation_matrix.rename(
+            index=short_names, columns=short_names
+        )
+
+        fig_heatmap = px.imshow(
+            correlation_matrix_renamed,
+            labels=dict(x="Variables", y="Variables", color="Correlation"),
+            title="Correlation Heatmap",
+            width=900,
+            height=800
+        )
 
-    fig_heatmap.update_xaxes(tickangle=45)
+        fig_heatmap.update_xaxes(tickangle=45)
+        return fig_heatmap
 
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    st.plotly_chart(panel_figure(filter_index, "home/correlation_heatmap", correlation_heatmap_chart, theme=plot_theme), width="stretch")
 
     # --- Line Plot: Mental Health Scores vs Internet Usage ---
     st.subheader("Daily Internet Usage vs Mean Mental Health Scores")
@@ -1449,34 +1326,37 @@ with tab2:
     df_line["Daily_Internet_Usage_Hours"] = pd.to_numeric(df_line["Daily_Internet_Usage_Hours"], errors="coerce")
     df_line = df_line.dropna(subset=["Score", "Daily_Internet_Usage_Hours", "Mental_Health_Factor"])
 
-    # Group and calculate mean
-    df_grouped_line = (
-        df_line.groupby(["Daily_Internet_Usage_Hours", "Mental_Health_Factor"])["Score"]
-        .mean()
-        .reset_index()
-        .sort_values("Daily_Internet_Usage_Hours")
-    )
+    def usage_line_chart():
+        # Group and calculate mean
+        df_grouped_line = (
+            df_line.groupby(["Daily_Internet_Usage_Hours", "Mental_Health_Factor"])["Score"]
+            .mean()
+            .reset_index()
+            .sort_values("Daily_Internet_Usage_Hours")
+        )
 
-    # Convert hours to string for faceting
-    df_grouped_line['Daily_Internet_Usage_Hours_Str'] = df_grouped_line['Daily_Internet_Usage_Hours'].astype(str)
+        # Convert hours to string for faceting
+        df_grouped_line['Daily_Internet_Usage_Hours_Str'] = df_grouped_line['Daily_Internet_Usage_Hours'].astype(str)
+
+        # --- Plotly Line Plot ---
+        fig_line = px.line(
+            df_grouped_line,
+            x='Daily_Internet_Usage_Hours_Str',
+            y='Score',
+            facet_col='Mental_Health_Factor',
+            facet_col_wrap=2,
+            markers=True,
+            title='Daily Internet Usage vs Mean Mental Health Scores',
+            labels={
+                'Daily_Internet_Usage_Hours_Str': 'Daily Internet Usage (Hours per Day)',
+                'Score': 'Mean Mental Health Score'
+            }
+        )
+        fig_line.update_layout(height=600)
+        fig_line.update_yaxes(dtick=1)
+        return fig_line
 
-    # --- Plotly Line Plot ---
-    fig_line = px.line(
-        df_grouped_line,
-        x='Daily_Internet_Usage_Hours_Str',
-        y='Score',
-        facet_col='Mental_Health_Factor',
-        facet_col_wrap=2,
-        markers=True,
-        title='Daily Internet Usage vs Mean Mental Health Scores',
-        labels={
-            'Daily_Internet_Usage_Hours_Str': 'Daily Internet Usage (Hours per Day)',
-            'Score': 'Mean Mental Health Score'
-        }
-    )
-    fig_line.update_layout(template='plotly_white', height=600)
-    fig_line.update_yaxes(dtick=1)
-    st.plotly_chart(fig_line, use_container_width=True)
+    st.plotly_chart(panel_figure(filter_index, "home/usage_line", usage_line_chart, theme=plot_theme), width="stretch")
 
     # --- Seaborn Scatter Plots ---
     st.subheader("Scatter Plots: Daily Internet Usage vs Mental Health Scores")
@@ -1544,24 +1424,25 @@ with tab3:
 # =====================================================
     st.subheader("Preference for Online Help (High vs Low)")
 
-    df['Online_Help_Level'] = df['Seek_Help_Online_When_Stress'].astype(str).apply(
-        lambda x: 'High (Agree)' if x in ['4','5'] else 'Low (Neutral)'
-    )
+    def online_help_chart():
+        online_help_level = df['Seek_Help_Online_When_Stress'].astype(str).apply(
+            lambda x: 'High (Agree)' if x in ['4','5'] else 'Low (Neutral)'
+        )
 
-    pie_data = df['Online_Help_Level'].value_counts().reset_index()
-    pie_data.columns = ['Preference', 'Count']
-
-    fig = px.pie(
-        pie_data,
-        names='Preference',
-        values='Count',
-        hole=0.45,
-        title="Overall Preference for Seeking Help Online",
-        color='Preference',
-        color_discrete_sequence=['#0000FF', '#FF0000']
-    )
+        pie_data = online_help_level.value_counts().reset_index()
+        pie_data.columns = ['Preference', 'Count']
 
-    st.plotly_chart(fig, use_container_width=True)
+        return px.pie(
+            pie_data,
+            names='Preference',
+            values='Count',
+            hole=0.45,
+            title="Overall Preference for Seeking Help Online",
+            color='Preference',
+            color_discrete_sequence=['#0000FF', '#FF0000']
+        )
+
+    st.plotly_chart(panel_figure(filter_index, "home/online_help", online_help_chart, theme=plot_theme), width="stretch")
 
     st.success("""
     **Interpretation:**  
@@ -1576,36 +1457,38 @@ with tab3:
 # =====================================================
     st.subheader("Online Community Support by Gender")
 
-    # Create crosstab
-    gender_table = pd.crosstab(
-        df['Use_Online_Communities_for_Support'],
-        df['Gender']
-    )
+    def community_gender_chart():
+        # Create crosstab
+        gender_table = pd.crosstab(
+            df['Use_Online_Communities_for_Support'],
+            df['Gender']
+        )
 
-    # Convert to long format for Plotly
-    gender_table_long = gender_table.reset_index().melt(
-        id_vars='Use_Online_Communities_for_Support',
-        var_name='Gender',
-        value_name='Number of Students'
-    )
+        # Convert to long format for Plotly
+        gender_table_long = gender_table.reset_index().melt(
+            id_vars='Use_Online_Communities_for_Support',
+            var_name='Gender',
+            value_name='Number of Students'
+        )
 
-    # Plot
-    fig = px.bar(
-        gender_table_long,
-        x='Use_Online_Communities_for_Support',
-        y='Number of Students',
-        color='Gender',
-        barmode='group',
-        title='Use of Online Communities for Support by Gender'
-    )    
-
-    fig.update_layout(
-        xaxis_title='Agreement Level',
-        yaxis_title='Number of Students',
-        legend_title='Gender'
-    )
+        # Plot
+        fig = px.bar(
+            gender_table_long,
+            x='Use_Online_Communities_for_Support',
+            y='Number of Students',
+            color='Gender',
+            barmode='group',
+            title='Use of Online Communities for Support by Gender'
+        )    
 
-    st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(
+            xaxis_title='Agreement Level',
+            yaxis_title='Number of Students',
+            legend_title='Gender'
+        )
+        return fig
+
+    st.plotly_chart(panel_figure(filter_index, "home/community_gender", community_gender_chart, theme=plot_theme), width="stretch")
 
     st.success("""
     **Interpretation:**  
@@ -1619,19 +1502,24 @@ with tab3:
 # =====================================================
     st.subheader("Assignment Stress vs Online Help Preference")
 
-    fig = px.box(
-        df,
-        x="Seek_Help_Online_When_Stress",
-        y="Assignments_Stress",
-        title="Assignment Stress Levels Across Online Help Preference",
-        labels={
-            "Seek_Help_Online_When_Stress": "Online Help Preference Level",
-            "Assignments_Stress": "Assignment Stress Level"
-        }
+    st.plotly_chart(
+        panel_figure(
+            filter_index, "home/stress_by_help",
+            lambda: px.box(
+                df,
+                x="Seek_Help_Online_When_Stress",
+                y="Assignments_Stress",
+                title="Assignment Stress Levels Across Online Help Preference",
+                labels={
+                    "Seek_Help_Online_When_Stress": "Online Help Preference Level",
+                    "Assignments_Stress": "Assignment Stress Level"
+                }
+            ),
+            theme=plot_theme
+        ),
+        width="stretch"
     )
 
-    st.plotly_chart(fig, use_container_width=True)
-
     st.success("""
     **Interpretation:**  
     The box plot shows that students who really want online help (Level 5) also have some of 
@@ -1644,12 +1532,18 @@ with tab3:
 # =====================================================
     st.subheader("Seeking Mental Health Information Online")
 
-    fig = px.histogram(
-        df,
-        x="Mental_Health_Info_Through_Internet",
-        title="Frequency of Seeking Mental Health Information Online"
+    st.plotly_chart(
+        panel_figure(
+            filter_index, "home/info_online",
+            lambda: px.histogram(
+                df,
+                x="Mental_Health_Info_Through_Internet",
+                title="Frequency of Seeking Mental Health Information Online"
+            ),
+            theme=plot_theme
+        ),
+        width="stretch"
     )
-    st.plotly_chart(fig, use_container_width=True)
 
     st.success("""
     **Interpretation:**  
@@ -1665,12 +1559,18 @@ with tab3:
 # =====================================================
     st.subheader("Preference for Online Help During Stress")
 
-    fig = px.histogram(
-        df,
-        x="Seek_Help_Online_When_Stress",
-        title="Preference for Seeking Help Online When Stressed"
+    st.plotly_chart(
+        panel_figure(
+            filter_index, "home/help_when_stressed",
+            lambda: px.histogram(
+                df,
+                x="Seek_Help_Online_When_Stress",
+                title="Preference for Seeking Help Online When Stressed"
+            ),
+            theme=plot_theme
+        ),
+        width="stretch"
     )
-    st.plotly_chart(fig, use_container_width=True)
 
     st.success("""
     **Interpretation:**  
@@ -1686,29 +1586,31 @@ with tab3:
 
     st.subheader("Stress Level vs Use of Online Communities")
     
-    # Interactive Heatmap (Stress Level vs Use of Online Communities)
-    heatmap_data = pd.crosstab(
-        df['Assignments_Stress'],
-        df['Use_Online_Communities_for_Support']
-    )
-    
-    fig = go.Figure(data=go.Heatmap(
-        z=heatmap_data.values,
-        x=heatmap_data.columns,
-        y=heatmap_data.index,
-        colorscale='reds',  # You can choose other colorscales as well
-        colorbar=dict(title="Number of Students")
-    ))
+    def stress_communities_chart():
+        # Interactive Heatmap (Stress Level vs Use of Online Communities)
+        heatmap_data = pd.crosstab(
+            df['Assignments_Stress'],
+            df['Use_Online_Communities_for_Support']
+        )
     
-    fig.update_layout(
-        title="Stress Level vs Use of Online Communities for Support",
-        xaxis_title="Use Online Communities for Support",
-        yaxis_title="Stress Level",
-        xaxis=dict(tickmode='array', tickvals=list(range(len(heatmap_data.columns))), ticktext=heatmap_data.columns),
-        yaxis=dict(tickmode='array', tickvals=list(range(len(heatmap_data.index))), ticktext=heatmap_data.index)
-    )
+        fig = go.Figure(data=go.Heatmap(
+            z=heatmap_data.values,
+            x=heatmap_data.columns,
+            y=heatmap_data.index,
+            colorscale='reds',  # You can choose other colorscales as well
+            colorbar=dict(title="Number of Students")
+        ))
     
-    st.plotly_chart(fig)
+        fig.update_layout(
+            title="Stress Level vs Use of Online Communities for Support",
+            xaxis_title="Use Online Communities for Support",
+            yaxis_title="Stress Level",
+            xaxis=dict(tickmode='array', tickvals=list(range(len(heatmap_data.columns))), ticktext=heatmap_data.columns),
+            yaxis=dict(tickmode='array', tickvals=list(range(len(heatmap_data.index))), ticktext=heatmap_data.index)
+        )
+        return fig
+
+    st.plotly_chart(panel_figure(filter_index, "home/stress_communities", stress_communities_chart, theme=plot_theme), width="stretch")
     
     
     st.success("""
@@ -1764,14 +1666,20 @@ with tab4:
     with left:
         ("1️⃣ Gender Distribution Across Year of Study")
 
-        fig1 = px.histogram(
-            filtered_data,
-            x="Year_of_Study",
-            color="Gender",
-            barmode="group",
-            labels={"Year_of_Study":"Year of Study","Number of Respondents":"Number of Respondents"}
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "home/year_gender",
+                lambda: px.histogram(
+                    filtered_data,
+                    x="Year_of_Study",
+                    color="Gender",
+                    barmode="group",
+                    labels={"Year_of_Study":"Year of Study","Number of Respondents":"Number of Respondents"}
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-        st.plotly_chart(fig1, use_container_width=True)
     
         st.success("""
         **Interpretation:** 
@@ -1780,14 +1688,20 @@ with tab4:
 
         ("2️⃣ Gender vs Social Media Impact")
 
-        fig2 = px.histogram(
-            filtered_data,
-            x="Gender",
-            color="Social_Media_Positive_Impact_on_Wellbeing",
-            barmode="stack",
-            labels={"Social_Media_Positive_Impact_on_Wellbeing":"Perceived Positive Impact","Number of Respondents":"Number of Respondents"}
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "home/gender_impact",
+                lambda: px.histogram(
+                    filtered_data,
+                    x="Gender",
+                    color="Social_Media_Positive_Impact_on_Wellbeing",
+                    barmode="stack",
+                    labels={"Social_Media_Positive_Impact_on_Wellbeing":"Perceived Positive Impact","Number of Respondents":"Number of Respondents"}
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-        st.plotly_chart(fig2, use_container_width=True)
      
         st.success("""
         **Interpretation:**  
@@ -1798,14 +1712,20 @@ with tab4:
 
         ("3️⃣ Gender vs Difficulty Sleeping")
 
-        fig3 = px.histogram(
-            filtered_data,
-            x="Difficulty_Sleeping_University_Pressure",
-            color="Gender",
-            barmode="group",
-            labels={"Difficulty_Sleeping_University_Pressure":"Difficulty Sleeping","Number of Respondents":"Number of Respondents"}
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "home/gender_sleep",
+                lambda: px.histogram(
+                    filtered_data,
+                    x="Difficulty_Sleeping_University_Pressure",
+                    color="Gender",
+                    barmode="group",
+                    labels={"Difficulty_Sleeping_University_Pressure":"Difficulty Sleeping","Number of Respondents":"Number of Respondents"}
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-        st.plotly_chart(fig3, use_container_width=True)
     
         st.success("""
         **Interpretation:**  
@@ -1816,18 +1736,22 @@ with tab4:
     with right:
         ("4️⃣ Year of Study vs Living Situation")
 
-        heatmap_data = pd.crosstab(
-            filtered_data["Year_of_Study"],
-            filtered_data["Current_Living_Situation"]
-        )
-
-        fig4 = px.imshow(
-            heatmap_data,
-            text_auto=True,
-            color_continuous_scale="YlGnBu",
-            labels={"x":"Living Situation","y":"Year of Study","color":"Count"}
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "home/year_living",
+                lambda: px.imshow(
+                    pd.crosstab(
+                        filtered_data["Year_of_Study"],
+                        filtered_data["Current_Living_Situation"]
+                    ),
+                    text_auto=True,
+                    color_continuous_scale="YlGnBu",
+                    labels={"x":"Living Situation","y":"Year of Study","color":"Count"}
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-        st.plotly_chart(fig4, use_container_width=True)
      
         st.success("""
         **Interpretation:**  
@@ -1837,14 +1761,20 @@ with tab4:
 
         ("5️⃣ Race vs Social Media Routine")
 
-        fig5 = px.histogram(
-            filtered_data,
-            x="Social_Media_Daily_Routine",
-            color="Race",
-            barmode="group",
-            labels={"Social_Media_Daily_Routine":"Social Media Routine","Number of Respondents":"Number of Respondents"}
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "home/race_routine",
+                lambda: px.histogram(
+                    filtered_data,
+                    x="Social_Media_Daily_Routine",
+                    color="Race",
+                    barmode="group",
+                    labels={"Social_Media_Daily_Routine":"Social Media Routine","Number of Respondents":"Number of Respondents"}
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-        st.plotly_chart(fig5, use_container_width=True)
     
         st.success("""
         **Interpretation:**  
@@ -1854,12 +1784,18 @@ with tab4:
 
         ("6️⃣ Employment Status Distribution")
 
-        fig6 = px.pie(
-            filtered_data,
-            names="Employment_Status",
-            labels={"Employment_Status":"Employment Status"}
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "home/employment",
+                lambda: px.pie(
+                    filtered_data,
+                    names="Employment_Status",
+                    labels={"Employment_Status":"Employment Status"}
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-        st.plotly_chart(fig6, use_container_width=True)
     
         st.success("""
         **Interpretation:** 
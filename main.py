@@ -1,10 +1,13 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
+from data_loader import (
+    load_indexed_survey, answer_columns, apply_mask, resolve_filters, filter_sidebar, reset_filters,
+    panel_figure, filter_panel
+)
 warnings.filterwarnings("ignore")
 
 px.defaults.template = "plotly_white"
@@ -18,208 +21,7 @@ st.set_page_config(
 )
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQnrGG72xRS-qLoiM2zon4eP8t5XMiO5MhoLUEe2jJer0G5EzodiU4e0NOmx_ssmCwZf-AnbQXhBbTM/pub?gid=1791189796&single=true&output=csv"
-    return pd.read_csv(url)
-
-df = load_data()
-
-# Clean Column Names
-df.columns = df.columns.str.strip()
-
-# Rename Columns
-df = df.rename(columns={
-    "Age / Umur:": "Age",
-    "Gender / Jantina:": "Gender",
-    "Race / Bangsa:": "Race",
-    "Year of Study / Tahun Belajar:": "Year_of_Study",
-    "Programme of Study / Program Pembelajaran (cth., SST):": "Programme_of_Study",
-    "Current living situation / Keadaan hidup sekarang:": "Current_Living_Situation",
-    "Employment Status / Status Pekerjaan:": "Employment_Status",
-    "Relationship Status / Status Perhubungan:": "Relationship_Status",
-    "How would you describe your general academic performance? / Bagaimanakah anda menerangkan prestasi akademik umum anda?": "General_Academic_Performance",
-    "How many hours do you study per week (outside class)? / Berapa jam anda belajar setiap minggu (di luar kelas)?": "Hours_Study_per_Week",
-    "How often do you use social media? / Berapa kerap anda menggunakan media sosial?": "Social_Media_Use_Frequency",
-    "Platforms you use most often (select all) / Platform yang paling kerap anda gunakan (pilih semua):": "Platforms_Most_Often_Used",
-    "I have been feeling stressed or overwhelmed with assignments. / Saya telah berasa tertekan atau terbeban dengan tugasan.": "Assignments_Stress",
-    "I often feel anxious about my academic workload. / Saya sering berasa bimbang tentang beban kerja akademik saya.": "Academic_Workload_Anxiety",
-    "I have difficulty sleeping due to university-related pressure. / Saya sukar tidur kerana tekanan berkaitan universiti.": "Difficulty_Sleeping_University_Pressure",
-    "I feel supported by friends or family when I am stressed. / Saya berasa disokong oleh rakan atau keluarga apabila saya tertekan.": "Friends_Family_Support",
-    "I can manage my emotions well during stressful periods. / Saya boleh menguruskan emosi saya dengan baik semasa tempoh tekanan.": "Manage_Emotion_Stressful_Periods",
-    "I use social media to relax or escape from academic stress. / Saya menggunakan media sosial untuk berehat atau melarikan diri daripada tekanan akademik.": "Social_Media_Relaxation",
-    "I feel emotionally connected to my social media accounts. / Saya berasa tersambung secara emosi dengan akaun media sosial saya.": "Emotional_Connection_Social_Media",
-    "Using social media is an important part of my daily routine. / Menggunakan media sosial adalah bahagian penting dalam rutin harian saya.": "Social_Media_Daily_Routine",
-    "I sometimes lose track of time when using social media. / Saya kadang-kadang terlepas masa apabila menggunakan media sosial.": "Social_Media_Waste_Time",
-    "Social media has affected my sleep (sleeping late or difficulty sleeping). / Media sosial telah menjejaskan tidur saya (tidur lewat atau sukar tidur).": "Sleep_Affected_By_Social_Media",
-    "Social media affects my ability to concentrate on studies. / Media sosial menjejaskan keupayaan saya untuk menumpukan perhatian kepada pelajaran.": "Studies_Affected_By_Social_Media",
-    "I use the Internet to look for mental health information (e.g., coping tips, stress-relief content). / Saya menggunakan Internet untuk mencari maklumat kesihatan mental (cth., petua mengatasi tekanan, kandungan melegakan tekanan).": "Mental_Health_Info_Through_Internet",
-    "I have come across upsetting or disturbing content online. / Saya telah menemui kandungan yang menjengkelkan atau mengganggu dalam talian.": "Across_Upsetting_Content_Online",
-    "When I feel stressed, I prefer to seek help online rather than talk to someone in person. / Apabila saya berasa tertekan, saya lebih suka mencari bantuan dalam talian daripada bercakap dengan seseorang secara peribadi.": "Seek_Help_Online_When_Stress",
-    "I know where to find reliable mental health information online. / Saya tahu di mana untuk mencari maklumat kesihatan mental yang boleh dipercayai dalam talian.": "Find_Mental_Health_Info_Online",
-    "I follow accounts that post motivational or mental health content. / Saya mengikuti akaun yang menyiarkan kandungan motivasi atau kesihatan mental.": "Follow_Motivational_Mental_Health_Content",
-    "I use online communities for academic or emotional support. / Saya menggunakan komuniti dalam talian untuk sokongan akademik atau emosi.": "Use_Online_Communities_for_Support",
-    "Social media has a generally positive impact on my wellbeing. / Media sosial secara amnya mempunyai kesan positif terhadap kesejahteraan saya.": "Social_Media_Positive_Impact_on_Wellbeing",
-    "Social media has a generally negative impact on my wellbeing. / Media sosial secara amnya mempunyai kesan negatif terhadap kesejahteraan saya.": "Social_Media_Negative_Impact_on_Wellbeing",
-    "Do you think universities should provide more online mental health resources? / Adakah anda fikir universiti harus menyediakan lebih banyak sumber kesihatan mental dalam talian?": "Do you think universities should provide more online mental health resources?",
-    "What type of online content affects you the most (positive or negative)? / Apakah jenis kandungan dalam talian yang paling mempengaruhi anda (positif atau negatif)?": "Type_of_Online_Content_Affects",
-    "What do you think universities can do to support student wellbeing? / Pada pendapat anda, apakah yang boleh dilakukan oleh universiti untuk menyokong kesejahteraan pelajar?": "Universities_Support_Actions"
-})
-
-# Fix encoding issues
-df = df.replace({"â\x80\x93": "-", "–": "-", "—": "-"}, regex=True)
-
-# Drop Irrelevant Columns
-cols_to_drop = [
-    "Timestamp",
-    "Type_of_Online_Content_Affects",
-    "Universities_Support_Actions"
-]
-
-df = df.drop(columns=cols_to_drop, errors="ignore")
-df_numeric = df.copy()
-
-# ============ INDIVIDUAL PART FILTERING AND MAPPING ============
-# ----------- AISHAH SAKINAH -----------
-
-# Likert-scale columns (1–5)
-LIKERT_COLS = [
-    'Assignments_Stress',
-    'Academic_Workload_Anxiety',
-    'Difficulty_Sleeping_University_Pressure',
-    'Friends_Family_Support',
-    'Manage_Emotion_Stressful_Periods',
-    'Social_Media_Relaxation',
-    'Emotional_Connection_Social_Media',
-    'Social_Media_Daily_Routine',
-    'Social_Media_Waste_Time',
-    'Sleep_Affected_By_Social_Media',
-    'Studies_Affected_By_Social_Media',
-    'Seek_Help_Online_When_Stress',
-    'Social_Media_Positive_Impact_on_Wellbeing',
-    'Social_Media_Negative_Impact_on_Wellbeing'
-]
-
-likert_map = {
-    "Strongly Disagree": 1,
-    "Disagree": 2,
-    "Neutral": 3,
-    "Agree": 4,
-    "Strongly Agree": 5
-}
-
-# Numeric Likert Columns
-for col in LIKERT_COLS:
-    if col in df_numeric.columns:
-        df_numeric[col + "_Numeric"] = (
-            df_numeric[col]
-            .astype(str)
-            .str.split(" / ").str[0]
-            .str.strip()
-            .map(likert_map)
-        )
-
-# Frequency-scale columns (1–4)
-FREQ_COLS = [
-    'Mental_Health_Info_Through_Internet',
-    'Use_Online_Communities_for_Support',
-    'Across_Upsetting_Content_Online'
-]
-
-# Frequency mapping
-freq_map = {
-    "Never": 1,
-    "Rarely": 2,
-    "Sometimes": 3,
-    "Often": 4
-}
-
-# Frequency (1–4)
-for col in FREQ_COLS:
-    if col in df_numeric.columns:
-        df_numeric[col + "_Numeric"] = (
-            df_numeric[col].astype(str).str.strip().map(freq_map)
-        )
-    
-# Study hours
-df_numeric["Study_Hours_Numeric"] = df_numeric["Hours_Study_per_Week"].map({
-    "Less than 5 hours": 2.5,
-    "5 to 10 hours": 7.5,
-    "11 to 15 hours": 13,
-    "16 to 20 hours": 18,
-    "More than 20 hours": 22.5
-})
-
-# Social media hours
-df_numeric["Social_Media_Hours_Numeric"] = df_numeric["Social_Media_Use_Frequency"].map({
-    "Less than 1 hour per day": 0.5,
-    "1 to 2 hours per day": 1.5,
-    "3 to 4 hours per day": 3.5,
-    "5 to 6 hours per day": 5.5,
-    "More than 6 hours per day": 7
-})
-
-# Academic performance mapping
-academic_map = {
-    "Below Average": 1,
-    "Average": 2,
-    "Good": 3,
-    "Excellent": 4
-}
-
-# Academic performance numeric
-df_numeric["General_Academic_Performance_Numeric"] = (
-    df_numeric["General_Academic_Performance"]
-    .astype(str)
-    .str.strip()
-    .replace({
-        "Excellent ": "Excellent",
-        "Good ": "Good"
-    })
-    .map(academic_map)
-)
-
-mental_cols = [
-    "Assignments_Stress",
-    "Academic_Workload_Anxiety",
-    "Difficulty_Sleeping_University_Pressure",
-    "Sleep_Affected_By_Social_Media",
-    "Studies_Affected_By_Social_Media"
-]
-
-# Likert (1–5)
-for col in mental_cols:
-    if col in df_numeric.columns:
-        df_numeric[col + "_Numeric"] = (
-            df_numeric[col]
-            .astype(str)
-            .str.split(" / ").str[0]
-            .map(likert_map)
-        )
-
-
-# Academic Stress Index
-df_numeric["Academic_Stress_Index"] = df_numeric[
-    [
-        "Assignments_Stress_Numeric",
-        "Academic_Workload_Anxiety_Numeric",
-        "Difficulty_Sleeping_University_Pressure_Numeric"
-    ]
-].mean(axis=1)
-
-# ----- CATEGORICAL ORDER -----
-df["Social_Media_Use_Frequency"] = pd.Categorical(
-    df["Social_Media_Use_Frequency"],
-    categories=[
-        "Less than 1 hour per day",
-        "1 to 2 hours per day",
-        "3 to 4 hours per day",
-        "5 to 6 hours per day",
-        "More than 6 hours per day"
-    ],
-    ordered=True
-)
-
+df, _, filter_index = load_indexed_survey()
 
 # ====== SIDEBAR ======
 with st.sidebar:
@@ -227,87 +29,30 @@ with st.sidebar:
 
     # --- Data Summary ---
     st.markdown("### 🧾 Data Summary")
-    st.info(f"**Total Records:** {len(df):,}\n\n**Columns:** {len(df.columns)}")
+    st.info(f"**Total Records:** {len(df):,}\n\n**Columns:** {len(answer_columns(df))}")
 
     # --- Filters Section ---
     with st.expander("Filter Options", expanded=True):
         st.markdown("Select filters to refine your dashboard view:")
 
-        # --- Multi-select Filters ---
-        # --- Gender ---
-        gender_filter = st.multiselect(
-            "Gender",
-            options=sorted(df["Gender"].dropna().unique()),
-            default=sorted(df["Gender"].dropna().unique())
-        )
-
-        # --- Year of Study ---
-        year_filter = st.multiselect(
-            "Year of Study",
-            options=sorted(df["Year_of_Study"].dropna().unique()),
-            default=sorted(df["Year_of_Study"].dropna().unique())
-        )
-
-        # --- Programme ---
-        programme_filter = st.multiselect(
-            "Programme of Study",
-            options=sorted(df["Programme_of_Study"].dropna().unique()),
-            default=sorted(df["Programme_of_Study"].dropna().unique())
-        )
-
-        # --- Social Media Usage ---
-        sm_filter = st.multiselect(
-            "Social Media Usage (Hours / Day)",
-            options=df["Social_Media_Use_Frequency"].cat.categories,
-            default=df["Social_Media_Use_Frequency"].cat.categories
-        )
-
-        # --- Age Filter ---
-        min_age, max_age = st.slider(
-            "Age Range",
-            int(df["Age"].min()),
-            int(df["Age"].max()),
-            (int(df["Age"].min()), int(df["Age"].max()))
-        )
+        filters = filter_sidebar(filter_index, select_all=True)
 
         # ===== APPLY FILTERS =====
-        filtered_df = df.copy()
-        filtered_numeric = df_numeric.copy()
-
-        if gender_filter:
-            filtered_df = filtered_df[filtered_df["Gender"].isin(gender_filter)]
-            filtered_numeric = filtered_numeric.loc[filtered_df.index]
-
-        if year_filter:
-            filtered_df = filtered_df[filtered_df["Year_of_Study"].isin(year_filter)]
-            filtered_numeric = filtered_numeric.loc[filtered_df.index]
-
-        if programme_filter:
-            filtered_df = filtered_df[filtered_df["Programme_of_Study"].isin(programme_filter)]
-            filtered_numeric = filtered_numeric.loc[filtered_df.index]
-
-        if sm_filter:
-            filtered_df = filtered_df[filtered_df["Social_Media_Use_Frequency"].isin(sm_filter)]
-            filtered_numeric = filtered_numeric.loc[filtered_df.index]
-
-        filtered_df = filtered_df[
-            (filtered_df["Age"] >= min_age) &
-            (filtered_df["Age"] <= max_age)
-        ]
-        filtered_numeric = filtered_numeric.loc[filtered_df.index]
+        # One mask from the bitmap index (memoized across sessions), applied once
+        row_mask, kpis = resolve_filters(filter_index, filters)
+        filtered_df = apply_mask(df, row_mask)
 
     # --- Reset and Download Buttons ---
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Reset Filters"):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            reset_filters()
             st.rerun()
 
     with col2:
         st.download_button(
             label="Download CSV",
-            data=filtered_df.to_csv(index=False).encode("utf-8"),
+            data=filtered_df[answer_columns(filtered_df)].to_csv(index=False).encode("utf-8"),
             file_name="motor_accident_data.csv",
             mime="text/csv"
         )
@@ -315,6 +60,7 @@ with st.sidebar:
 
 # ===== THEME TOGGLE =====
 theme_mode = st.sidebar.radio("Select Theme Mode", ["Light 🌞", "Dark 🌙"], horizontal=True)
+plot_theme = "dark" if theme_mode == "Dark 🌙" else "light"
 
 if theme_mode == "Dark 🌙":
     st.markdown("""
@@ -349,8 +95,8 @@ col1, col2, col3, col4 = st.columns(4)
 if not filtered_df.empty:
     col1.metric("Total Records", f"{len(filtered_df):,}", help="PLO 1: Total Respondent Records of Student", border=True)
     col2.metric("Avg. Age", f"{filtered_df['Age'].mean():.1f} years", help="PLO 2: Students Age", border=True)
-    col3.metric("Avg. Positive Impact", f"{filtered_numeric['Social_Media_Positive_Impact_on_Wellbeing_Numeric'].mean():.1f}", help="PLO 3: Positive Impact on Wellbeing", border=True)
-    col4.metric("Avg. Negative Impact", f"{filtered_numeric['Social_Media_Negative_Impact_on_Wellbeing_Numeric'].mean():.1f}", help="PLO 4: Negative Impact on Wellbeing", border=True)
+    col3.metric("Avg. Positive Impact", f"{filtered_df['Social_Media_Positive_Impact_on_Wellbeing_Numeric'].mean():.1f}", help="PLO 3: Positive Impact on Wellbeing", border=True)
+    col4.metric("Avg. Negative Impact", f"{filtered_df['Social_Media_Negative_Impact_on_Wellbeing_Numeric'].mean():.1f}", help="PLO 4: Negative Impact on Wellbeing", border=True)
 else:
     col1.metric("Total Records", "0", help="No data available")
     col2.metric("Avg. Age", "N/A", help="No data available")
@@ -369,10 +115,10 @@ with tab1:
 
     # Summary box
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Students", f"{len(filtered_df):,}", border=True)
-    col2.metric("Avg. Age", f"{filtered_df['Age'].mean():.1f}", border=True)
-    col3.metric("Avg Stress Index", f"{filtered_numeric['Academic_Stress_Index'].mean():.2f}", border=True)
-    col4.metric("High Usage (%)", f"{(filtered_df['Social_Media_Use_Frequency'].isin(['5 to 6 hours per day','More than 6 hours per day']).mean()*100):.1f}%", border=True)
+    col1.metric("Total Students", f"{kpis['respondents']:,}", border=True)
+    col2.metric("Avg. Age", f"{kpis['avg_age']:.1f}", border=True)
+    col3.metric("Avg Stress Index", f"{kpis['avg_stress_index']:.2f}", border=True)
+    col4.metric("High Usage (%)", f"{kpis['high_usage_share'] * 100:.1f}%", border=True)
 
     # Scientific Summary
     st.markdown("### Summary")
@@ -396,10 +142,10 @@ with tab1:
 
         # Summary box
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Total Students", f"{len(filtered_df):,}", border=True)
-        col2.metric("Avg. Age", f"{filtered_df['Age'].mean():.1f}", border=True)
-        col3.metric("Most Common Social Media Usage", filtered_df['Social_Media_Use_Frequency'].mode()[0], border=True)
-        col4.metric("Avg. Study Hours / Week", f"{filtered_numeric['Study_Hours_Numeric'].mean():.1f}", border=True)
+        col1.metric("Total Students", f"{kpis['respondents']:,}", border=True)
+        col2.metric("Avg. Age", f"{kpis['avg_age']:.1f}", border=True)
+        col3.metric("Most Common Social Media Usage", filtered_df['Social_Media_Use_Frequency'].mode().iloc[0] if not filtered_df.empty else "N/A", border=True)
+        col4.metric("Avg. Study Hours / Week", f"{filtered_df['Study_Hours_Numeric'].mean():.1f}", border=True)
         
         # Scientific Summary
         st.markdown("### Summary")
@@ -418,15 +164,18 @@ with tab1:
         # Bar Chart
         freq_order = ["< 1 hr", "1–2 hrs", "3–4 hrs", "5–6 hrs", "> 6 hrs"]
 
-        fig = px.bar(
-            filtered_df["Social_Media_Use_Frequency"].value_counts().reindex(freq_order),
-            title="Distribution of Daily Social Media Usage",
-            labels={"value": "Number of Students", "index": "Hours per Day"},
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
+        def usage_chart(data):
+            fig = px.bar(
+                data["Social_Media_Use_Frequency"].value_counts().reindex(freq_order),
+                title="Distribution of Daily Social Media Usage",
+                labels={"value": "Number of Students", "index": "Hours per Day"},
+                color_discrete_sequence=px.colors.qualitative.Set2
+            )
 
-        fig.update_layout(xaxis_tickangle=-30)
-        st.plotly_chart(fig, use_container_width=True)
+            fig.update_layout(xaxis_tickangle=-30)
+            return fig
+
+        st.plotly_chart(filter_panel(filter_index, filters, "main/usage", usage_chart, plot_theme), width="stretch")
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
@@ -437,73 +186,85 @@ with tab1:
             "11 to 15 hours", "16 to 20 hours", "More than 20 hours"
         ]
 
-        fig = px.bar(
-            filtered_df["Hours_Study_per_Week"].value_counts().reindex(study_order),
-            title="Frequency of Study Hours per Week",
-            labels={"value": "Number of Students", "index": "Study Hours"},
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
+        def study_hours_chart(data):
+            fig = px.bar(
+                data["Hours_Study_per_Week"].value_counts().reindex(study_order),
+                title="Frequency of Study Hours per Week",
+                labels={"value": "Number of Students", "index": "Study Hours"},
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+
+            fig.update_layout(xaxis_tickangle=-25)
+            return fig
 
-        fig.update_layout(xaxis_tickangle=-25)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(filter_panel(filter_index, filters, "main/study_hours", study_hours_chart, plot_theme), width="stretch")
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
 
         # Box Plot
-        fig = px.box(
-            filtered_df,
-            x="Gender",
-            y="Social_Media_Use_Frequency",
-            title="Social Media Usage by Gender",
-            color="Gender",
-            color_discrete_sequence=px.colors.qualitative.Safe
+        st.plotly_chart(
+            filter_panel(
+                filter_index, filters, "main/usage_by_gender",
+                lambda data: px.box(
+                    data,
+                    x="Gender",
+                    y="Social_Media_Use_Frequency",
+                    title="Social Media Usage by Gender",
+                    color="Gender",
+                    color_discrete_sequence=px.colors.qualitative.Safe
+                ),
+                plot_theme
+            ),
+            width="stretch"
         )
-
-        st.plotly_chart(fig, use_container_width=True)
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
 
         # Histogram
-        fig = px.histogram(
-            filtered_df,
-            title="Perception of Wasting Time on Social Media",
-            x="Social_Media_Waste_Time",
-            color_discrete_sequence=COLOR_SEQ,
-            category_orders={"Social_Media_Waste_Time": [
-            "Strongly Disagree","Disagree","Neutral","Agree","Strongly Agree"
-            ]}
-        )
+        def waste_time_chart(data):
+            fig = px.histogram(
+                data,
+                title="Perception of Wasting Time on Social Media",
+                x="Social_Media_Waste_Time",
+                color_discrete_sequence=COLOR_SEQ,
+                category_orders={"Social_Media_Waste_Time": [
+                "Strongly Disagree","Disagree","Neutral","Agree","Strongly Agree"
+                ]}
+            )
 
-        fig.update_layout(
-            xaxis_title="Response Level",
-            yaxis_title="Number of Students",
-            template="plotly_white"
-        )
+            fig.update_layout(
+                xaxis_title="Response Level",
+                yaxis_title="Number of Students"
+            )
+            return fig
 
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(filter_panel(filter_index, filters, "main/waste_time", waste_time_chart, plot_theme), width="stretch")
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
 
         # Pie Donut
-        resource_counts = filtered_df[
-            'Do you think universities should provide more online mental health resources?'
-        ].value_counts().reset_index()
-
-        resource_counts.columns = ["Response", "Count"]
-
-        fig = px.pie(
-            resource_counts,
-            names="Response",
-            values="Count",
-            hole=0.45,
-            color_discrete_sequence=COLOR_SEQ,
-            title="Need for Online Mental Health Resources"
-        )
-        fig.update_traces(textposition="inside", textinfo="percent+label")
-        st.plotly_chart(fig, use_container_width=True)
+        def resources_chart(data):
+            resource_counts = data[
+                'Do you think universities should provide more online mental health resources?'
+            ].value_counts().reset_index()
+
+            resource_counts.columns = ["Response", "Count"]
+
+            fig = px.pie(
+                resource_counts,
+                names="Response",
+                values="Count",
+                hole=0.45,
+                color_discrete_sequence=COLOR_SEQ,
+                title="Need for Online Mental Health Resources"
+            )
+            fig.update_traces(textposition="inside", textinfo="percent+label")
+            return fig
+
+        st.plotly_chart(filter_panel(filter_index, filters, "main/resources", resources_chart, plot_theme), width="stretch")
 
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
@@ -524,11 +285,11 @@ with tab1:
 
         # Summary box
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Study Impact Reported (%)", f"{(filtered_df['Studies_Affected_By_Social_Media'].map(likert_map).mean()/5*100):.1f}%", border=True)
-        col2.metric("Avg. Academic Performance", f"{filtered_numeric['General_Academic_Performance_Numeric'].mean():.2f}", border=True)
-        high_users = filtered_df['Social_Media_Use_Frequency'].isin(['5 to 6 hours per day', 'More than 6 hours per day']).mean() * 100
+        col1.metric("Study Impact Reported (%)", f"{(filtered_df['Studies_Affected_By_Social_Media_Numeric'].mean()/5*100):.1f}%", border=True)
+        col2.metric("Avg. Academic Performance", f"{filtered_df['General_Academic_Performance_Numeric'].mean():.2f}", border=True)
+        high_users = kpis["high_usage_share"] * 100
         col3.metric("High Social Media Users (%)", f"{high_users:.1f}%", border=True)
-        col4.metric("Avg. Weekly Study Hours", f"{filtered_numeric['Study_Hours_Numeric'].mean():.1f}", border=True)
+        col4.metric("Avg. Weekly Study Hours", f"{filtered_df['Study_Hours_Numeric'].mean():.1f}", border=True)
 
         # Scientific Summary
         st.markdown("### Summary")
@@ -545,80 +306,93 @@ with tab1:
         col1, col2, col3 = st.columns(3)
 
         # Bar Chart
-        usage_group_mean = (
-            filtered_numeric.groupby("Social_Media_Use_Frequency")
-            ["Academic_Stress_Index"]
-            .mean()
-            .reset_index()
-        )
+        def stress_by_usage_chart(data):
+            usage_group_mean = (
+                data.groupby("Social_Media_Use_Frequency")
+                ["Academic_Stress_Index"]
+                .mean()
+                .reset_index()
+            )
 
-        fig = px.bar(
-            usage_group_mean,
-            title="Academic Stress vs Social Media Usage",
-            x="Social_Media_Use_Frequency",
-            y="Academic_Stress_Index",
-            color="Academic_Stress_Index",
-            color_continuous_scale=CONTINUOUS_SCALE
-        )
+            fig = px.bar(
+                usage_group_mean,
+                title="Academic Stress vs Social Media Usage",
+                x="Social_Media_Use_Frequency",
+                y="Academic_Stress_Index",
+                color="Academic_Stress_Index",
+                color_continuous_scale=CONTINUOUS_SCALE
+            )
 
-        fig.update_layout(
-            xaxis_title="Social Media Usage",
-            yaxis_title="Academic Stress Index",
-            template="plotly_white"
-        )
+            fig.update_layout(
+                xaxis_title="Social Media Usage",
+                yaxis_title="Academic Stress Index"
+            )
+            return fig
 
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(filter_panel(filter_index, filters, "main/stress_by_usage", stress_by_usage_chart, plot_theme), width="stretch")
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
         
-        # Box Plot
-        fig = px.box(
-            df,
-            x="Social_Media_Use_Frequency",
-            y="General_Academic_Performance",
-            title="Social Media Frequency vs Academic Performance",
-            color="Social_Media_Use_Frequency",
-            color_discrete_sequence=px.colors.qualitative.Set3
+        # Box Plot (whole wave: no mask input)
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "main/performance_by_usage",
+                lambda: px.box(
+                    df,
+                    x="Social_Media_Use_Frequency",
+                    y="General_Academic_Performance",
+                    title="Social Media Frequency vs Academic Performance",
+                    color="Social_Media_Use_Frequency",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-        st.plotly_chart(fig, use_container_width=True)
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
 
-        # Box Plot
-        fig = px.box(
-            df_numeric,
-            x="Social_Media_Use_Frequency",
-            y="Sleep_Affected_By_Social_Media",
-            color="Social_Media_Use_Frequency",
-            color_discrete_sequence=COLOR_SEQ
-        )
+        # Box Plot (whole wave)
+        def sleep_by_usage_chart():
+            fig = px.box(
+                df,
+                x="Social_Media_Use_Frequency",
+                y="Sleep_Affected_By_Social_Media",
+                color="Social_Media_Use_Frequency",
+                color_discrete_sequence=COLOR_SEQ
+            )
 
-        fig.update_layout(
-            title="Sleep Disturbance by Social Media Usage",
-            xaxis_title="Usage Frequency",
-            yaxis_title="Sleep Affected Score",
-            template="plotly_white"
-        )
+            fig.update_layout(
+                title="Sleep Disturbance by Social Media Usage",
+                xaxis_title="Usage Frequency",
+                yaxis_title="Sleep Affected Score"
+            )
+            return fig
 
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(panel_figure(filter_index, "main/sleep_by_usage", sleep_by_usage_chart, theme=plot_theme), width="stretch")
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
 
-        # Scatter Plot
-        fig = px.scatter(
-            df,
-            x="Age",
-            y="Studies_Affected_By_Social_Media",
-            title="Age vs Impact of Social Media on Studies",
-            color="Gender",
-            opacity=0.7,
-            color_discrete_sequence=px.colors.qualitative.Dark2
+        # Scatter Plot (whole wave)
+        st.plotly_chart(
+            panel_figure(
+                filter_index, "main/age_vs_studies",
+                lambda: px.scatter(
+                    df,
+                    x="Age",
+                    y="Studies_Affected_By_Social_Media",
+                    title="Age vs Impact of Social Media on Studies",
+                    color="Gender",
+                    opacity=0.7,
+                    color_discrete_sequence=px.colors.qualitative.Dark2
+                ),
+                theme=plot_theme
+            ),
+            width="stretch"
         )
-
-        st.plotly_chart(fig, use_container_width=True)
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
@@ -630,10 +404,10 @@ with tab1:
 
         # Summary box
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Avg. Stress Level", f"{filtered_numeric['Assignments_Stress_Numeric'].mean():.2f}", border=True)
-        col2.metric("Sleep Affected (%)", f"{(filtered_numeric['Sleep_Affected_By_Social_Media_Numeric'].mean()/5*100):.1f}%", border=True)
-        col3.metric("Emotional Attachment", f"{filtered_numeric['Emotional_Connection_Social_Media_Numeric'].mean():.2f}", border=True)
-        col4.metric("Online Help Seeking (%)", f"{(filtered_numeric['Seek_Help_Online_When_Stress_Numeric'].mean()/5*100):.1f}%", border=True)
+        col1.metric("Avg. Stress Level", f"{filtered_df['Assignments_Stress_Numeric'].mean():.2f}", border=True)
+        col2.metric("Sleep Affected (%)", f"{(filtered_df['Sleep_Affected_By_Social_Media_Numeric'].mean()/5*100):.1f}%", border=True)
+        col3.metric("Emotional Attachment", f"{filtered_df['Emotional_Connection_Social_Media_Numeric'].mean():.2f}", border=True)
+        col4.metric("Online Help Seeking (%)", f"{(filtered_df['Seek_Help_Online_When_Stress_Numeric'].mean()/5*100):.1f}%", border=True)
 
         # Scientific Summary
         st.markdown("### Summary")
@@ -660,51 +434,54 @@ with tab1:
             'Studies_Affected_By_Social_Media'
         ]
 
-        values = df_numeric[categories].mean().tolist()
- 
-        fig = go.Figure(
-            go.Scatterpolar(
-                r=values + [values[0]],
-                theta=categories + [categories[0]],
-                fill='toself',
-                line_color="#636EFA"
+        # Whole wave
+        def impact_profile_chart():
+            values = df[categories].mean().tolist()
+
+            fig = go.Figure(
+                go.Scatterpolar(
+                    r=values + [values[0]],
+                    theta=categories + [categories[0]],
+                    fill='toself',
+                    line_color="#636EFA"
+                )
             )
-        )
 
-        fig.update_layout(
-            polar=dict(radialaxis=dict(visible=True, range=[1,5])),
-            template="plotly_white"
-        )
+            fig.update_layout(
+                polar=dict(radialaxis=dict(visible=True, range=[1,5]))
+            )
+            return fig
 
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(panel_figure(filter_index, "main/impact_profile", impact_profile_chart, theme=plot_theme), width="stretch")
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
         """)
 
-        # Parallel coordinates
-        parallel_df = df_numeric[
-            [
-                'Social_Media_Use_Frequency',
-                'Assignments_Stress',
-                'Academic_Workload_Anxiety',
-                'Sleep_Affected_By_Social_Media',
-                'Studies_Affected_By_Social_Media'
-            ]
-        ].dropna()
-
-        fig = px.parallel_coordinates(
-            parallel_df,
-            dimensions=[
-                'Assignments_Stress',
-                'Academic_Workload_Anxiety',
-                'Sleep_Affected_By_Social_Media',
-                'Studies_Affected_By_Social_Media'
-            ],
-            color='Assignments_Stress',
-            color_continuous_scale=CONTINUOUS_SCALE
-        )
-        fig.update_layout(template="plotly_white")
-        st.plotly_chart(fig, use_container_width=True)
+        # Parallel coordinates (whole wave)
+        def parallel_chart():
+            parallel_df = df[
+                [
+                    'Social_Media_Use_Frequency',
+                    'Assignments_Stress',
+                    'Academic_Workload_Anxiety',
+                    'Sleep_Affected_By_Social_Media',
+                    'Studies_Affected_By_Social_Media'
+                ]
+            ].dropna()
+
+            return px.parallel_coordinates(
+                parallel_df,
+                dimensions=[
+                    'Assignments_Stress',
+                    'Academic_Workload_Anxiety',
+                    'Sleep_Affected_By_Social_Media',
+                    'Studies_Affected_By_Social_Media'
+                ],
+                color='Assignments_Stress',
+                color_continuous_scale=CONTINUOUS_SCALE
+            )
+
+        st.plotly_chart(panel_figure(filter_index, "main/parallel", parallel_chart, theme=plot_theme), width="stretch")
 
         st.success("""
         **Interpretation:** Most students show moderate-to-high social media usage, indicating its strong integration into daily routines.
@@ -725,15 +502,15 @@ with tab1:
 
         # Summary box
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("SM Hours ↔ Stress", f"{filtered_numeric[['Social_Media_Hours_Numeric', 'Assignments_Stress_Numeric']].corr().iloc[0,1]:.2f}", border=True)
-        col2.metric("Study Hours ↔ Stress", f"{filtered_numeric[['Study_Hours_Numeric','Assignments_Stress_Numeric']].corr().iloc[0,1]:.2f}", border=True)
+        col1.metric("SM Hours ↔ Stress", f"{filtered_df[['Social_Media_Hours_Numeric', 'Assignments_Stress_Numeric']].corr().iloc[0,1]:.2f}", border=True)
+        col2.metric("Study Hours ↔ Stress", f"{filtered_df[['Study_Hours_Numeric','Assignments_Stress_Numeric']].corr().iloc[0,1]:.2f}", border=True)
         impact_gap = (
-            filtered_numeric['Social_Media_Positive_Impact_on_Wellbeing_Numeric'].mean(skipna=True)
+            filtered_df['Social_Media_Positive_Impact_on_Wellbeing_Numeric'].mean(skipna=True)
             -
-            filtered_numeric['Social_Media_Negative_Impact_on_Wellbeing_Numeric'].mean(skipna=True)
+            filtered_df['Social_Media_Negative_Impact_on_Wellbeing_Numeric'].mean(skipna=True)
         )
         col3.metric("Wellbeing Impact Gap", f"{impact_gap:.2f}", border=True)
-        col4.metric("Support-Seeking Score", f"{filtered_df['Use_Online_Communities_for_Support'].map(likert_map).mean():.2f}", border=True)
+        col4.metric("Support-Seeking Score", f"{filtered_df['Use_Online_Communities_for_Support_Numeric'].mean():.2f}", border=True)
         # Scientific Summary
         st.markdown("### Summary")
         st.info("""
@@ -748,67 +525,69 @@ with tab1:
 
         col1, col2 = st.columns(2)
 
-        # Heatmap
-        corr = df_numeric[
-            [
-                'Assignments_Stress',
-                'Academic_Workload_Anxiety',
-                'Sleep_Affected_By_Social_Media',
-                'Studies_Affected_By_Social_Media',
-                'Social_Media_Hours_Numeric'
-            ]
-        ].corr()
-
-        fig = px.imshow(
-            corr,
-            text_auto=".2f",
-            color_continuous_scale=CONTINUOUS_SCALE
-        )
+        # Heatmap (whole wave)
+        def correlation_chart():
+            corr = df[
+                [
+                    'Assignments_Stress',
+                    'Academic_Workload_Anxiety',
+                    'Sleep_Affected_By_Social_Media',
+                    'Studies_Affected_By_Social_Media',
+                    'Social_Media_Hours_Numeric'
+                ]
+            ].corr()
+
+            fig = px.imshow(
+                corr,
+                text_auto=".2f",
+                color_continuous_scale=CONTINUOUS_SCALE
+            )
 
-        fig.update_layout(
-            title="Correlation Between Internet Use & Mental Health",
-            template="plotly_white"
-        )
+            fig.update_layout(
+                title="Correlation Between Internet Use & Mental Health"
+            )
+            return fig
 
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(panel_figure(filter_index, "main/correlation", correlation_chart, theme=plot_theme), width="stretch")
         st.error("""
         Strong correlations highlight the need for institutional awareness and early intervention.
         """)
 
-        # Waterfall Chart
-        mean_vals = df_numeric[
-            [
-                'Assignments_Stress',
-                'Academic_Workload_Anxiety',
-                'Sleep_Affected_By_Social_Media',
-                'Studies_Affected_By_Social_Media'
-            ]
-        ].mean()
-
-        fig = go.Figure(go.Waterfall(
-            x=[
-                "Assignments Stress",
-                "Academic Anxiety",
-                "Sleep Affected",
-                "Studies Affected",
-                "Overall Impact"
-            ],
-            y=[
-                mean_vals[0],
-                mean_vals[1],
-                mean_vals[2],
-                mean_vals[3],
-                mean_vals.sum()
-            ],
-            measure=["relative","relative","relative","relative","total"]
-        ))
-
-        fig.update_layout(
-            title="Cumulative Mental Health Impact",
-            template="plotly_white"
-        )
+        # Waterfall Chart (whole wave)
+        def cumulative_impact_chart():
+            mean_vals = df[
+                [
+                    'Assignments_Stress',
+                    'Academic_Workload_Anxiety',
+                    'Sleep_Affected_By_Social_Media',
+                    'Studies_Affected_By_Social_Media'
+                ]
+            ].mean()
+
+            fig = go.Figure(go.Waterfall(
+                x=[
+                    "Assignments Stress",
+                    "Academic Anxiety",
+                    "Sleep Affected",
+                    "Studies Affected",
+                    "Overall Impact"
+                ],
+                y=[
+                    mean_vals.iloc[0],
+                    mean_vals.iloc[1],
+                    mean_vals.iloc[2],
+                    mean_vals.iloc[3],
+                    mean_vals.sum()
+                ],
+                measure=["relative","relative","relative","relative","total"]
+            ))
+
+            fig.update_layout(
+                title="Cumulative Mental Health Impact"
+            )
+            return fig
 
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(panel_figure(filter_index, "main/cumulative_impact", cumulative_impact_chart, theme=plot_theme), width="stretch")
          
        
     # --- Observation Section (Fixed Indentation) ---
@@ -0,0 +1,162 @@
+import argparse
+import csv
+import gzip
+import io
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- GOOGLE SHEETS STAND-IN ---
+# Serves a CSV export the way the published sheet does, with injectable
+# latency, throttled bandwidth, gzip, 5xx errors and truncated bodies, so
+# ingestion can be benchmarked on a machine with no network:
+#
+#   python sheet_stub.py --rows 200000 --latency 0.8 --bandwidth-kbps 2000
+#   SURVEY_SHEET_URL=http://127.0.0.1:8765/export.csv streamlit run sidebar.py
+#
+# Any path returns the export, so SURVEY_SHEET_EXPORT_URL templates work too.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLED_CSV = os.path.join(APP_DIR, "exploring_internet_use.csv")
+
+# Bytes written per throttle tick
+SEND_BLOCK_BYTES = 16 * 1024
+
+
+def synthetic_export(path, rows, seed):
+    # Resample the rows of a real export (with replacement) up to `rows`, so
+    # answers keep realistic categories and mixes at any size.
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        sample = list(reader)
+
+    rng = random.Random(seed)
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rng.choice(sample) for _ in range(rows))
+    return out.getvalue().encode("utf-8")
+
+
+def make_handler(options, export):
+    rng = random.Random(options.seed)
+    rng_lock = threading.Lock()
+    counts = {"requests": 0, "errors": 0, "truncated": 0}
+
+    def draw():
+        with rng_lock:
+            return rng.random()
+
+    def tally(key):
+        with rng_lock:
+            counts[key] += 1
+
+    def current_export():
+        # Without --rows the CSV is re-read per request, so editing it
+        # stands in for new form responses arriving between refreshes.
+        if export is not None:
+            return export
+        with open(options.csv, "rb") as f:
+            return f.read()
+
+    class SheetHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            tally("requests")
+            delay = options.latency + options.jitter * draw()
+            if delay:
+                time.sleep(delay)
+
+            if draw() < options.error_rate:
+                tally("errors")
+                self.send_error(503, "Service Unavailable (injected)")
+                return
+
+            body = current_export()
+            gzipped = options.gzip and "gzip" in self.headers.get("Accept-Encoding", "")
+            if gzipped:
+                body = gzip.compress(body, compresslevel=6)
+
+            # Truncated bodies still announce the full Content-Length, like a
+            # connection dropped mid-transfer.
+            length = len(body)
+            if draw() < options.truncate_rate:
+                tally("truncated")
+                body = body[:int(length * options.truncate_at)]
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv; charset=utf-8")
+            self.send_header("Content-Length", str(length))
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.send_body(body)
+            self.close_connection = True
+
+        def send_body(self, body):
+            bytes_per_second = options.bandwidth_kbps * 1024
+            start = time.perf_counter()
+            sent = 0
+            try:
+                for offset in range(0, len(body), SEND_BLOCK_BYTES):
+                    block = body[offset:offset + SEND_BLOCK_BYTES]
+                    self.wfile.write(block)
+                    sent += len(block)
+                    if bytes_per_second:
+                        ahead = sent / bytes_per_second - (time.perf_counter() - start)
+                        if ahead > 0:
+                            time.sleep(ahead)
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            if not options.quiet:
+                super().log_message(format, *args)
+
+    return SheetHandler, counts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local stand-in for the published survey sheet.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--csv", default=BUNDLED_CSV, help="export to serve (default: the bundled CSV)")
+    parser.add_argument("--rows", type=int, default=0, help="serve a synthetic export of this many rows resampled from --csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--bandwidth-kbps", type=float, default=0.0, help="throttle the body to this many KiB/s (0: unlimited)")
+    parser.add_argument("--gzip", action="store_true", help="gzip the body when the client accepts it")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="fraction of responses cut short")
+    parser.add_argument("--truncate-at", type=float, default=0.5, help="fraction of the body sent when truncating")
+    parser.add_argument("--quiet", action="store_true", help="no per-request log lines")
+    return parser.parse_args()
+
+
+def main():
+    options = parse_args()
+    export = synthetic_export(options.csv, options.rows, options.seed) if options.rows else None
+    handler, counts = make_handler(options, export)
+    server = ThreadingHTTPServer((options.host, options.port), handler)
+
+    size = len(export) if export is not None else os.path.getsize(options.csv)
+    print(f"Serving {size / 2**20:.1f} MiB export on http://{options.host}:{options.port}/export.csv")
+    print(f"  SURVEY_SHEET_URL=http://{options.host}:{options.port}/export.csv streamlit run sidebar.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{counts['requests']} requests, {counts['errors']} errors, {counts['truncated']} truncated")
+
+
+if __name__ == "__main__":
+    main()
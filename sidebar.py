@@ -1,4 +1,5 @@
 import streamlit as st
+from data_loader import wave_selector
 
 st.set_page_config(page_title="Students Mental Health Analysis", layout="wide")
 
@@ -21,5 +22,8 @@ pg = st.navigation({
     ]
 })
 
+# Survey wave shared by every page
+wave_selector()
+
 # Run navigation
 pg.run()
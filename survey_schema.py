@@ -0,0 +1,282 @@
+import functools
+import numbers
+import re
+
+import numpy as np
+
+# ==================================================
+# FORM SCHEMA
+# ==================================================
+# Bilingual form question -> short column name. This is the single source of
+# truth for header names; resolve_headers() matches live exports against the
+# English half of each question, so small wording edits still resolve.
+FORM_HEADERS = {
+    "Age / Umur:": "Age",
+    "Gender / Jantina:": "Gender",
+    "Race / Bangsa:": "Race",
+    "Year of Study / Tahun Belajar:": "Year_of_Study",
+    "Programme of Study / Program Pembelajaran (cth., SST):": "Programme_of_Study",
+    "Current living situation / Keadaan hidup sekarang:": "Current_Living_Situation",
+    "Employment Status / Status Pekerjaan:": "Employment_Status",
+    "Relationship Status / Status Perhubungan:": "Relationship_Status",
+    "How would you describe your general academic performance? / Bagaimanakah anda menerangkan prestasi akademik umum anda?": "General_Academic_Performance",
+    "How many hours do you study per week (outside class)? / Berapa jam anda belajar setiap minggu (di luar kelas)?": "Hours_Study_per_Week",
+    "How often do you use social media? / Berapa kerap anda menggunakan media sosial?": "Social_Media_Use_Frequency",
+    "Platforms you use most often (select all) / Platform yang paling kerap anda gunakan (pilih semua):": "Platforms_Most_Often_Used",
+    "I have been feeling stressed or overwhelmed with assignments. / Saya telah berasa tertekan atau terbeban dengan tugasan.": "Assignments_Stress",
+    "I often feel anxious about my academic workload. / Saya sering berasa bimbang tentang beban kerja akademik saya.": "Academic_Workload_Anxiety",
+    "I have difficulty sleeping due to university-related pressure. / Saya sukar tidur kerana tekanan berkaitan universiti.": "Difficulty_Sleeping_University_Pressure",
+    "I feel supported by friends or family when I am stressed. / Saya berasa disokong oleh rakan atau keluarga apabila saya tertekan.": "Friends_Family_Support",
+    "I can manage my emotions well during stressful periods. / Saya boleh menguruskan emosi saya dengan baik semasa tempoh tekanan.": "Manage_Emotion_Stressful_Periods",
+    "I use social media to relax or escape from academic stress. / Saya menggunakan media sosial untuk berehat atau melarikan diri daripada tekanan akademik.": "Social_Media_Relaxation",
+    "I feel emotionally connected to my social media accounts. / Saya berasa tersambung secara emosi dengan akaun media sosial saya.": "Emotional_Connection_Social_Media",
+    "Using social media is an important part of my daily routine. / Menggunakan media sosial adalah bahagian penting dalam rutin harian saya.": "Social_Media_Daily_Routine",
+    "I sometimes lose track of time when using social media. / Saya kadang-kadang terlepas masa apabila menggunakan media sosial.": "Social_Media_Waste_Time",
+    "Social media has affected my sleep (sleeping late or difficulty sleeping). / Media sosial telah menjejaskan tidur saya (tidur lewat atau sukar tidur).": "Sleep_Affected_By_Social_Media",
+    "Social media affects my ability to concentrate on studies. / Media sosial menjejaskan keupayaan saya untuk menumpukan perhatian kepada pelajaran.": "Studies_Affected_By_Social_Media",
+    "I use the Internet to look for mental health information (e.g., coping tips, stress-relief content). / Saya menggunakan Internet untuk mencari maklumat kesihatan mental (cth., petua mengatasi tekanan, kandungan melegakan tekanan).": "Mental_Health_Info_Through_Internet",
+    "I have come across upsetting or disturbing content online. / Saya telah menemui kandungan yang menjengkelkan atau mengganggu dalam talian.": "Across_Upsetting_Content_Online",
+    "When I feel stressed, I prefer to seek help online rather than talk to someone in person. / Apabila saya berasa tertekan, saya lebih suka mencari bantuan dalam talian daripada bercakap dengan seseorang secara peribadi.": "Seek_Help_Online_When_Stress",
+    "I know where to find reliable mental health information online. / Saya tahu di mana untuk mencari maklumat kesihatan mental yang boleh dipercayai dalam talian.": "Find_Mental_Health_Info_Online",
+    "I follow accounts that post motivational or mental health content. / Saya mengikuti akaun yang menyiarkan kandungan motivasi atau kesihatan mental.": "Follow_Motivational_Mental_Health_Content",
+    "I use online communities for academic or emotional support. / Saya menggunakan komuniti dalam talian untuk sokongan akademik atau emosi.": "Use_Online_Communities_for_Support",
+    "Social media has a generally positive impact on my wellbeing. / Media sosial secara amnya mempunyai kesan positif terhadap kesejahteraan saya.": "Social_Media_Positive_Impact_on_Wellbeing",
+    "Social media has a generally negative impact on my wellbeing. / Media sosial secara amnya mempunyai kesan negatif terhadap kesejahteraan saya.": "Social_Media_Negative_Impact_on_Wellbeing",
+    "Do you think universities should provide more online mental health resources? / Adakah anda fikir universiti harus menyediakan lebih banyak sumber kesihatan mental dalam talian?": "Do you think universities should provide more online mental health resources?",
+    "What type of online content affects you the most (positive or negative)? / Apakah jenis kandungan dalam talian yang paling mempengaruhi anda (positif atau negatif)?": "Type_of_Online_Content_Affects",
+    "What do you think universities can do to support student wellbeing? / Pada pendapat anda, apakah yang boleh dilakukan oleh universiti untuk menyokong kesejahteraan pelajar?": "Universities_Support_Actions"
+}
+
+# Headers must share at least this many leading English words with a schema
+# question to be matched by prefix.
+MIN_PREFIX_WORDS = 3
+
+
+def normalize_header(header):
+    english = header.split(" / ")[0]
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", english.lower()).split())
+
+
+def _compile_header_index():
+    exact = {}
+    prefixes = {}
+    for header, column in FORM_HEADERS.items():
+        # Exports that already use the short names resolve to themselves.
+        for text in (header, column):
+            exact[normalize_header(text)] = column
+
+        words = normalize_header(header).split()
+        for k in range(MIN_PREFIX_WORDS, len(words) + 1):
+            key = " ".join(words[:k])
+            # A prefix shared by two questions is ambiguous and never matches.
+            prefixes[key] = column if prefixes.get(key, column) == column else None
+    return exact, prefixes
+
+
+_EXACT_HEADERS, _PREFIX_HEADERS = _compile_header_index()
+
+
+def _prefix_match(key):
+    # Longest known prefix wins, so an edited question ending still resolves.
+    words = key.split()
+    for k in range(len(words), MIN_PREFIX_WORDS - 1, -1):
+        column = _PREFIX_HEADERS.get(" ".join(words[:k]))
+        if column is not None:
+            return column
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def resolve_headers(headers):
+    # Cached per header signature (the tuple of raw headers), so re-ingesting
+    # a sheet with a known header set skips matching entirely. Returns the
+    # rename mapping plus the headers left as they are because the column
+    # they prefix-match is already claimed. Exact matches claim their column
+    # first, so a new question that starts like a known one never turns into
+    # a duplicate column.
+    mapping = {}
+    claimed = set()
+    for header in headers:
+        column = _EXACT_HEADERS.get(normalize_header(header))
+        if column is not None and column not in claimed:
+            mapping[header] = column
+            claimed.add(column)
+
+    unmatched = []
+    for header in headers:
+        if header in mapping:
+            continue
+        column = _prefix_match(normalize_header(header))
+        if column is None:
+            mapping[header] = header.strip()
+        elif column in claimed:
+            mapping[header] = header
+            unmatched.append(header)
+        else:
+            mapping[header] = column
+            claimed.add(column)
+    return mapping, tuple(unmatched)
+
+
+# ==================================================
+# ANSWER CATEGORIES
+# ==================================================
+# Closed-ended questions -> (answer options in display order, ordered scale?).
+# Answers outside the listed options are kept and appended as extra
+# categories, so an edited form option never turns into a missing value.
+FREQUENCY_LEVELS = ["Never", "Rarely", "Sometimes", "Often", "Always"]
+YES_NO_NOT_SURE = ["Yes", "No", "Not sure"]
+
+ANSWER_CATEGORIES = {
+    "Gender": (["Female", "Male"], False),
+    "Race": (["Malay", "Chinese", "Indian", "Others"], False),
+    "Year_of_Study": (["Year 1", "Year 2", "Year 3", "Year 4", "Postgraduate (Master's/PhD)"], True),
+    # Free-typed programme codes: categories come from the data itself
+    "Programme_of_Study": ([], False),
+    "Current_Living_Situation": (["With family", "On-campus", "Off-campus (rental)"], False),
+    "Employment_Status": ([
+        "Full-time student",
+        "In paid employment (including part-time, self-employed)",
+        "Internship",
+        "Unemployed"
+    ], False),
+    "Relationship_Status": (["Single", "In a relationship", "Married", "Prefer not to say"], False),
+    "General_Academic_Performance": (["Below average", "Average", "Good", "Excellent"], True),
+    "Hours_Study_per_Week": ([
+        "Less than 5 hours",
+        "5 to 10 hours",
+        "11 to 15 hours",
+        "16 to 20 hours",
+        "More than 20 hours"
+    ], True),
+    "Social_Media_Use_Frequency": ([
+        "Less than 1 hour per day",
+        "1 to 2 hours per day",
+        "3 to 4 hours per day",
+        "5 to 6 hours per day",
+        "More than 6 hours per day"
+    ], True),
+    "Mental_Health_Info_Through_Internet": (FREQUENCY_LEVELS, True),
+    "Across_Upsetting_Content_Online": (FREQUENCY_LEVELS, True),
+    "Use_Online_Communities_for_Support": (FREQUENCY_LEVELS, True),
+    "Find_Mental_Health_Info_Online": (YES_NO_NOT_SURE, False),
+    "Follow_Motivational_Mental_Health_Content": (["Yes", "No"], False),
+    "Do you think universities should provide more online mental health resources?": (YES_NO_NOT_SURE, False),
+}
+
+# Multi-select "Platforms you use most often": options in form order. Any
+# other typed-in platform is counted under "Other".
+PLATFORM_OPTIONS = ["Instagram", "TikTok", "Twitter/X", "YouTube", "WhatsApp", "Facebook", "Telegram"]
+PLATFORM_VOCABULARY = PLATFORM_OPTIONS + ["Other"]
+
+
+# ==================================================
+# ORDINAL ENCODINGS
+# ==================================================
+# Likert-scale columns (1–5)
+LIKERT_COLS = [
+    'Assignments_Stress',
+    'Academic_Workload_Anxiety',
+    'Difficulty_Sleeping_University_Pressure',
+    'Friends_Family_Support',
+    'Manage_Emotion_Stressful_Periods',
+    'Social_Media_Relaxation',
+    'Emotional_Connection_Social_Media',
+    'Social_Media_Daily_Routine',
+    'Social_Media_Waste_Time',
+    'Sleep_Affected_By_Social_Media',
+    'Studies_Affected_By_Social_Media',
+    'Seek_Help_Online_When_Stress',
+    'Social_Media_Positive_Impact_on_Wellbeing',
+    'Social_Media_Negative_Impact_on_Wellbeing'
+]
+
+# Frequency-scale columns (1–5)
+FREQ_COLS = [
+    'Mental_Health_Info_Through_Internet',
+    'Use_Online_Communities_for_Support',
+    'Across_Upsetting_Content_Online'
+]
+
+LIKERT_LABELS = ["Strongly disagree", "Disagree", "Neutral", "Agree", "Strongly agree"]
+
+# Scale -> answer label -> numeric value. Labels match on their English half,
+# case-insensitively, so "4", "Agree" and "Agree / Setuju" all encode alike.
+ENCODING_SCALES = {
+    "likert": {
+        **{str(score): score for score in range(1, 6)},
+        **{label: score for score, label in enumerate(LIKERT_LABELS, start=1)},
+    },
+    "frequency": {label: score for score, label in enumerate(FREQUENCY_LEVELS, start=1)},
+    "yes_no": {"Yes": 1, "No": 0},
+    "academic_performance": {
+        "Below average": 1,
+        "Average": 2,
+        "Good": 3,
+        "Excellent": 4
+    },
+    # Midpoints of the answer ranges
+    "study_hours": {
+        "Less than 5 hours": 2.5,
+        "5 to 10 hours": 7.5,
+        "11 to 15 hours": 13,
+        "16 to 20 hours": 18,
+        "More than 20 hours": 22.5
+    },
+    "social_media_hours": {
+        "Less than 1 hour per day": 0.5,
+        "1 to 2 hours per day": 1.5,
+        "3 to 4 hours per day": 3.5,
+        "5 to 6 hours per day": 5.5,
+        "More than 6 hours per day": 7
+    },
+}
+
+# Encoded column -> (answer column, scale). encode_data() builds every one of
+# these, so pages read encoded values instead of keeping their own maps.
+ORDINAL_ENCODINGS = {
+    **{col + "_Numeric": (col, "likert") for col in LIKERT_COLS},
+    **{col + "_Numeric": (col, "frequency") for col in FREQ_COLS},
+    "Find_Mental_Health_Info_Online_Numeric": ("Find_Mental_Health_Info_Online", "yes_no"),
+    "Follow_Motivational_Mental_Health_Content_Numeric": ("Follow_Motivational_Mental_Health_Content", "yes_no"),
+    "General_Academic_Performance_Numeric": ("General_Academic_Performance", "academic_performance"),
+    "Study_Hours_Numeric": ("Hours_Study_per_Week", "study_hours"),
+    "Social_Media_Hours_Numeric": ("Social_Media_Use_Frequency", "social_media_hours"),
+}
+
+
+def normalize_answer(answer):
+    # Whole-number floats come from CSV columns with blanks (4.0 -> "4").
+    if isinstance(answer, numbers.Real) and float(answer).is_integer():
+        answer = int(answer)
+    english = str(answer).split(" / ")[0]
+    return " ".join(english.lower().split())
+
+
+_SCALE_VALUES = {
+    scale: {normalize_answer(label): value for label, value in labels.items()}
+    for scale, labels in ENCODING_SCALES.items()
+}
+
+
+@functools.lru_cache(maxsize=128)
+def answer_lookup(scale, answers):
+    # answers is the tuple of distinct answers (the category list); the
+    # result maps answer code -> value, with a trailing NaN slot so code -1
+    # (missing) indexes straight into it.
+    values = _SCALE_VALUES[scale]
+    lookup = np.array(
+        [values.get(normalize_answer(answer), np.nan) for answer in answers] + [np.nan],
+        dtype=float
+    )
+    lookup.flags.writeable = False
+    return lookup
+
+
+# ==================================================
+# VALIDATION RULES
+# ==================================================
+# Rows failing these checks are quarantined at ingest instead of reaching
+# the pages. Required columns must exist in the export and be answered.
+REQUIRED_COLUMNS = ["Age", "Gender", "Year_of_Study", "Social_Media_Use_Frequency"]
+AGE_RANGE = (16, 60)